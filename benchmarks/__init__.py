@@ -0,0 +1,2 @@
+# The sample book shipped in ./books, stored under the SHA-256 digest of its content like every book of the library.
+SAMPLE_BOOK = "./books/218e7a403c1c875fcd2068dcef63492ccbffed85155b405a497aaf8d453e8b0b.pdf"
@@ -0,0 +1,457 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fitz
+
+from benchmarks import SAMPLE_BOOK
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+BENCHMARK_BOOK = SAMPLE_BOOK
+SYNTHETIC_PAGES = 2000
+CATALOG_ENTRIES = 10_000
+BOOKMARK_ENTRIES = 10_000
+VIEWPORT_WIDTH = 800
+ROUNDS = 20
+ADD_BOOK_ROUNDS = 5
+REGRESSION_TOLERANCE = 0.2
+SYNTHETIC_TEXT = ("It was towards the end of November, during a thaw, at nine o'clock one morning, that a train "
+                  "on the Warsaw and Petersburg railway was approaching the latter city at full speed. ") * 12
+
+
+def timed(function, rounds, setup=None):
+    """
+    Call a function several times and summarize how long each call took.
+
+    :param function: a callable taking the round number
+    :param rounds: the number of calls
+    :param setup: a callable taking the round number, called untimed before each call, or None
+    :precondition: rounds must be a positive integer
+    :postcondition: the function is called rounds times
+    :return: a dictionary with the number of rounds and the minimum, median, mean, maximum and standard
+             deviation of the calls in milliseconds
+    """
+    durations = []
+    for round_num in range(rounds):
+        if setup is not None:
+            setup(round_num)
+        start = time.perf_counter()
+        function(round_num)
+        durations.append((time.perf_counter() - start) * 1000)
+    return {
+        "rounds": rounds,
+        "min_ms": round(min(durations), 4),
+        "median_ms": round(statistics.median(durations), 4),
+        "mean_ms": round(statistics.fmean(durations), 4),
+        "max_ms": round(max(durations), 4),
+        "stddev_ms": round(statistics.stdev(durations), 4) if rounds > 1 else 0.0,
+    }
+
+
+def make_synthetic_pdf(path, pages):
+    """
+    Write a PDF with many pages of text, standing in for a long book.
+
+    :param path: the path the PDF is saved to
+    :param pages: the number of pages
+    :precondition: pages must be a positive integer
+    :postcondition: the PDF exists at path
+    :return: path
+    """
+    with fitz.open() as document:
+        for page_num in range(pages):
+            page = document.new_page()
+            page.insert_textbox(fitz.Rect(72, 72, page.rect.width - 72, page.rect.height - 72),
+                                f"Page {page_num + 1}. {SYNTHETIC_TEXT}", fontsize=11)
+        document.set_metadata({"title": "Synthetic book", "author": "BookSmart benchmarks"})
+        document.save(path, garbage=3, deflate=True)
+    return path
+
+
+class FreesoundStub:
+    """
+    Local HTTP server answering the Freesound requests made by the sound functions, so sounds are
+    resolved and downloaded without the network.
+    """
+
+    def __init__(self):
+        """
+        Initialize the FreesoundStub.
+
+        :precondition: none
+        :postcondition: the server is not started
+        """
+        self.server = None
+        self.thread = None
+        self.previous_client = None
+
+    def __enter__(self):
+        """
+        Start the server and point the shared Freesound client at it.
+
+        :precondition: none
+        :postcondition: the shared Freesound client talks to the stub
+        :return: the FreesoundStub
+        """
+        from functionalities import sound
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FreesoundStubHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="freesound-stub", daemon=True)
+        self.thread.start()
+        self.previous_client = sound._freesound_client
+        sound._freesound_client = sound.FreesoundClient(api_key="stub", base_url=self.url(), retries=0)
+        return self
+
+    def url(self):
+        """
+        Return the base URL of the server.
+
+        :precondition: the server must be started
+        :postcondition: nothing is sent
+        :return: the base URL, without a trailing slash
+        """
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __exit__(self, *exc_info):
+        """
+        Stop the server and restore the shared Freesound client.
+
+        :precondition: the server must be started
+        :postcondition: the server is closed
+        """
+        from functionalities import sound
+
+        sound._freesound_client.close()
+        sound._freesound_client = self.previous_client
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FreesoundStubHandler(BaseHTTPRequestHandler):
+    """
+    Answers searches with one sound, sound details with a preview URL and previews with a few bytes.
+    """
+
+    def do_GET(self):
+        """
+        Answer a GET request like the Freesound API would.
+
+        :precondition: called by the server for each request
+        :postcondition: a response is sent
+        """
+        host, port = self.server.server_address[:2]
+        path = self.path.split("?")[0]
+        if path.startswith("/search/text/"):
+            self.send_body(json.dumps({"results": [{"id": 1}]}).encode(), "application/json")
+        elif path.startswith("/sounds/"):
+            previews = {"preview-lq-mp3": f"http://{host}:{port}/previews/{path.strip('/').split('/')[-1]}.mp3"}
+            self.send_body(json.dumps({"previews": previews}).encode(), "application/json")
+        elif path.startswith("/previews/"):
+            self.send_body(b"\xff\xfb" + bytes(64 * 1024), "audio/mpeg")
+        else:
+            self.send_error(404)
+
+    def send_body(self, body, content_type):
+        """
+        Send a successful response.
+
+        :param body: the bytes of the response body
+        :param content_type: the MIME type of the body
+        :precondition: no response must have been sent for the request
+        :postcondition: the response is sent
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """
+        Keep the requests out of the benchmark output.
+
+        :precondition: none
+        :postcondition: nothing is logged
+        """
+
+
+def wait_for_background_work(book_path):
+    """
+    Wait until the thumbnail, search index and mood index of a book added to the library are built.
+
+    :param book_path: the path of the book in the books directory
+    :precondition: the book must have been added with add_book
+    :postcondition: no background work is left for the book
+    """
+    from functionalities.crud import get_thumbnail_queue
+    from functionalities.mood_index import start_mood_index
+    from functionalities.search import get_search_index_queue
+
+    get_thumbnail_queue().join()
+    get_search_index_queue().join()
+    start_mood_index(book_path).join()
+
+
+def bench_add_book(books, rounds):
+    """
+    Time add_book, the part of adding a book the reader waits for, and add_thumbnail.
+
+    :param books: a dictionary mapping a label to the path of a PDF file outside the books directory
+    :param rounds: the number of times each book is added, at most ADD_BOOK_ROUNDS since the background work
+                   of each round is waited for
+    :precondition: the current directory must be an empty library
+    :postcondition: the books are in the library
+    :return: a dictionary of timings
+    """
+    from functionalities.catalog import book_name, file_digest
+    from functionalities.crud import add_book, add_thumbnail, delete_book, stored_path
+
+    rounds = min(rounds, ADD_BOOK_ROUNDS)
+    results = {}
+    for label, path in books.items():
+        name = book_name(path)
+        library_path = stored_path(file_digest(path))
+
+        def remove(round_num):
+            if os.path.exists(library_path):
+                wait_for_background_work(library_path)
+                delete_book(name)
+
+        results[f"add_book[{label}]"] = timed(lambda round_num: add_book(path), rounds, setup=remove)
+        wait_for_background_work(library_path)
+        results[f"add_thumbnail[{label}]"] = timed(lambda round_num: add_thumbnail(library_path), rounds)
+    return results
+
+
+def bench_get_books(entries, rounds):
+    """
+    Time get_books on a catalog of many books.
+
+    :param entries: the number of books in the catalog
+    :param rounds: the number of calls
+    :precondition: the current directory must be a library
+    :postcondition: the catalog holds entries made-up books besides the real ones
+    :return: a dictionary of timings
+    """
+    from functionalities.catalog import get_catalog
+    from functionalities.crud import get_books
+
+    catalog = get_catalog()
+    for book_num in range(entries):
+        catalog.put({"path": f"/library/book-{book_num:05}.pdf", "name": f"book-{book_num:05}", "size": 1024,
+                     "mtime": 0.0, "digest": f"{book_num:064x}", "page_count": 300, "title": f"Book {book_num}",
+                     "author": "Author", "thumbnail": None})
+    return {f"get_books[{entries}]": timed(lambda round_num: get_books(), rounds)}
+
+
+def bench_render_page(books, rounds):
+    """
+    Time rendering a page the way the page view does when it is not cached: rendering at the scale fitting
+    the viewport width and converting the image to a QPixmap.
+
+    :param books: a dictionary mapping a label to the path of a PDF file
+    :param rounds: the number of pages rendered from each book
+    :precondition: none
+    :postcondition: the books are opened and closed
+    :return: a dictionary of timings
+    """
+    from PySide6.QtGui import QGuiApplication, QPixmap
+
+    from ui.page_cache import render_page_image, render_scale
+
+    application = QGuiApplication.instance() or QGuiApplication([])
+    results = {}
+    for label, path in books.items():
+        with fitz.open(path) as document:
+            pages = [document.load_page(page_num * len(document) // rounds) for page_num in range(rounds)]
+
+            def render(round_num):
+                page = pages[round_num]
+                QPixmap.fromImage(render_page_image(page, render_scale(page.rect.width, VIEWPORT_WIDTH)))
+
+            results[f"render_page[{label}]"] = timed(render, rounds)
+    del application
+    return results
+
+
+def bench_analyze_page(book, rounds):
+    """
+    Time analyze_page on the pages of a book.
+
+    :param book: the path to the PDF file
+    :param rounds: the number of pages analyzed, spread over the book
+    :precondition: none
+    :postcondition: the sentiment backend is loaded
+    :return: a dictionary of timings, with the number of pages analyzed per second
+    """
+    from functionalities.sound import analyze_page
+
+    with fitz.open(book) as document:
+        texts = [document.load_page(page_num * len(document) // rounds).get_text() for page_num in range(rounds)]
+    analyze_page(texts[0])
+    result = timed(lambda round_num: analyze_page(texts[round_num]), rounds)
+    result["pages_per_second"] = round(1000 / result["mean_ms"], 1) if result["mean_ms"] else None
+    return {"analyze_page": result}
+
+
+def bench_bookmarks(entries, rounds):
+    """
+    Time writing and loading a bookmarks file holding many books.
+
+    :param entries: the number of bookmarks
+    :param rounds: the number of writes and loads
+    :precondition: the current directory must be a library
+    :postcondition: the bookmarks file holds entries bookmarks
+    :return: a dictionary of timings
+    """
+    from functionalities.bookmarks import BOOKMARKS_PATH, BookmarkStore
+
+    store = BookmarkStore(BOOKMARKS_PATH, flush_delay=3600)
+    for book_num in range(entries):
+        store.set(f"{book_num:064x}", book_num % 500)
+    store.flush()
+    save = timed(lambda round_num: store.flush(), rounds, setup=lambda round_num: store.set(f"{0:064x}", round_num))
+    load = timed(lambda round_num: BookmarkStore(BOOKMARKS_PATH), rounds)
+    return {f"bookmarks_save[{entries}]": save, f"bookmarks_load[{entries}]": load}
+
+
+def bench_resolve_sound(rounds):
+    """
+    Time resolving and downloading a mood sound from the Freesound stub, then from the sound cache.
+
+    :param rounds: the number of sounds resolved
+    :precondition: the current directory must be a library, the Freesound stub must be running
+    :postcondition: the sound and audio caches hold the sound of every mood
+    :return: a dictionary of timings
+    """
+    from functionalities import sound
+
+    def forget(round_num):
+        sound._sound_cache = None
+        shutil.rmtree(os.path.dirname(sound.SOUND_CACHE_PATH), ignore_errors=True)
+
+    def fetch(round_num):
+        url = sound.fetch_sounds(sound.MOODS[round_num % len(sound.MOODS)])
+        sound.download_preview(url)
+
+    cold = timed(fetch, rounds, setup=forget)
+    for mood_num in range(len(sound.MOODS)):
+        fetch(mood_num)
+    warm = timed(lambda round_num: sound.resolve_sound(sound.MOODS[round_num % len(sound.MOODS)]), rounds)
+    return {"resolve_sound[cold]": cold, "resolve_sound[cached]": warm}
+
+
+def git_commit():
+    """
+    Return the commit the benchmarks are run on.
+
+    :precondition: none
+    :postcondition: nothing is changed
+    :return: the hash of HEAD, or None outside a git checkout
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(book, rounds=ROUNDS, synthetic_pages=SYNTHETIC_PAGES, catalog_entries=CATALOG_ENTRIES,
+                   bookmark_entries=BOOKMARK_ENTRIES):
+    """
+    Run every benchmark in an empty library created in a temporary directory.
+
+    :param book: the path to a real PDF book
+    :param rounds: the number of rounds of each benchmark
+    :param synthetic_pages: the number of pages of the synthetic book
+    :param catalog_entries: the number of books in the catalog get_books is timed on
+    :param bookmark_entries: the number of bookmarks written and loaded
+    :precondition: rounds must be at least 2
+    :postcondition: the current directory is restored and the temporary library is deleted
+    :return: a dictionary with the metadata of the run and the timings of every benchmark
+    """
+    book = os.path.abspath(book)
+    metadata = {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                "pymupdf": fitz.VersionBind, "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "rounds": rounds}
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            os.makedirs("sources")
+            books = {os.path.basename(book): shutil.copy(book, "sources"),
+                     f"synthetic-{synthetic_pages}p": make_synthetic_pdf("sources/synthetic.pdf", synthetic_pages)}
+            books = {label: os.path.abspath(path) for label, path in books.items()}
+            results = {}
+            with FreesoundStub():
+                results.update(bench_add_book(books, rounds))
+                results.update(bench_get_books(catalog_entries, rounds))
+                results.update(bench_render_page(books, rounds))
+                results.update(bench_analyze_page(book, rounds))
+                results.update(bench_bookmarks(bookmark_entries, rounds))
+                results.update(bench_resolve_sound(rounds))
+        finally:
+            os.chdir(working_directory)
+    return {"metadata": metadata, "benchmarks": results}
+
+
+def compare(previous, current, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compare the median timings of two runs.
+
+    :param previous: the result of an earlier run_benchmarks
+    :param current: the result of the latest run_benchmarks
+    :param tolerance: the fraction a median may grow by before it counts as a regression
+    :precondition: tolerance must be a non-negative number
+    :postcondition: nothing is changed
+    :return: a list of (name, previous median, current median, ratio, regressed) tuples for the benchmarks of both runs
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        if name not in previous["benchmarks"]:
+            continue
+        before, after = previous["benchmarks"][name]["median_ms"], result["median_ms"]
+        ratio = after / before if before else float("inf")
+        rows.append((name, before, after, round(ratio, 3), ratio > 1 + tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the operations of the reading hot path, offline.")
+    parser.add_argument("book", nargs="?", default=BENCHMARK_BOOK, help="the PDF book to benchmark with")
+    parser.add_argument("--rounds", type=int, default=ROUNDS, help="the number of rounds of each benchmark")
+    parser.add_argument("--synthetic-pages", type=int, default=SYNTHETIC_PAGES,
+                        help="the number of pages of the synthetic book")
+    parser.add_argument("--json", help="write the results to this file instead of printing them")
+    parser.add_argument("--compare", help="compare the results with those of an earlier run saved with --json")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="how much slower a median may get before it is reported as a regression")
+    arguments = parser.parse_args()
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run_benchmarks(arguments.book, max(2, arguments.rounds), arguments.synthetic_pages)
+    if arguments.json:
+        with open(arguments.json, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            rows = compare(json.load(file), results, arguments.tolerance)
+        for name, before, after, ratio, regressed in rows:
+            print(f"{name:40} {before:12.3f} ms {after:12.3f} ms  x{ratio:<7}{'  REGRESSION' if regressed else ''}")
+        if any(row[-1] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
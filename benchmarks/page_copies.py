@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import time
+
+import fitz
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtGui import QGuiApplication, QImage, QPixmap
+
+from benchmarks import SAMPLE_BOOK
+from ui.page_cache import render_page_image
+
+
+def copied_hand_off(pix):
+    """
+    Hand a rendered page to Qt the way show_page used to: a QImage over pix.samples, then a QPixmap.
+
+    :param pix: a fitz.Pixmap of a rendered page
+    :precondition: a QGuiApplication must exist
+    :postcondition: nothing is kept
+    :return: a tuple of (QPixmap, number of bytes copied), pix.samples being a bytes copy of the pixel buffer
+             that the QImage wraps without copying
+    """
+    samples = pix.samples
+    image = QImage(samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
+    pixmap = QPixmap.fromImage(image)
+    return pixmap, len(samples) + pixmap_bytes(pixmap)
+
+
+def zero_copy_hand_off(image):
+    """
+    Hand a rendered page to Qt the way PageCanvas does: only the conversion to a QPixmap copies pixels.
+
+    :param image: the PixmapImage returned by render_page_image
+    :precondition: a QGuiApplication must exist
+    :postcondition: nothing is kept
+    :return: a tuple of (QPixmap, number of bytes copied)
+    """
+    pixmap = QPixmap.fromImage(image)
+    return pixmap, pixmap_bytes(pixmap)
+
+
+def pixmap_bytes(pixmap):
+    """
+    Return the number of bytes of pixel data held by a QPixmap.
+
+    :param pixmap: a QPixmap
+    :precondition: pixmap must not be null
+    :postcondition: the pixmap is unchanged
+    :return: the size of the pixel data in bytes
+    """
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+
+def measure(book_path, pages, zoom):
+    """
+    Compare the bytes copied and the time taken to hand rendered pages to Qt, before and after zero-copy.
+
+    :param book_path: the path to the PDF file
+    :param pages: the number of pages to turn
+    :param zoom: the scale the pages are rendered at
+    :precondition: a QGuiApplication must exist, zoom must be a positive number
+    :postcondition: the book is opened and closed
+    :return: a dictionary with the bytes copied and milliseconds per page turn of each hand-off
+    """
+    results = {"copied": [0, 0.0], "zero_copy": [0, 0.0]}
+    with fitz.open(book_path) as document:
+        pages = min(pages, len(document))
+        for page_num in range(pages):
+            page = document.load_page(page_num)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            start = time.perf_counter()
+            _, copied = copied_hand_off(pix)
+            results["copied"][0] += copied
+            results["copied"][1] += time.perf_counter() - start
+
+            image = render_page_image(page, zoom)
+            start = time.perf_counter()
+            _, copied = zero_copy_hand_off(image)
+            results["zero_copy"][0] += copied
+            results["zero_copy"][1] += time.perf_counter() - start
+    return {"pages": pages, "zoom": zoom, **{
+        name: {"bytes_copied_per_turn": copied // pages, "ms_per_turn": round(seconds * 1000 / pages, 3)}
+        for name, (copied, seconds) in results.items()}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the pixel copies made when a rendered page is shown.")
+    parser.add_argument("book", nargs="?", default=SAMPLE_BOOK, help="the PDF file to render")
+    parser.add_argument("--pages", type=int, default=50, help="the number of pages to turn")
+    parser.add_argument("--zoom", type=float, default=2.0, help="the scale the pages are rendered at")
+    arguments = parser.parse_args()
+    application = QGuiApplication([])
+    print(json.dumps(measure(arguments.book, arguments.pages, arguments.zoom), indent=2))
+    del application
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import json
+import time
+
+import fitz
+
+from benchmarks import SAMPLE_BOOK
+from functionalities.sound import SENTIMENT_BACKENDS, mood_for_polarity, page_polarities, page_polarity, \
+    set_sentiment_backend
+
+
+def book_texts(book_path):
+    """
+    Extract the text of every page of a book.
+
+    :param book_path: the path to the PDF file
+    :precondition: book_path must be a valid path to a PDF file
+    :postcondition: the book is opened and closed
+    :return: a list with the text of each page
+    """
+    with fitz.open(book_path) as document:
+        return [page.get_text() for page in document]
+
+
+def score_pages(backend, texts):
+    """
+    Score pages with a sentiment backend and time it.
+
+    :param backend: the name of the sentiment backend
+    :param texts: a list of page texts
+    :precondition: backend must be one of SENTIMENT_BACKENDS
+    :postcondition: the selected backend is left as backend, TextBlob is timed on a single core
+    :return: a tuple of (polarities, seconds taken)
+    """
+    set_sentiment_backend(backend)
+    page_polarity("")
+    start = time.perf_counter()
+    if backend == "lexicon":
+        polarities = page_polarities(texts)
+    else:
+        polarities = [page_polarity(text) for text in texts]
+    return polarities, time.perf_counter() - start
+
+
+def agreement_report(texts, reference="textblob"):
+    """
+    Compare every sentiment backend against a reference backend.
+
+    :param texts: a list of page texts
+    :param reference: the name of the backend the others are compared to
+    :precondition: reference must be one of SENTIMENT_BACKENDS
+    :postcondition: the reference backend is selected afterwards
+    :return: a dictionary with the throughput of each backend and its agreement with the reference
+    """
+    results = {backend: score_pages(backend, texts) for backend in SENTIMENT_BACKENDS}
+    set_sentiment_backend(reference)
+    expected = results[reference][0]
+    report = {"pages": len(texts), "reference": reference, "backends": {}}
+    for backend, (polarities, seconds) in results.items():
+        moods = sum(mood_for_polarity(a) == mood_for_polarity(b) for a, b in zip(polarities, expected))
+        report["backends"][backend] = {
+            "pages_per_second": round(len(texts) / seconds, 1) if seconds else None,
+            "mood_agreement": round(moods / (len(texts) or 1), 4),
+            "mean_absolute_error": round(sum(abs(a - b) for a, b in zip(polarities, expected)) / (len(texts) or 1), 4),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sentiment backends on the pages of a book.")
+    parser.add_argument("book", nargs="?", default=SAMPLE_BOOK, help="the PDF file to score")
+    arguments = parser.parse_args()
+    print(json.dumps(agreement_report(book_texts(arguments.book)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
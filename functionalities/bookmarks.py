@@ -0,0 +1,169 @@
+import atexit
+import json
+import os
+import threading
+
+from functionalities.profiling import count, span
+
+BOOKMARKS_PATH = './bookmarks/bookmarks.json'
+FLUSH_DELAY = 1.0
+
+
+class BookmarkStore:
+    """
+    Bookmarks of every book, keyed by the digest of its content, loaded once and kept in memory. Changes are
+    written back to a JSON file atomically, coalescing the changes made within FLUSH_DELAY seconds into a single
+    write.
+    """
+
+    def __init__(self, path=BOOKMARKS_PATH, flush_delay=FLUSH_DELAY):
+        """
+        Initialize the BookmarkStore and load the bookmarks file.
+
+        :param path: the path of the JSON file holding the bookmarks
+        :param flush_delay: the number of seconds to wait before writing changes
+        :precondition: flush_delay must be a non-negative number
+        :postcondition: the store holds the stored bookmarks, or none if the file is missing or corrupt
+        """
+        self.path = path
+        self.flush_delay = flush_delay
+        self.bookmarks = {}
+        self.dirty = False
+        self.changed = set()
+        self.timer = None
+        self.listeners = []
+        self.lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        """
+        Load the bookmarks from the bookmarks file.
+
+        :precondition: none
+        :postcondition: the in-memory bookmarks match the file
+        """
+        data = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as file:
+                    data = json.load(file)
+            except (OSError, json.JSONDecodeError):
+                data = {}
+        with self.lock:
+            self.bookmarks = data
+
+    def get(self, digest, default=0):
+        """
+        Return the bookmarked page of a book.
+
+        :param digest: the content digest of the book
+        :param default: the page returned when the book has no bookmark
+        :precondition: digest must be a non-empty string
+        :postcondition: the store is unchanged
+        :return: the bookmarked page number
+        """
+        with self.lock:
+            return self.bookmarks.get(digest, default)
+
+    def set(self, digest, page_num):
+        """
+        Bookmark a page of a book.
+
+        :param digest: the content digest of the book
+        :param page_num: the page number to bookmark
+        :precondition: digest must be a non-empty string, page_num must be a non-negative integer
+        :postcondition: the bookmark is updated in memory and a write is scheduled
+        """
+        with self.lock:
+            if self.bookmarks.get(digest) == page_num:
+                return
+            self.bookmarks[digest] = page_num
+            self.changed.add(digest)
+            self.schedule_flush()
+        count("bookmarks.set")
+
+    def remove(self, digest):
+        """
+        Remove the bookmark of a book.
+
+        :param digest: the content digest of the book
+        :precondition: digest must be a non-empty string
+        :postcondition: the bookmark is removed in memory and a write is scheduled if it existed
+        """
+        with self.lock:
+            if self.bookmarks.pop(digest, None) is not None:
+                self.schedule_flush()
+
+    def add_listener(self, callback):
+        """
+        Register a function called with the bookmarks changed by each write.
+
+        :param callback: a function taking a dictionary mapping the digests of the books whose page changed since
+                         the previous write to their page numbers
+        :precondition: callback must be safe to call from the flush timer thread
+        :postcondition: callback is called after every write from now on
+        """
+        with self.lock:
+            self.listeners.append(callback)
+
+    def schedule_flush(self):
+        """
+        Schedule a write of the bookmarks, unless one is already pending.
+
+        :precondition: none
+        :postcondition: the bookmarks will be written within flush_delay seconds
+        """
+        with self.lock:
+            self.dirty = True
+            if self.timer is None:
+                self.timer = threading.Timer(self.flush_delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """
+        Atomically write pending changes to the bookmarks file.
+
+        :precondition: none
+        :postcondition: the bookmarks file matches the in-memory bookmarks
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = self.path + ".tmp"
+            try:
+                with span("bookmarks.flush"), open(temp_path, 'w') as file:
+                    json.dump(self.bookmarks, file)
+                os.replace(temp_path, self.path)
+                self.dirty = False
+            except OSError as error:
+                print(f"Could not save bookmarks: {error}")
+                return
+            changed = {digest: self.bookmarks[digest] for digest in self.changed if digest in self.bookmarks}
+            self.changed.clear()
+            for callback in self.listeners:
+                callback(changed)
+
+
+_bookmark_store = None
+
+
+def get_bookmark_store():
+    """
+    Return the shared bookmark store, loading it on first use.
+
+    :precondition: none
+    :postcondition: the shared BookmarkStore is created and flushed at exit
+    :return: the shared BookmarkStore instance
+    """
+    global _bookmark_store
+    if _bookmark_store is None:
+        _bookmark_store = BookmarkStore()
+        atexit.register(_bookmark_store.flush)
+    return _bookmark_store
@@ -0,0 +1,310 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+from functionalities.bookmarks import get_bookmark_store
+
+CATALOG_PATH = './catalog/library.db'
+HASH_CHUNK_SIZE = 1024 * 1024
+BOOK_FIELDS = ("path", "name", "size", "mtime", "digest", "page_count", "title", "author", "thumbnail", "bookmark")
+
+
+def book_name(path):
+    """
+    Derive the name of a book from the path of its file.
+
+    :param path: the path to the PDF file
+    :precondition: path must be a non-empty string
+    :postcondition: only the extension is removed, so names containing dots are kept whole
+    :return: a string representing the name of the book
+    """
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def file_digest(path):
+    """
+    Compute the SHA-256 digest of the content of a file.
+
+    :param path: the path to the file
+    :precondition: path must be a readable file
+    :postcondition: the file is read in chunks of HASH_CHUNK_SIZE bytes
+    :return: a string with the hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_book(path, thumbnail=None, digest=None, name=None):
+    """
+    Read the catalog record of a book from its file.
+
+    :param path: the path to the PDF file
+    :param thumbnail: the path of the thumbnail of the book
+    :param digest: the content digest of the file, computed if None
+    :param name: the name of the book, derived from the file name if None
+    :precondition: path must be a valid path to a PDF file
+    :postcondition: the file is hashed and opened once to read its page count and metadata
+    :return: a dictionary with a value for every field of BOOK_FIELDS except the bookmark
+    """
+    import fitz
+
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with fitz.open(path) as document:
+        metadata = document.metadata or {}
+        page_count = document.page_count
+    return {
+        "path": path,
+        "name": name if name is not None else book_name(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "digest": digest if digest is not None else file_digest(path),
+        "page_count": page_count,
+        "title": metadata.get("title") or None,
+        "author": metadata.get("author") or None,
+        "thumbnail": thumbnail,
+    }
+
+
+def unique_name(name, taken):
+    """
+    Choose a name for a new book that no other book of the library has.
+
+    :param name: the name the book would have, usually its file name without the extension
+    :param taken: a set of the lowercase names already used, including those chosen for books being added
+    :precondition: name must be a non-empty string
+    :postcondition: the chosen name is added to taken
+    :return: name, with a numeric suffix if a different book has the same name
+    """
+    chosen = name
+    suffix = 2
+    while chosen.lower() in taken:
+        chosen = f"{name}-{suffix}"
+        suffix += 1
+    taken.add(chosen.lower())
+    return chosen
+
+
+class Catalog:
+    """
+    SQLite index of the books in the library, so the library can be listed without reading the books directory.
+    """
+
+    def __init__(self, path=CATALOG_PATH):
+        """
+        Initialize the Catalog, creating its database if it does not exist.
+
+        :param path: the path of the SQLite database, or ":memory:"
+        :precondition: path must be a non-empty string
+        :postcondition: the books table exists
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS books (
+                    path TEXT PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    digest TEXT NOT NULL,
+                    page_count INTEGER NOT NULL,
+                    title TEXT,
+                    author TEXT,
+                    thumbnail TEXT,
+                    bookmark INTEGER NOT NULL DEFAULT 0
+                )""")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS books_digest ON books (digest)")
+
+    def books(self):
+        """
+        Return every book of the catalog.
+
+        :precondition: none
+        :postcondition: the catalog is unchanged
+        :return: a list of dictionaries with the fields of BOOK_FIELDS, sorted by name
+        """
+        with self.lock:
+            rows = self.connection.execute(f"SELECT {', '.join(BOOK_FIELDS)} FROM books ORDER BY name").fetchall()
+        return [dict(row) for row in rows]
+
+    def book(self, name):
+        """
+        Return the record of a book.
+
+        :param name: the name of the book
+        :precondition: name must be a non-empty string
+        :postcondition: the catalog is unchanged
+        :return: a dictionary with the fields of BOOK_FIELDS, or None if the book is not in the catalog
+        """
+        with self.lock:
+            row = self.connection.execute(f"SELECT {', '.join(BOOK_FIELDS)} FROM books WHERE name = ?",
+                                          (name,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def book_at(self, path):
+        """
+        Return the record of the book stored in a file.
+
+        :param path: the path to the PDF file
+        :precondition: path must be a non-empty string
+        :postcondition: the catalog is unchanged
+        :return: a dictionary with the fields of BOOK_FIELDS, or None if the file is not in the catalog
+        """
+        with self.lock:
+            row = self.connection.execute(f"SELECT {', '.join(BOOK_FIELDS)} FROM books WHERE path = ?",
+                                          (os.path.abspath(path),)).fetchone()
+        return dict(row) if row is not None else None
+
+    def put(self, record):
+        """
+        Insert or update the record of a book, keeping the bookmark of a book that is already in the catalog.
+
+        :param record: a dictionary as returned by scan_book, with an optional bookmark for a new book
+        :precondition: record must hold every field of BOOK_FIELDS except the bookmark
+        :postcondition: the catalog holds the record; if another file has the same book name, both are kept and
+                        record["name"] is given a numeric suffix
+        """
+        updates = ", ".join(f"{field} = excluded.{field}" for field in BOOK_FIELDS[1:-1])
+        with self.lock, self.connection:
+            taken = self.connection.execute("SELECT 1 FROM books WHERE name = ? COLLATE NOCASE AND path != ?",
+                                            (record["name"], record["path"])).fetchone()
+            if taken is not None:
+                names = {row["name"].lower() for row in
+                         self.connection.execute("SELECT name FROM books WHERE path != ?", (record["path"],))}
+                record["name"] = unique_name(record["name"], names)
+            values = [record[field] for field in BOOK_FIELDS[:-1]] + [record.get("bookmark", 0)]
+            self.connection.execute(
+                f"INSERT INTO books ({', '.join(BOOK_FIELDS)}) VALUES ({', '.join('?' * len(BOOK_FIELDS))}) "
+                f"ON CONFLICT (path) DO UPDATE SET {updates}", values)
+
+    def remove(self, path):
+        """
+        Remove a book from the catalog.
+
+        :param path: the path to the PDF file
+        :precondition: path must be a non-empty string
+        :postcondition: the catalog has no record for the path
+        """
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM books WHERE path = ?", (os.path.abspath(path),))
+
+    def rename(self, old_name, new_name):
+        """
+        Change the name of a book.
+
+        :param old_name: the current name of the book
+        :param new_name: the new name of the book
+        :precondition: old_name and new_name must be non-empty strings
+        :postcondition: the record keeps its file, digest and bookmark
+        :return: True if the book was renamed, False if it does not exist or another book has the new name
+        """
+        with self.lock, self.connection:
+            taken = self.connection.execute("SELECT 1 FROM books WHERE name = ? COLLATE NOCASE AND name != ?",
+                                            (new_name, old_name)).fetchone()
+            if taken is not None:
+                return False
+            return self.connection.execute("UPDATE books SET name = ? WHERE name = ?",
+                                           (new_name, old_name)).rowcount == 1
+
+    def find_digest(self, digest):
+        """
+        Find a book by the digest of its content.
+
+        :param digest: the hexadecimal SHA-256 digest
+        :precondition: digest must be a non-empty string
+        :postcondition: the catalog is unchanged
+        :return: the path of a book with that content, or None if there is none
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT path FROM books WHERE digest = ?", (digest,)).fetchone()
+        return row["path"] if row is not None else None
+
+    def has_size(self, size):
+        """
+        Check whether a book of the catalog has a file of a given size.
+
+        :param size: the size of a file in bytes
+        :precondition: size must be a non-negative integer
+        :postcondition: the catalog is unchanged
+        :return: True if a book has that size, False otherwise
+        """
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM books WHERE size = ?", (size,)).fetchone() is not None
+
+    def store_bookmarks(self, bookmarks):
+        """
+        Copy the bookmarks changed by a write of the bookmark store into the catalog.
+
+        :param bookmarks: a dictionary mapping the digests of the books whose page changed to their page numbers
+        :precondition: the page numbers must be non-negative integers
+        :postcondition: the books of the catalog hold the given bookmarks
+        """
+        with self.lock, self.connection:
+            self.connection.executemany("UPDATE books SET bookmark = ? WHERE digest = ?",
+                                        [(page, digest) for digest, page in bookmarks.items()])
+
+    def reconcile(self, paths, scan):
+        """
+        Bring the catalog in line with the files of the library, scanning only new or modified files.
+
+        :param paths: an iterable of paths to the PDF files of the library
+        :param scan: a function taking the path of a new or modified file and returning its record
+        :precondition: scan must return dictionaries as returned by scan_book
+        :postcondition: the catalog holds exactly the given files; files whose size and modification time
+                        match their record are not opened
+        :return: a list of the paths that were scanned
+        """
+        with self.lock:
+            known = {row["path"]: (row["size"], row["mtime"])
+                     for row in self.connection.execute("SELECT path, size, mtime FROM books")}
+        scanned = []
+        for path in paths:
+            path = os.path.abspath(path)
+            stat = os.stat(path)
+            if known.pop(path, None) != (stat.st_size, stat.st_mtime):
+                try:
+                    self.put(scan(path))
+                    scanned.append(path)
+                except Exception as error:
+                    print(f"Could not catalog {path}: {error}")
+        for path in known:
+            self.remove(path)
+        return scanned
+
+    def close(self):
+        """
+        Close the database.
+
+        :precondition: none
+        :postcondition: the catalog can no longer be used
+        """
+        with self.lock:
+            self.connection.close()
+
+
+_catalog = None
+
+
+def get_catalog():
+    """
+    Return the shared catalog, opening it on first use.
+
+    :precondition: none
+    :postcondition: the shared Catalog exists and receives the changed bookmarks whenever they are written
+    :return: the shared Catalog instance
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = Catalog()
+        get_bookmark_store().add_listener(_catalog.store_bookmarks)
+    return _catalog
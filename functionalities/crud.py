@@ -1,12 +1,22 @@
-import json
-
-from PySide6.QtWidgets import QFileDialog
-import shutil
+import hashlib
+import queue
+import re
 import os
-from pdf2image import convert_from_path
+import tempfile
+import threading
+from collections import OrderedDict
+
+from functionalities.bookmarks import get_bookmark_store
+from functionalities.catalog import HASH_CHUNK_SIZE, book_name, file_digest, get_catalog, scan_book, unique_name
+from functionalities.documents import get_document_pool
+from functionalities.search import get_search_index, get_search_index_queue, sync_search_index
 
 BOOKS_DIR = './books'
 THUMB_DIR = './thumbnails'
+THUMBNAIL_SIZE = 256
+THUMBNAIL_QUEUE_SIZE = 256
+STORED_NAME_PATTERN = re.compile(r"[0-9a-f]{64}\.pdf")
+UNTITLED_NAME = "Untitled"
 
 
 def directory_exists(directory):
@@ -25,81 +35,470 @@ def directory_exists(directory):
         return True
 
 
+def stored_path(digest):
+    """
+    Build the path a book is stored at in the books directory, from the digest of its content.
+
+    :param digest: the hexadecimal SHA-256 digest of the PDF file
+    :precondition: digest must be a 64-character hexadecimal string
+    :postcondition: the same content always has the same path, so it is stored once
+    :return: a string representing the path of the PDF file in the books directory
+    """
+    return os.path.join(BOOKS_DIR, digest + ".pdf")
+
+
+def is_stored_path(file):
+    """
+    Check whether a file in the books directory is named after the digest of its content.
+
+    :param file: the path to the PDF file
+    :precondition: file must be a non-empty string
+    :postcondition: the file is not read
+    :return: True if the file name is a digest, False if it was named by a person
+    """
+    return STORED_NAME_PATTERN.fullmatch(os.path.basename(file)) is not None
+
+
+def store_file(source):
+    """
+    Copy a file into the books directory under the digest of its content, hashing it while it is copied.
+
+    :param source: the path to the PDF file
+    :precondition: source must be a readable file
+    :postcondition: the content is stored once, a file with the same content already stored is kept as is
+    :return: a tuple of (path of the stored file, hexadecimal digest of its content)
+    """
+    directory_exists(BOOKS_DIR)
+    digest = hashlib.sha256()
+    descriptor, temp_path = tempfile.mkstemp(suffix=".part", dir=BOOKS_DIR)
+    try:
+        with open(source, 'rb') as source_file, os.fdopen(descriptor, 'wb') as stored_file:
+            for chunk in iter(lambda: source_file.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                stored_file.write(chunk)
+        destination = stored_path(digest.hexdigest())
+        if os.path.exists(destination):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, destination)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return destination, digest.hexdigest()
+
+
+def taken_names():
+    """
+    Collect the names of the books of the library.
+
+    :precondition: none
+    :postcondition: the catalog is unchanged
+    :return: a set of lowercase book names
+    """
+    return {book["name"].lower() for book in get_catalog().books()}
+
+
+def thumbnail_path(file):
+    """
+    Build the path of the thumbnail of a PDF file.
+
+    :param file: the path to the PDF file
+    :precondition: file must be a non-empty string
+    :postcondition: the path is inside the thumbnails directory
+    :return: a string representing the path of the thumbnail image
+    """
+    return os.path.join(THUMB_DIR, os.path.basename(file) + ".png")
+
+
+def thumbnail_is_current(file):
+    """
+    Check whether the thumbnail of a PDF file exists and is newer than the file.
+
+    :param file: the path to the PDF file
+    :precondition: file must be a valid path to a PDF file
+    :postcondition: nothing is changed
+    :return: True if the thumbnail does not need to be generated, False otherwise
+    """
+    thumb_path = thumbnail_path(file)
+    try:
+        return os.path.getmtime(thumb_path) >= os.path.getmtime(file)
+    except OSError:
+        return False
+
+
 def add_thumbnail(file):
     """
-    Create and save a thumbnail image for the given PDF file.
+    Create and save a thumbnail image of the first page of the given PDF file.
 
     :param file: the path to the PDF file
     :precondition: file must be a valid path to a PDF file
-    :postcondition: a thumbnail image will be created and saved in the thumbnails directory
+    :postcondition: a thumbnail fitting in THUMBNAIL_SIZE pixels will be saved in the thumbnails directory
+    :return: the path of the thumbnail image
     """
+    import fitz
+
     directory_exists(THUMB_DIR)
-    images = convert_from_path(file, first_page=1, last_page=2, size=(256, 256))
-    base_name = os.path.basename(file)
-    thumb_path = os.path.join(THUMB_DIR, base_name + ".png")
-    images[0].save(thumb_path, 'PNG')
+    thumb_path = thumbnail_path(file)
+    with fitz.open(file) as document:
+        page = document.load_page(0)
+        scale = THUMBNAIL_SIZE / max(page.rect.width, page.rect.height)
+        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+    temp_path = thumb_path + ".tmp.png"
+    pix.save(temp_path)
+    os.replace(temp_path, thumb_path)
+    return thumb_path
+
+
+class ThumbnailQueue:
+    """
+    Bounded queue of books waiting for a thumbnail, served by a background thread. Books queued while the queue
+    is full wait in an overflow and are moved into the queue as it drains, so no book is dropped.
+    """
+
+    def __init__(self, maxsize=THUMBNAIL_QUEUE_SIZE):
+        """
+        Initialize the ThumbnailQueue.
+
+        :param maxsize: the maximum number of books waiting for a thumbnail
+        :precondition: maxsize must be a positive integer
+        :postcondition: the queue is empty, its thread is started on the first enqueued book
+        """
+        self.queue = queue.Queue(maxsize)
+        self.overflow = OrderedDict()
+        self.pending = set()
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def add_listener(self, callback):
+        """
+        Register a function called after each thumbnail is generated.
+
+        :param callback: a function taking the path of the PDF file and the path of its thumbnail
+        :precondition: callback must be safe to call from the background thread
+        :postcondition: callback is called for every thumbnail generated from now on
+        """
+        with self.lock:
+            self.listeners.append(callback)
+
+    def enqueue(self, file):
+        """
+        Queue the generation of the thumbnail of a PDF file.
+
+        :param file: the path to the PDF file
+        :precondition: file must be a valid path to a PDF file
+        :postcondition: the book is queued once, in the overflow if the queue is full
+        """
+        file = os.path.abspath(file)
+        with self.lock:
+            if file in self.pending:
+                return
+            try:
+                self.queue.put_nowait(file)
+            except queue.Full:
+                self.overflow[file] = None
+            self.pending.add(file)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="thumbnails", daemon=True)
+                self.thread.start()
+
+    def run(self):
+        """
+        Generate the thumbnails of the queued books.
+
+        :precondition: called on the background thread only
+        :postcondition: runs until the process exits
+        """
+        while True:
+            file = self.queue.get()
+            with self.lock:
+                while self.overflow and not self.queue.full():
+                    self.queue.put_nowait(self.overflow.popitem(last=False)[0])
+            try:
+                thumb_path = add_thumbnail(file)
+            except Exception as error:
+                print(f"Could not create thumbnail for {file}: {error}")
+                thumb_path = None
+            with self.lock:
+                self.pending.discard(file)
+                listeners = list(self.listeners)
+            if thumb_path is not None:
+                for callback in listeners:
+                    try:
+                        callback(file, thumb_path)
+                    except Exception as error:
+                        print(f"Could not announce thumbnail for {file}: {error}")
+            self.queue.task_done()
+
+    def join(self):
+        """
+        Wait until every queued thumbnail is generated.
+
+        :precondition: none
+        :postcondition: the queue and its overflow are empty
+        """
+        self.queue.join()
+
+
+_thumbnail_queue = None
+
+
+def get_thumbnail_queue():
+    """
+    Return the shared thumbnail queue, creating it on first use.
+
+    :precondition: none
+    :postcondition: the shared ThumbnailQueue exists
+    :return: the shared ThumbnailQueue instance
+    """
+    global _thumbnail_queue
+    if _thumbnail_queue is None:
+        _thumbnail_queue = ThumbnailQueue()
+    return _thumbnail_queue
+
+
+def default_name(file, title):
+    """
+    Choose the name of a book that is not named in the catalog yet.
+
+    :param file: the path to the PDF file
+    :param title: the title in the metadata of the PDF file, or None
+    :precondition: file must be a non-empty string
+    :postcondition: nothing is read
+    :return: the file name without the extension; for a file named after its digest, whose original file name is
+             lost, its title, or UNTITLED_NAME if it has none
+    """
+    if not is_stored_path(file):
+        return book_name(file)
+    return title or UNTITLED_NAME
+
+
+def catalog_record(file, name=None, digest=None):
+    """
+    Read the catalog record of a book in the books directory.
+
+    :param file: the path to the PDF file
+    :param name: the name of the book, or None to name it as default_name does
+    :param digest: the content digest of the file, computed if None
+    :precondition: file must be a valid path to a PDF file
+    :postcondition: the record holds the path of the thumbnail and the bookmark of the book
+    :return: a dictionary as returned by scan_book, with the bookmark of the book
+    """
+    record = scan_book(file, thumbnail=os.path.abspath(thumbnail_path(file)), digest=digest, name=name)
+    if name is None:
+        record["name"] = unique_name(default_name(file, record["title"]), taken_names())
+    record["bookmark"] = get_bookmark_store().get(record["digest"])
+    return record
 
 
 def add_book(file):
     """
-    Add a book to the books directory and create its thumbnail.
+    Add a book to the books directory and the catalog, and create its thumbnail.
 
     :param file: the path to the PDF file
     :precondition: file must be a valid path to a PDF file
-    :postcondition: the PDF file will be copied to the books directory and a thumbnail will be created
-    :return: True if the book was successfully added, False if it already exists
+    :postcondition: content already in the library is not copied; the file is only hashed before it is copied if a
+                    book of the library has the same size, and otherwise hashed while it is copied. A new book is
+                    stored under its digest and recorded in the catalog under its file name, its thumbnail, its
+                    mood index and its search index entries will be built in the background
+    :return: True if the book was successfully added, False if its content is already in the library
     """
-    directory_exists(BOOKS_DIR)
-    file_name = os.path.basename(file)
-    destination = os.path.join(BOOKS_DIR, file_name)
+    from functionalities.mood_index import start_mood_index
 
-    if not os.path.exists(destination):
-        shutil.copy2(file, destination)
-        add_thumbnail(destination)
-        return True
-    else:
+    catalog = get_catalog()
+    if catalog.has_size(os.path.getsize(file)) and catalog.find_digest(file_digest(file)) is not None:
+        return False
+    destination, digest = store_file(file)
+    if catalog.find_digest(digest) is not None:
         return False
+    record = catalog_record(destination, name=unique_name(book_name(file), taken_names()), digest=digest)
+    catalog.put(record)
+    get_thumbnail_queue().enqueue(destination)
+    get_search_index_queue().enqueue(record)
+    start_mood_index(destination)
+    return True
+
+
+def migrate_bookmark(names, digest):
+    """
+    Move a bookmark saved under the name of a book to the digest of its content.
+
+    :param names: the names the bookmark may be saved under, the first one holding a bookmark is kept
+    :param digest: the hexadecimal SHA-256 digest of the book
+    :precondition: names must contain non-empty strings
+    :postcondition: none of the names holds a bookmark, a bookmark already kept under the digest is left unchanged
+    """
+    bookmarks = get_bookmark_store()
+    for name in names:
+        page_num = bookmarks.get(name, None)
+        if page_num is not None:
+            if bookmarks.get(digest, None) is None:
+                bookmarks.set(digest, page_num)
+            bookmarks.remove(name)
+
+
+def adopt_file(file, name):
+    """
+    Move a PDF file placed in the books directory under a name of its own to the path of its digest,
+    together with its thumbnail and mood index.
+
+    :param file: the path to the PDF file in the books directory
+    :param name: the name of the book
+    :precondition: file must not be named after its digest
+    :postcondition: the content is stored once and recorded in the catalog under name, a file whose content is
+                    already stored is removed along with its thumbnail and mood index, and a bookmark saved under
+                    the file name or name is moved to the digest
+    :return: the path the content is stored at
+    """
+    from functionalities.mood_index import mood_index_path
+
+    digest = file_digest(file)
+    destination = stored_path(digest)
+    migrate_bookmark((book_name(file), name), digest)
+    catalog = get_catalog()
+    catalog.remove(file)
+    for old_path, new_path in ((thumbnail_path(file), thumbnail_path(destination)),
+                               (mood_index_path(file), mood_index_path(destination))):
+        if os.path.exists(old_path):
+            if os.path.exists(new_path):
+                os.remove(old_path)
+            else:
+                os.replace(old_path, new_path)
+    if os.path.exists(destination):
+        os.remove(file)
+        if catalog.find_digest(digest) is not None:
+            return destination
+    else:
+        os.replace(file, destination)
+    catalog.put(catalog_record(destination, name=unique_name(name, taken_names()), digest=digest))
+    return destination
+
+
+def named_files():
+    """
+    List the PDF files of the books directory that are not named after their digest yet.
+
+    :precondition: none
+    :postcondition: no file is read
+    :return: a sorted list of absolute paths of PDF files copied into the books directory by hand
+    """
+    directory_exists(BOOKS_DIR)
+    return [os.path.abspath(os.path.join(BOOKS_DIR, file_name)) for file_name in sorted(os.listdir(BOOKS_DIR))
+            if file_name.lower().endswith(".pdf") and not is_stored_path(file_name)]
+
+
+def adopt_named_files():
+    """
+    Move the PDF files copied into the books directory by hand to the path of their digest.
+
+    :precondition: called off the GUI thread, since every file is hashed
+    :postcondition: each file keeps the name it is known by in the catalog, or its file name, a file that could
+                    not be moved is left where it is
+    :return: a list of the paths the files are stored at
+    """
+    names = {book["path"]: book["name"] for book in get_catalog().books()}
+    adopted = []
+    for path in named_files():
+        try:
+            adopted.append(adopt_file(path, names.get(path, book_name(path))))
+        except Exception as error:
+            print(f"Could not store {path}: {error}")
+    return adopted
+
+
+def reconcile_library(background=True):
+    """
+    Bring the catalog in line with the books directory.
+
+    :param background: whether books with a missing or stale thumbnail or search index entries are queued
+                       for background work
+    :precondition: called off the GUI thread, since files copied into the books directory and new or modified
+                   files are read
+    :postcondition: files copied into the books directory by hand are stored under their digest first, keeping
+                    their file name as the book name, then books added or changed outside the application are
+                    scanned and removed books are dropped from the catalog
+    :return: a list of the paths of the books that were stored or scanned
+    """
+    directory_exists(BOOKS_DIR)
+    adopted = adopt_named_files()
+    catalog = get_catalog()
+    paths = [os.path.join(BOOKS_DIR, file_name) for file_name in os.listdir(BOOKS_DIR)
+             if file_name.lower().endswith(".pdf")]
+    names = {book["path"]: book["name"] for book in catalog.books()}
+    scanned = catalog.reconcile(paths, lambda path: catalog_record(path, name=names.get(path)))
+    if background:
+        books = catalog.books()
+        for book in books:
+            if not thumbnail_is_current(book["path"]):
+                get_thumbnail_queue().enqueue(book["path"])
+        sync_search_index(books)
+    return adopted + scanned
 
 
 def get_books():
     """
-    Retrieve a list of all books in the books directory.
+    Retrieve every book of the library from the catalog.
 
     :precondition: none
-    :postcondition: returns a list of absolute paths to the books
-    :return: a list of absolute paths to the books in the books directory
+    :postcondition: the books directory is not read
+    :return: a list of dictionaries describing the books, sorted by name
     """
-    all_books = []
-    for path in os.listdir(BOOKS_DIR):
-        absolute_path = os.path.abspath(os.path.join(BOOKS_DIR, path))
-        all_books.append(absolute_path)
+    return get_catalog().books()
 
-    return all_books
 
+def book_path(name):
+    """
+    Find the file of a book.
 
-def delete_book(book_name):
+    :param name: the name of the book
+    :precondition: name must be a non-empty string
+    :postcondition: nothing is changed
+    :return: the absolute path of the PDF file of the book, or None if no book has that name
     """
-    Delete a book and its associated thumbnail and bookmark.
+    book = get_catalog().book(name)
+    return book["path"] if book is not None else None
 
-    :param book_name: the name of the book
-    :precondition: book_name must be a non-empty string
-    :postcondition: the book, its thumbnail, and its bookmark will be deleted if they exist
+
+def rename_book(old_name, new_name):
     """
-    print("Deleting book " + book_name)
-    if os.path.exists(f"{BOOKS_DIR}/{book_name}.pdf"):
-        os.remove(f"{BOOKS_DIR}/{book_name}.pdf")
-        os.remove(f"{THUMB_DIR}/{book_name}.pdf.png")
+    Rename a book, keeping its file, thumbnail, mood index and bookmark.
 
-    bookmark_json_path = './bookmarks/bookmarks.json'
-    data = {}
-    if os.path.exists(bookmark_json_path):
-        try:
-            with open(bookmark_json_path, 'r') as file:
-                data = json.load(file)
-        except json.JSONDecodeError:
-            data = {}
-    if book_name in data:
-        del data[book_name]
-    with open(bookmark_json_path, 'w') as file:
-        json.dump(data, file)
+    :param old_name: the current name of the book
+    :param new_name: the new name of the book
+    :precondition: old_name and new_name must be non-empty strings
+    :postcondition: the book and its search index entries are known by the new name
+    :return: True if the book was renamed, False if it does not exist or another book has the new name
+    """
+    path = book_path(old_name)
+    if path is None or not get_catalog().rename(old_name, new_name):
+        return False
+    get_search_index().rename_book(path, new_name)
+    return True
+
+
+def delete_book(name):
+    """
+    Delete a book and its associated thumbnail, mood index, bookmark, catalog record and search index entries.
+
+    :param name: the name of the book
+    :precondition: name must be a non-empty string
+    :postcondition: the book and everything associated with it will be deleted if they exist
+    """
+    from functionalities.mood_index import delete_mood_index
 
+    book = get_catalog().book(name)
+    if book is None:
+        print(f"No book named {name}")
+        return
+    path = book["path"]
+    print("Deleting book " + name)
+    get_document_pool().close(path)
+    if os.path.exists(path):
+        os.remove(path)
+    if os.path.exists(thumbnail_path(path)):
+        os.remove(thumbnail_path(path))
+    delete_mood_index(path)
+    get_bookmark_store().remove(book["digest"])
+    get_catalog().remove(path)
+    get_search_index().remove_book(path)
@@ -0,0 +1,163 @@
+import os
+import threading
+from collections import OrderedDict
+
+DOCUMENT_POOL_SIZE = 4
+DOCUMENT_INFO_CACHE_SIZE = 64
+
+
+def file_signature(path):
+    """
+    Identify the current version of a file by its size and modification time.
+
+    :param path: the path to the file
+    :precondition: path must be an existing file
+    :postcondition: the file is not read
+    :return: a (size, mtime) tuple
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime
+
+
+def read_document_info(document):
+    """
+    Read the structure of an open document.
+
+    :param document: an open fitz.Document
+    :precondition: document must not be closed
+    :postcondition: page sizes are read from the page tree without loading the pages
+    :return: a dictionary with the page count, the (width, height) of each page in points and the outline
+             as a list of [level, title, page number] entries
+    """
+    return {
+        "page_count": document.page_count,
+        "page_sizes": [(rect.width, rect.height) for rect in map(document.page_cropbox, range(document.page_count))],
+        "outline": document.get_toc(simple=True),
+    }
+
+
+class DocumentPool:
+    """
+    Keeps the most recently used documents open, closing the least recently used one when the pool is full,
+    and remembers the structure of documents so it is not read again while the file is unchanged.
+    """
+
+    def __init__(self, size=DOCUMENT_POOL_SIZE, info_cache_size=DOCUMENT_INFO_CACHE_SIZE):
+        """
+        Initialize the DocumentPool.
+
+        :param size: the maximum number of documents kept open
+        :param info_cache_size: the maximum number of documents whose structure is remembered
+        :precondition: size and info_cache_size must be positive integers
+        :postcondition: the pool is empty
+        """
+        self.size = size
+        self.info_cache_size = info_cache_size
+        self.documents = OrderedDict()
+        self.infos = OrderedDict()
+        self.lock = threading.RLock()
+
+    def open(self, path):
+        """
+        Return an open document, opening it only if it is not in the pool.
+
+        :param path: the path to the PDF file
+        :precondition: path must be a valid path to a PDF file
+        :postcondition: the document is the most recently used one, and the least recently used document is
+                        closed if the pool was full
+        :return: the open fitz.Document
+        """
+        import fitz
+
+        path = os.path.abspath(path)
+        with self.lock:
+            signature = file_signature(path)
+            entry = self.documents.get(path)
+            if entry is not None and entry[0] == signature and not entry[1].is_closed:
+                self.documents.move_to_end(path)
+                return entry[1]
+            if entry is not None:
+                self.close(path)
+            document = fitz.open(path)
+            self.documents[path] = (signature, document)
+            while len(self.documents) > self.size:
+                _, (_, evicted) = self.documents.popitem(last=False)
+                evicted.close()
+            return document
+
+    def info(self, path):
+        """
+        Return the page count, page sizes and outline of a document.
+
+        :param path: the path to the PDF file
+        :precondition: path must be a valid path to a PDF file
+        :postcondition: the structure is read only if it is not remembered for the current version of the file,
+                        from the pooled document if it is open and otherwise from a handle closed right away, so
+                        no document of the pool is evicted
+        :return: a dictionary as returned by read_document_info
+        """
+        import fitz
+
+        path = os.path.abspath(path)
+        with self.lock:
+            signature = file_signature(path)
+            cached = self.infos.get(path)
+            if cached is not None and cached[0] == signature:
+                self.infos.move_to_end(path)
+                return cached[1]
+            entry = self.documents.get(path)
+            if entry is not None and entry[0] == signature and not entry[1].is_closed:
+                info = read_document_info(entry[1])
+            else:
+                if entry is not None:
+                    self.close(path)
+                with fitz.open(path) as document:
+                    info = read_document_info(document)
+            self.infos[path] = (signature, info)
+            while len(self.infos) > self.info_cache_size:
+                self.infos.popitem(last=False)
+            return info
+
+    def close(self, path):
+        """
+        Close a document and forget its structure.
+
+        :param path: the path to the PDF file
+        :precondition: path must be a non-empty string
+        :postcondition: the document is not open in the pool
+        """
+        path = os.path.abspath(path)
+        with self.lock:
+            entry = self.documents.pop(path, None)
+            self.infos.pop(path, None)
+            if entry is not None:
+                entry[1].close()
+
+    def close_all(self):
+        """
+        Close every document of the pool.
+
+        :precondition: none
+        :postcondition: the pool is empty, remembered structures are kept
+        """
+        with self.lock:
+            while self.documents:
+                _, (_, document) = self.documents.popitem()
+                document.close()
+
+
+_document_pool = None
+
+
+def get_document_pool():
+    """
+    Return the shared document pool, creating it on first use.
+
+    :precondition: none
+    :postcondition: the shared DocumentPool exists
+    :return: the shared DocumentPool instance
+    """
+    global _document_pool
+    if _document_pool is None:
+        _document_pool = DocumentPool()
+    return _document_pool
@@ -0,0 +1,71 @@
+PAGE_TEXT_LIMIT = 4000
+TEXT_BLOCK = 0
+
+
+def iter_text_blocks(page):
+    """
+    Yield the text of the text blocks of a page, in content order, skipping image blocks.
+
+    :param page: a fitz.Page instance
+    :precondition: the document of the page must be open
+    :postcondition: the whole page is extracted before the first block is yielded, blocks without any visible
+                    character are skipped
+    :return: a generator of strings
+    """
+    for block in page.get_text("blocks"):
+        if block[6] == TEXT_BLOCK and block[4].strip():
+            yield block[4]
+
+
+def page_sample(page, limit=PAGE_TEXT_LIMIT):
+    """
+    Extract the text of a page, keeping only enough text to judge its mood.
+
+    :param page: a fitz.Page instance
+    :param limit: the maximum number of characters returned
+    :precondition: limit must be a positive integer
+    :postcondition: the page is extracted whole, the blocks after the limit is reached are not joined
+    :return: a string of at most limit characters, cut at a word boundary when possible, or an empty string
+             if the page has no text
+    """
+    parts = []
+    size = 0
+    for text in iter_text_blocks(page):
+        parts.append(text)
+        size += len(text)
+        if size >= limit:
+            break
+    sample = "".join(parts)
+    if len(sample) <= limit:
+        return sample
+    cut = sample.rfind(" ", 0, limit + 1)
+    return sample[:cut if cut > 0 else limit]
+
+
+def iter_page_samples(document, page_numbers=None, limit=PAGE_TEXT_LIMIT):
+    """
+    Yield the sampled text of pages of a document one page at a time.
+
+    :param document: an open fitz.Document
+    :param page_numbers: an iterable of page numbers, or None for every page
+    :param limit: the maximum number of characters of each page
+    :precondition: page_numbers must be valid page numbers of the document
+    :postcondition: each page is loaded only when its text is requested
+    :return: a generator of (page number, text) tuples, the text being empty for pages without text
+    """
+    if page_numbers is None:
+        page_numbers = range(document.page_count)
+    for page_num in page_numbers:
+        yield page_num, page_sample(document.load_page(page_num), limit)
+
+
+def is_textless(text):
+    """
+    Check whether the text of a page has nothing to analyze, as for scanned or image-only pages.
+
+    :param text: the text of the page
+    :precondition: text must be a string
+    :postcondition: the text is unchanged
+    :return: True if the text holds no visible character, False otherwise
+    """
+    return not text.strip()
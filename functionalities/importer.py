@@ -0,0 +1,187 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from functionalities import crud
+from functionalities.catalog import book_name, file_digest, get_catalog, scan_book
+
+
+def find_pdfs(paths):
+    """
+    Collect the PDF files among the given files and directories.
+
+    :param paths: an iterable of paths to PDF files or to directories containing them
+    :precondition: paths must contain strings
+    :postcondition: directories are searched recursively, files that are not PDFs are skipped
+    :return: a sorted list of absolute paths to PDF files, without repetitions
+    """
+    found = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, files in os.walk(path):
+                found.update(os.path.join(directory, file) for file in files if file.lower().endswith(".pdf"))
+        elif os.path.isfile(path) and path.lower().endswith(".pdf"):
+            found.add(path)
+    return sorted(os.path.abspath(path) for path in found)
+
+
+class ContentIndex:
+    """
+    Detects files whose content is already known. Files are grouped by size and only hashed when
+    another file has the same size, so most files are never read.
+    """
+
+    def __init__(self):
+        """
+        Initialize the ContentIndex.
+
+        :precondition: none
+        :postcondition: the index is empty
+        """
+        self.by_size = {}
+        self.digests = {}
+
+    def digest(self, path):
+        """
+        Return the digest of a file, computing it once.
+
+        :param path: the path to the file
+        :precondition: path must be a readable file
+        :postcondition: the digest is remembered
+        :return: a string with the hexadecimal digest
+        """
+        if path not in self.digests:
+            self.digests[path] = file_digest(path)
+        return self.digests[path]
+
+    def add_known(self, path, size, digest):
+        """
+        Add a file whose size and digest are already known to the index.
+
+        :param path: the path to the file
+        :param size: the size of the file in bytes
+        :param digest: the hexadecimal SHA-256 digest of the file
+        :precondition: size and digest must match the content of the file
+        :postcondition: the file is indexed without being read
+        """
+        self.digests[path] = digest
+        self.by_size.setdefault(size, []).append(path)
+
+    def add(self, path):
+        """
+        Add a file to the index unless a file with the same content is already in it.
+
+        :param path: the path to the file
+        :precondition: path must be a readable file
+        :postcondition: the file is indexed if its content is new
+        :return: the path of the indexed file with the same content, or None if the content is new
+        """
+        same_size = self.by_size.setdefault(os.path.getsize(path), [])
+        if same_size:
+            digest = self.digest(path)
+            for other in same_size:
+                if self.digest(other) == digest:
+                    return other
+        same_size.append(path)
+        return None
+
+
+def plan_import(sources):
+    """
+    Decide which files to import and what to name them, skipping content that is already in the library.
+
+    :param sources: a list of paths to PDF files
+    :precondition: the catalog must be in line with the books directory
+    :postcondition: nothing is copied, the books of the library are compared through their catalog records
+    :return: a tuple of (list of (source, name) pairs, list of (source, duplicate of) pairs)
+    """
+    index = ContentIndex()
+    taken = crud.taken_names()
+    for book in get_catalog().books():
+        index.add_known(book["path"], book["size"], book["digest"])
+    planned = []
+    duplicates = []
+    for source in sources:
+        original = index.add(source)
+        if original is None:
+            planned.append((source, crud.unique_name(book_name(source), taken)))
+        else:
+            duplicates.append((source, original))
+    return planned, duplicates
+
+
+def import_file(source, name):
+    """
+    Store a PDF file in the books directory under its digest, create its thumbnail and read its catalog record.
+
+    :param source: the path to the PDF file
+    :param name: the name of the book
+    :precondition: the content of source must not be stored yet
+    :postcondition: the book and its thumbnail exist, or neither does if any step failed
+    :return: a dictionary as returned by scan_book for the stored file
+    """
+    destination = None
+    try:
+        destination, digest = crud.store_file(source)
+        thumb_path = crud.add_thumbnail(destination)
+        return scan_book(destination, thumbnail=os.path.abspath(thumb_path), digest=digest, name=name)
+    except Exception:
+        if destination is not None and os.path.exists(destination):
+            os.remove(destination)
+        raise
+
+
+def import_pool(max_workers=None):
+    """
+    Create a process pool for importing books in parallel.
+
+    :param max_workers: the number of worker processes, defaulting to the number of CPUs
+    :precondition: max_workers must be a positive integer or None
+    :postcondition: returns a pool whose workers are spawned rather than forked, so it is safe to create from a GUI
+    :return: a ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def import_books(paths, executor=None, progress=None):
+    """
+    Import many PDF files at once, copying and thumbnailing them in parallel.
+
+    :param paths: an iterable of paths to PDF files or to directories containing them
+    :param executor: the pool to import the files with, a temporary process pool is created if None
+    :param progress: a function called with the number of files handled and the total after each file
+    :precondition: paths must contain strings
+    :postcondition: every file whose content is not in the library yet is stored under its digest with its
+                    thumbnail and recorded in the catalog under its file name
+    :return: a dictionary listing the added books, the skipped duplicates and the files that failed
+    """
+    crud.directory_exists(crud.BOOKS_DIR)
+    crud.directory_exists(crud.THUMB_DIR)
+    planned, duplicates = plan_import(find_pdfs(paths))
+    result = {"added": [], "duplicates": duplicates, "failed": []}
+    total = len(planned) + len(duplicates)
+    done = len(duplicates)
+    if progress is not None:
+        progress(done, total)
+    if not planned:
+        return result
+
+    pool = executor if executor is not None else import_pool(min(len(planned), os.cpu_count() or 1))
+    try:
+        futures = {pool.submit(import_file, source, name): source for source, name in planned}
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+                get_catalog().put(record)
+                result["added"].append(record["path"])
+            except Exception as error:
+                print(f"Could not import {futures[future]}: {error}")
+                result["failed"].append(futures[future])
+            done += 1
+            if progress is not None:
+                progress(done, total)
+    finally:
+        if executor is None:
+            pool.shutdown()
+    result["added"].sort()
+    return result
@@ -0,0 +1,151 @@
+import importlib.util
+import os
+import re
+from xml.etree import ElementTree
+
+import numpy as np
+
+# Single characters are skipped, which keeps a negation attached across them ("not a good").
+TOKEN_PATTERN = re.compile(r"[a-z0-9]{2,}|!")
+NEGATIONS = ("no", "not", "never")
+MODIFIER_POS = "RB"
+ADJECTIVE_POS = "JJ"
+NEGATION_FACTOR = -0.5
+EXCLAMATION_FACTOR = 1.25
+
+
+def textblob_lexicon_path():
+    """
+    Find the sentiment lexicon shipped with TextBlob without importing TextBlob.
+
+    :precondition: textblob must be installed
+    :postcondition: textblob is not imported
+    :return: a string representing the path of en-sentiment.xml
+    """
+    package_dir = importlib.util.find_spec("textblob").submodule_search_locations[0]
+    return os.path.join(package_dir, "en", "en-sentiment.xml")
+
+
+class LexiconScorer:
+    """
+    Lexicon-based sentiment scorer that scores many pages at once with NumPy, using the
+    TextBlob/pattern lexicon and its averaging, modifier, negation and exclamation rules.
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialize the LexiconScorer and load the lexicon into arrays.
+
+        :param path: the path of a pattern sentiment XML lexicon, TextBlob's lexicon if None
+        :precondition: path must be a valid path to a lexicon file or None
+        :postcondition: the vocabulary and its polarity, intensity, modifier and negation arrays are loaded
+        """
+        senses = {}
+        for word in ElementTree.parse(path or textblob_lexicon_path()).getroot().findall("word"):
+            form = word.attrib.get("form")
+            if form:
+                scores = (float(word.attrib.get("polarity", 0.0)), float(word.attrib.get("intensity", 1.0)))
+                senses.setdefault(form, {}).setdefault(word.attrib.get("pos"), []).append(scores)
+
+        entries = {}
+        for form, by_pos in senses.items():
+            # Average every sense per part-of-speech tag, then average the tags, like pattern does.
+            per_pos = {pos: np.mean(scores, axis=0) for pos, scores in by_pos.items()}
+            word_polarity, word_intensity = np.mean(list(per_pos.values()), axis=0)
+            entries[form] = (word_polarity, word_intensity, MODIFIER_POS in by_pos)
+        for form, by_pos in senses.items():
+            # TextBlob maps adjectives onto adverbs ("terrible" to "terribly") with the adjective's scores.
+            if ADJECTIVE_POS in by_pos:
+                adverb = form[:-1] + "i" if form.endswith("y") else form
+                adverb = adverb[:-2] if adverb.endswith("le") else adverb
+                word_polarity, word_intensity = np.mean(by_pos[ADJECTIVE_POS], axis=0)
+                entries[adverb + "ly"] = (word_polarity, word_intensity, True)
+
+        self.vocabulary = {}
+        polarity, intensity, modifier = [], [], []
+        for form, (word_polarity, word_intensity, word_modifier) in entries.items():
+            self.vocabulary[form] = len(polarity)
+            polarity.append(word_polarity)
+            intensity.append(word_intensity)
+            modifier.append(word_modifier)
+        self.vocabulary.update((word, index) for index, word in enumerate(NEGATIONS, len(polarity))
+                               if word not in self.vocabulary)
+        padding = len(self.vocabulary) - len(polarity)
+        self.polarity = np.array(polarity + [0.0] * padding)
+        self.intensity = np.array(intensity + [1.0] * padding)
+        self.modifier = np.array(modifier + [False] * padding)
+        self.known = np.array([True] * len(polarity) + [False] * padding)
+        self.negation = np.zeros(len(self.vocabulary), dtype=bool)
+        self.negation[[self.vocabulary[word] for word in NEGATIONS]] = True
+        self.exclamation = len(self.vocabulary)
+
+    def tokenize(self, texts):
+        """
+        Tokenize many pages into one array of vocabulary ids.
+
+        :param texts: a list of page texts
+        :precondition: texts must contain strings
+        :postcondition: words outside the vocabulary get id -1 and "!" gets the exclamation id
+        :return: a tuple of (token ids, page index of each token) arrays
+        """
+        tokens = []
+        pages = []
+        for page_index, text in enumerate(texts):
+            words = TOKEN_PATTERN.findall(text.lower())
+            tokens.extend(words)
+            pages.append(np.full(len(words), page_index, dtype=np.int32))
+        if not tokens:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+        unique, inverse = np.unique(np.array(tokens), return_inverse=True)
+        lookup = np.array([self.exclamation if word == "!" else self.vocabulary.get(word, -1) for word in unique])
+        return lookup[inverse], np.concatenate(pages)
+
+    def polarities(self, texts):
+        """
+        Compute the sentiment polarity of many pages in one vectorized pass.
+
+        :param texts: an iterable of page texts
+        :precondition: texts must contain strings
+        :postcondition: pages without any known word get a polarity of 0.0
+        :return: a NumPy array of floats between -1.0 and 1.0, in the order of texts
+        """
+        texts = list(texts)
+        ids, pages = self.tokenize(texts)
+        in_vocabulary = (ids >= 0) & (ids < self.exclamation)
+        safe_ids = np.where(in_vocabulary, ids, 0)
+        known = in_vocabulary & self.known[safe_ids]
+        score = np.where(known, self.polarity[safe_ids], 0.0)
+        modifier = known & self.modifier[safe_ids]
+        negation = in_vocabulary & self.negation[safe_ids]
+        intensity = np.where(known, self.intensity[safe_ids], 1.0)
+
+        same_page = np.zeros(len(ids), dtype=bool)
+        same_page[1:] = pages[1:] == pages[:-1]
+        previous_modifier = np.zeros(len(ids), dtype=bool)
+        previous_modifier[1:] = modifier[:-1]
+        previous_negation = np.zeros(len(ids), dtype=bool)
+        previous_negation[1:] = negation[:-1]
+        previous_intensity = np.ones(len(ids))
+        previous_intensity[1:] = intensity[:-1]
+
+        # "very good": the modifier is folded into the word it modifies,
+        # and a negated modifier ("not very good") weakens the word instead.
+        negation_before_modifier = np.zeros(len(ids), dtype=bool)
+        negation_before_modifier[2:] = negation[:-2] & (pages[2:] == pages[:-2])
+        modified = known & same_page & previous_modifier
+        factor = np.where(negation_before_modifier, 1.0 / previous_intensity, previous_intensity)
+        score = np.where(modified, np.clip(score * factor, -1.0, 1.0), score)
+        absorbed = np.zeros(len(ids), dtype=bool)
+        absorbed[:-1] = modified[1:]
+        # "not good" is slightly bad, "not bad" is slightly good.
+        negated = known & same_page & (previous_negation | (modified & negation_before_modifier))
+        score = np.where(negated, score * NEGATION_FACTOR, score)
+        # "good!": an exclamation mark boosts the word before it.
+        boosted = np.zeros(len(ids), dtype=bool)
+        boosted[:-1] = (ids[1:] == self.exclamation) & same_page[1:]
+        score = np.where(boosted & known, np.clip(score * EXCLAMATION_FACTOR, -1.0, 1.0), score)
+
+        counted = known & ~absorbed
+        totals = np.bincount(pages[counted], weights=score[counted], minlength=len(texts))
+        counts = np.bincount(pages[counted], minlength=len(texts))
+        return totals / np.maximum(counts, 1)
@@ -0,0 +1,263 @@
+import json
+import os
+import threading
+
+from functionalities.extraction import is_textless, iter_page_samples
+from functionalities.sound import ANALYSIS_PARALLEL_THRESHOLD, MOODS, analysis_pool, mood_for_polarity, \
+    page_polarities
+
+MOODS_DIR = './moods'
+MOOD_INDEX_BATCH = 64
+UNSCORED = "."
+TEXTLESS = "-"
+
+_indexes = {}
+_builders = {}
+_lock = threading.Lock()
+_stopping = threading.Event()
+
+
+def mood_index_path(book_path):
+    """
+    Build the path of the mood index of a book.
+
+    :param book_path: the path to the PDF file
+    :precondition: book_path must be a non-empty string
+    :postcondition: the path is stable for a given book file name
+    :return: a string representing the path of the mood index in the moods directory
+    """
+    return os.path.join(MOODS_DIR, os.path.basename(book_path) + ".moods.json")
+
+
+class MoodIndex:
+    """
+    Per-page moods and polarities of a book, stored as one mood code character per page. Pages without
+    text are marked TEXTLESS and take the mood of the page before them.
+    """
+
+    def __init__(self, path, page_count, codes=None, polarities=None):
+        """
+        Initialize the MoodIndex.
+
+        :param path: the path the index is saved to
+        :param page_count: the number of pages in the book
+        :param codes: a list with one mood code per page, UNSCORED for pages not scored yet
+        :param polarities: a list with one polarity per page, None for pages not scored yet
+        :precondition: codes and polarities must have page_count items when given
+        :postcondition: the index holds the given scores, or no scores at all
+        """
+        self.path = path
+        self.page_count = page_count
+        self.codes = codes if codes is not None else [UNSCORED] * page_count
+        self.polarities = polarities if polarities is not None else [None] * page_count
+
+    @classmethod
+    def load(cls, book_path, page_count):
+        """
+        Load the mood index of a book, starting a new one if it is missing or does not match the book.
+
+        :param book_path: the path to the PDF file
+        :param page_count: the number of pages in the book
+        :precondition: page_count must be a positive integer
+        :postcondition: returns an index with page_count pages
+        :return: the MoodIndex of the book
+        """
+        path = mood_index_path(book_path)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as file:
+                    data = json.load(file)
+                if data["page_count"] == page_count:
+                    return cls(path, page_count, list(data["moods"]), data["polarity"])
+            except (OSError, KeyError, json.JSONDecodeError):
+                pass
+        return cls(path, page_count)
+
+    def save(self):
+        """
+        Atomically write the index to its file.
+
+        :precondition: none
+        :postcondition: the file holds the scores recorded so far
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {"page_count": self.page_count, "moods": "".join(self.codes), "polarity": self.polarities}
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(data, file, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+
+    def mood(self, page_num):
+        """
+        Look up the mood of a page.
+
+        :param page_num: the page number
+        :precondition: page_num must be a valid page number
+        :postcondition: the index is unchanged
+        :return: a string representing the mood, the mood of the closest earlier page with text for a page
+                 without text, or None if the page has not been scored yet
+        """
+        while page_num >= 0 and self.codes[page_num] == TEXTLESS:
+            page_num -= 1
+        if page_num < 0:
+            return None
+        code = self.codes[page_num]
+        return None if code == UNSCORED else MOODS[int(code)]
+
+    def record(self, page_num, polarity):
+        """
+        Record the polarity of a page and the mood it maps to.
+
+        :param page_num: the page number
+        :param polarity: the sentiment polarity of the page
+        :precondition: page_num must be a valid page number
+        :postcondition: the page is scored
+        """
+        self.polarities[page_num] = round(polarity, 4)
+        self.codes[page_num] = str(MOODS.index(mood_for_polarity(polarity)))
+
+    def record_textless(self, page_num):
+        """
+        Record that a page has no text to analyze.
+
+        :param page_num: the page number
+        :precondition: page_num must be a valid page number
+        :postcondition: the page is scored without a polarity of its own
+        """
+        self.polarities[page_num] = None
+        self.codes[page_num] = TEXTLESS
+
+    def unscored_pages(self):
+        """
+        List the pages that have not been scored yet.
+
+        :precondition: none
+        :postcondition: the index is unchanged
+        :return: a list of page numbers
+        """
+        return [page_num for page_num, code in enumerate(self.codes) if code == UNSCORED]
+
+    def is_complete(self):
+        """
+        Check whether every page has been scored.
+
+        :precondition: none
+        :postcondition: the index is unchanged
+        :return: True if every page is scored, False otherwise
+        """
+        return UNSCORED not in self.codes
+
+
+def get_mood_index(book_path, page_count):
+    """
+    Return the shared mood index of a book, loading it on first use.
+
+    :param book_path: the path to the PDF file
+    :param page_count: the number of pages in the book
+    :precondition: page_count must be a positive integer
+    :postcondition: readers and the background pass share the same MoodIndex
+    :return: the MoodIndex of the book
+    """
+    book_path = os.path.abspath(book_path)
+    with _lock:
+        index = _indexes.get(book_path)
+        if index is None or index.page_count != page_count:
+            index = MoodIndex.load(book_path, page_count)
+            _indexes[book_path] = index
+        return index
+
+
+def build_mood_index(book_path):
+    """
+    Score every page of a book that has not been scored yet, saving progress as it goes.
+
+    :param book_path: the path to the PDF file
+    :precondition: book_path must be a valid path to a PDF file
+    :postcondition: every page is scored and the index is saved, resuming where an earlier pass stopped;
+                    only the first PAGE_TEXT_LIMIT characters of a page are analyzed and pages without text
+                    are not analyzed; the pass stops after its current batch once stop_mood_indexes is called
+    :return: the MoodIndex of the book
+    """
+    import fitz
+
+    with fitz.open(book_path) as document:
+        index = get_mood_index(book_path, len(document))
+        pages = index.unscored_pages()
+        executor = analysis_pool() if len(pages) >= ANALYSIS_PARALLEL_THRESHOLD else None
+        try:
+            for start in range(0, len(pages), MOOD_INDEX_BATCH):
+                if _stopping.is_set():
+                    break
+                samples = []
+                for page_num, text in iter_page_samples(document, pages[start:start + MOOD_INDEX_BATCH]):
+                    if is_textless(text):
+                        index.record_textless(page_num)
+                    else:
+                        samples.append((page_num, text))
+                texts = [text for _, text in samples]
+                for (page_num, _), polarity in zip(samples, page_polarities(texts, executor)):
+                    index.record(page_num, polarity)
+                index.save()
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+    return index
+
+
+def start_mood_index(book_path):
+    """
+    Build the mood index of a book on a background thread.
+
+    :param book_path: the path to the PDF file
+    :precondition: book_path must be a valid path to a PDF file
+    :postcondition: at most one background pass runs per book
+    :return: the thread running the pass
+    """
+    def build():
+        try:
+            build_mood_index(book_path)
+        except Exception as error:
+            if not _stopping.is_set():
+                print(f"Could not index moods of {book_path}: {error}")
+        finally:
+            with _lock:
+                _builders.pop(book_path, None)
+
+    book_path = os.path.abspath(book_path)
+    with _lock:
+        thread = _builders.get(book_path)
+        if thread is None:
+            thread = threading.Thread(target=build, name=f"mood-index:{book_path}", daemon=True)
+            _builders[book_path] = thread
+            thread.start()
+        return thread
+
+
+def stop_mood_indexes():
+    """
+    Stop the background passes building mood indexes, before the application exits.
+
+    :precondition: none
+    :postcondition: every pass has stopped after its current batch and kept the pages it scored, and its process
+                    pool is shut down, so nothing is left running while the interpreter exits
+    """
+    _stopping.set()
+    with _lock:
+        threads = list(_builders.values())
+    for thread in threads:
+        thread.join()
+
+
+def delete_mood_index(book_path):
+    """
+    Delete the mood index of a book.
+
+    :param book_path: the path to the PDF file
+    :precondition: book_path must be a non-empty string
+    :postcondition: the index file is removed and forgotten if it exists
+    """
+    with _lock:
+        _indexes.pop(os.path.abspath(book_path), None)
+    path = mood_index_path(book_path)
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,286 @@
+import csv
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+PROFILE_WINDOW = 512
+PROFILE_DUMP_PATH = './profiles/profile.json'
+PROFILE_PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_samples, percent):
+    """
+    Return a percentile of samples by the nearest-rank method.
+
+    :param sorted_samples: a non-empty list of numbers in ascending order
+    :param percent: the percentile, between 0 and 100
+    :precondition: sorted_samples must be sorted
+    :postcondition: the samples are unchanged
+    :return: the smallest sample that at least percent percent of the samples are less than or equal to
+    """
+    rank = max(1, math.ceil(percent / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+class Span:
+    """
+    Times the block it is entered around and records the duration with its profiler.
+    """
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        """
+        Initialize the Span.
+
+        :param profiler: the Profiler the duration is recorded with
+        :param name: the name of the stage being timed
+        :precondition: name must be a non-empty string
+        :postcondition: the span is not started
+        """
+        self.profiler = profiler
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        """
+        Start timing.
+
+        :precondition: none
+        :postcondition: the start time is taken
+        :return: the Span
+        """
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Stop timing and record the duration, whether or not the block raised.
+
+        :precondition: the span must have been entered
+        :postcondition: the duration is recorded with the profiler
+        """
+        self.profiler.record(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+class NullSpan:
+    """
+    Span used while profiling is off, doing nothing when entered.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        """
+        Do nothing.
+
+        :precondition: none
+        :postcondition: nothing is timed
+        :return: the NullSpan
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Do nothing.
+
+        :precondition: none
+        :postcondition: nothing is recorded
+        """
+
+
+NULL_SPAN = NullSpan()
+
+
+class Profiler:
+    """
+    Rolling latency samples and counters of the stages of a page turn. Each stage keeps its last
+    PROFILE_WINDOW durations, from which its percentiles are computed. While the profiler is off,
+    spans and counters return immediately.
+    """
+
+    def __init__(self, enabled=False, window=PROFILE_WINDOW):
+        """
+        Initialize the Profiler.
+
+        :param enabled: whether samples are recorded
+        :param window: the number of durations kept for each stage
+        :precondition: window must be a positive integer
+        :postcondition: no sample is recorded
+        """
+        self.enabled = enabled
+        self.window = window
+        self.samples = {}
+        self.totals = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def span(self, name):
+        """
+        Return a context manager timing a stage.
+
+        :param name: the name of the stage
+        :precondition: name must be a non-empty string
+        :postcondition: the duration of the block is recorded if the profiler is on
+        :return: a Span, or NULL_SPAN if the profiler is off
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name)
+
+    def record(self, name, milliseconds):
+        """
+        Record the duration of a stage.
+
+        :param name: the name of the stage
+        :param milliseconds: the duration in milliseconds
+        :precondition: milliseconds must be a non-negative number
+        :postcondition: the oldest duration of the stage is dropped if its window is full
+        """
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(milliseconds)
+            self.totals[name] = self.totals.get(name, 0) + 1
+
+    def count(self, name, amount=1):
+        """
+        Add to a counter.
+
+        :param name: the name of the counter
+        :param amount: the amount added
+        :precondition: amount must be an integer
+        :postcondition: the counter is increased if the profiler is on
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_enabled(self, enabled):
+        """
+        Switch recording on or off, keeping the samples recorded so far.
+
+        :param enabled: whether samples are recorded
+        :precondition: enabled must be a boolean
+        :postcondition: spans started from now on follow the new setting
+        """
+        self.enabled = enabled
+
+    def reset(self):
+        """
+        Forget every sample and counter.
+
+        :precondition: none
+        :postcondition: no sample is recorded
+        """
+        with self.lock:
+            self.samples.clear()
+            self.totals.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        """
+        Summarize the samples and counters.
+
+        :precondition: none
+        :postcondition: the samples are unchanged
+        :return: a dictionary with, for each stage, the number of durations recorded and the p50, p95, p99 and
+                 maximum of its window in milliseconds, and the value of each counter
+        """
+        with self.lock:
+            samples = {name: sorted(durations) for name, durations in self.samples.items()}
+            totals = dict(self.totals)
+            counters = dict(self.counters)
+        spans = {}
+        for name, durations in sorted(samples.items()):
+            spans[name] = {"count": totals[name],
+                           **{f"p{percent}_ms": round(percentile(durations, percent), 3)
+                              for percent in PROFILE_PERCENTILES},
+                           "max_ms": round(durations[-1], 3)}
+        return {"spans": spans, "counters": dict(sorted(counters.items()))}
+
+    def dump(self, path=PROFILE_DUMP_PATH):
+        """
+        Write a snapshot to a JSON file, or to a CSV file if path ends with .csv.
+
+        :param path: the path of the file
+        :precondition: path must be a non-empty string
+        :postcondition: the file holds the latest snapshot, written atomically
+        """
+        snapshot = self.snapshot()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, 'w', newline='') as file:
+                if path.endswith(".csv"):
+                    writer = csv.writer(file)
+                    columns = ["count"] + [f"p{percent}_ms" for percent in PROFILE_PERCENTILES] + ["max_ms"]
+                    writer.writerow(["name"] + columns)
+                    for name, stats in snapshot["spans"].items():
+                        writer.writerow([name] + [stats[column] for column in columns])
+                    for name, value in snapshot["counters"].items():
+                        writer.writerow([name, value] + [""] * (len(columns) - 1))
+                else:
+                    json.dump({"time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **snapshot}, file, indent=2)
+            os.replace(temp_path, path)
+        except OSError as error:
+            print(f"Could not save profile: {error}")
+
+    def report(self):
+        """
+        Format a snapshot as lines of text.
+
+        :precondition: none
+        :postcondition: the samples are unchanged
+        :return: a string with one line per stage and per counter
+        """
+        snapshot = self.snapshot()
+        lines = [f"{name}: p50 {stats['p50_ms']:.1f} p95 {stats['p95_ms']:.1f} p99 {stats['p99_ms']:.1f} ms "
+                 f"({stats['count']})" for name, stats in snapshot["spans"].items()]
+        lines += [f"{name}: {value}" for name, value in snapshot["counters"].items()]
+        return "\n".join(lines)
+
+
+_profiler = Profiler(enabled=os.getenv("BOOKSMART_PROFILE", "") not in ("", "0"))
+
+
+def get_profiler():
+    """
+    Return the shared profiler, on when the BOOKSMART_PROFILE environment variable is set to a value other than 0.
+
+    :precondition: none
+    :postcondition: the shared Profiler is unchanged
+    :return: the shared Profiler instance
+    """
+    return _profiler
+
+
+def span(name):
+    """
+    Return a context manager timing a stage with the shared profiler.
+
+    :param name: the name of the stage
+    :precondition: name must be a non-empty string
+    :postcondition: the duration of the block is recorded if profiling is on
+    :return: a Span, or NULL_SPAN if profiling is off
+    """
+    return _profiler.span(name)
+
+
+def count(name, amount=1):
+    """
+    Add to a counter of the shared profiler.
+
+    :param name: the name of the counter
+    :param amount: the amount added
+    :precondition: amount must be an integer
+    :postcondition: the counter is increased if profiling is on
+    """
+    _profiler.count(name, amount)
@@ -0,0 +1,283 @@
+import os
+import queue
+import re
+import sqlite3
+import threading
+
+SEARCH_INDEX_PATH = './catalog/search.db'
+SEARCH_RESULTS = 50
+SNIPPET_TOKENS = 12
+SEARCH_TERM_PATTERN = re.compile(r"\w+")
+
+
+def search_query(text):
+    """
+    Turn what a reader typed into an FTS5 query.
+
+    :param text: the text typed by the reader
+    :precondition: text must be a string
+    :postcondition: operators and quotes in the text are treated as plain words
+    :return: a query matching pages that contain every word, the last one as a prefix, or None if there are no words
+    """
+    terms = SEARCH_TERM_PATTERN.findall(text)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 index of the text of every page of the library. Each book is indexed together with the
+    digest of its content, so a book is only extracted again when its file changes.
+    """
+
+    def __init__(self, path=SEARCH_INDEX_PATH):
+        """
+        Initialize the SearchIndex, creating its database if it does not exist.
+
+        :param path: the path of the SQLite database, or ":memory:"
+        :precondition: path must be a non-empty string
+        :postcondition: the pages and indexed_books tables exist
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5 (
+                    text, name UNINDEXED, path UNINDEXED, page UNINDEXED, tokenize = 'unicode61 remove_diacritics 2'
+                )""")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS indexed_books (
+                    path TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL
+                )""")
+
+    def is_indexed(self, path, digest):
+        """
+        Check whether the current content of a book is in the index.
+
+        :param path: the path to the PDF file
+        :param digest: the content digest of the file
+        :precondition: path and digest must be non-empty strings
+        :postcondition: the index is unchanged
+        :return: True if the book was indexed with this digest, False otherwise
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT digest FROM indexed_books WHERE path = ?", (path,)).fetchone()
+        return row is not None and row["digest"] == digest
+
+    def add_book(self, path, name, digest, page_texts):
+        """
+        Replace the pages of a book in the index.
+
+        :param path: the path to the PDF file
+        :param name: the name of the book
+        :param digest: the content digest of the file
+        :param page_texts: an iterable of the text of each page, in page order
+        :precondition: page_texts must contain strings
+        :postcondition: the index holds exactly the given pages for the book
+        """
+        rows = [(text, name, path, page_num) for page_num, text in enumerate(page_texts)]
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM pages WHERE path = ?", (path,))
+            self.connection.executemany("INSERT INTO pages (text, name, path, page) VALUES (?, ?, ?, ?)", rows)
+            self.connection.execute("INSERT OR REPLACE INTO indexed_books (path, digest) VALUES (?, ?)", (path, digest))
+
+    def remove_book(self, path):
+        """
+        Remove the pages of a book from the index.
+
+        :param path: the path to the PDF file
+        :precondition: path must be a non-empty string
+        :postcondition: no page of the book is in the index
+        """
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM pages WHERE path = ?", (path,))
+            self.connection.execute("DELETE FROM indexed_books WHERE path = ?", (path,))
+
+    def rename_book(self, path, name):
+        """
+        Change the name of a book in the index, keeping its pages.
+
+        :param path: the path to the PDF file
+        :param name: the new name of the book
+        :precondition: path and name must be non-empty strings
+        :postcondition: search results for the book carry the new name
+        """
+        with self.lock, self.connection:
+            self.connection.execute("UPDATE pages SET name = ? WHERE path = ?", (name, path))
+
+    def indexed_paths(self):
+        """
+        Return the paths of the books in the index.
+
+        :precondition: none
+        :postcondition: the index is unchanged
+        :return: a set of paths to PDF files
+        """
+        with self.lock:
+            return {row["path"] for row in self.connection.execute("SELECT path FROM indexed_books")}
+
+    def search(self, text, limit=SEARCH_RESULTS):
+        """
+        Find the pages of the library matching what a reader typed, best matches first.
+
+        :param text: the text typed by the reader
+        :param limit: the maximum number of results
+        :precondition: limit must be a positive integer
+        :postcondition: the index is unchanged
+        :return: a list of dictionaries with the name and path of the book, the page number and a snippet
+        """
+        query = search_query(text)
+        if query is None:
+            return []
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT name, path, page, snippet(pages, 0, '[', ']', '...', ?) AS snippet "
+                "FROM pages WHERE pages MATCH ? ORDER BY rank LIMIT ?", (SNIPPET_TOKENS, query, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        """
+        Close the database.
+
+        :precondition: none
+        :postcondition: the index can no longer be used
+        """
+        with self.lock:
+            self.connection.close()
+
+
+def extract_page_texts(path):
+    """
+    Extract the text of every page of a book.
+
+    :param path: the path to the PDF file
+    :precondition: path must be a valid path to a PDF file
+    :postcondition: the book is opened and closed
+    :return: a list with the text of each page
+    """
+    import fitz
+
+    with fitz.open(path) as document:
+        return [page.get_text() for page in document]
+
+
+class SearchIndexQueue:
+    """
+    Queue of books waiting to be indexed, served by a background thread.
+    """
+
+    def __init__(self, index):
+        """
+        Initialize the SearchIndexQueue.
+
+        :param index: the SearchIndex to add the books to
+        :precondition: none
+        :postcondition: the queue is empty, its thread is started on the first enqueued book
+        """
+        self.index = index
+        self.queue = queue.Queue()
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def enqueue(self, book):
+        """
+        Queue the indexing of a book unless its current content is already indexed.
+
+        :param book: the catalog record of the book
+        :precondition: book must hold the path, name and digest of the book
+        :postcondition: the book is queued at most once
+        :return: True if the book is waiting to be indexed, False if it is up to date
+        """
+        if self.index.is_indexed(book["path"], book["digest"]):
+            return False
+        with self.lock:
+            if book["path"] in self.pending:
+                return True
+            self.pending.add(book["path"])
+            self.queue.put(book)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="search-index", daemon=True)
+                self.thread.start()
+            return True
+
+    def run(self):
+        """
+        Index the queued books.
+
+        :precondition: called on the background thread only
+        :postcondition: runs until the process exits
+        """
+        while True:
+            book = self.queue.get()
+            try:
+                if not self.index.is_indexed(book["path"], book["digest"]):
+                    self.index.add_book(book["path"], book["name"], book["digest"], extract_page_texts(book["path"]))
+            except Exception as error:
+                print(f"Could not index {book['path']}: {error}")
+            with self.lock:
+                self.pending.discard(book["path"])
+            self.queue.task_done()
+
+    def join(self):
+        """
+        Wait until every queued book is indexed.
+
+        :precondition: none
+        :postcondition: the queue is empty
+        """
+        self.queue.join()
+
+
+_search_index = None
+_search_index_queue = None
+
+
+def get_search_index():
+    """
+    Return the shared search index, opening it on first use.
+
+    :precondition: none
+    :postcondition: the shared SearchIndex exists
+    :return: the shared SearchIndex instance
+    """
+    global _search_index
+    if _search_index is None:
+        _search_index = SearchIndex()
+    return _search_index
+
+
+def get_search_index_queue():
+    """
+    Return the shared queue of books waiting to be indexed, creating it on first use.
+
+    :precondition: none
+    :postcondition: the shared SearchIndexQueue exists
+    :return: the shared SearchIndexQueue instance
+    """
+    global _search_index_queue
+    if _search_index_queue is None:
+        _search_index_queue = SearchIndexQueue(get_search_index())
+    return _search_index_queue
+
+
+def sync_search_index(books):
+    """
+    Queue the books whose content is not indexed yet and drop the books that left the library.
+
+    :param books: a list of catalog records of every book of the library
+    :precondition: books must hold the path, name and digest of each book
+    :postcondition: only new or changed books are queued for indexing
+    """
+    index = get_search_index()
+    for path in index.indexed_paths() - {book["path"] for book in books}:
+        index.remove_book(path)
+    for book in books:
+        get_search_index_queue().enqueue(book)
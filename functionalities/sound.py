@@ -1,25 +1,236 @@
-from textblob import TextBlob
-import requests
+import hashlib
+import json
+import multiprocessing
 import os
-from dotenv import load_dotenv
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
 
-load_dotenv()
-FREESOUND_API_KEY = os.getenv('FREESOUND_API_KEY')
+from functionalities.profiling import span
 
+# TextBlob, requests and python-dotenv are imported where they are first needed,
+# so importing this module does not slow down the start of the application.
+FREESOUND_API_URL = 'https://freesound.org/apiv2'
+FREESOUND_TIMEOUT = (3.05, 10)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_BACKOFF_MAX = 4
 
-def analyze_page(page):
+SOUND_CACHE_PATH = './cache/sounds.json'
+SOUND_CACHE_TTL = 7 * 24 * 60 * 60
+SOUND_CACHE_SIZE = 32
+AUDIO_CACHE_DIR = './cache/audio'
+PREFETCH_WORKERS = 4
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+SENTIMENT_BACKENDS = ("textblob", "lexicon")
+SENTIMENT_BACKEND = None
+ANALYSIS_CHUNK_SIZE = 16
+ANALYSIS_PARALLEL_THRESHOLD = 64
+MOODS = ("excited", "happy", "calm", "neutral", "sad", "fearful", "angry")
+
+
+_environment_loaded = False
+
+
+def load_environment():
     """
-    Analyze the sentiment of a page and determine the mood.
+    Load the variables of the .env file into the environment, once.
 
-    :param page: a string containing the text of the page
-    :precondition: page must be a non-empty string
-    :postcondition: determines the mood based on the sentiment analysis of the text
-    :return: a string representing the mood
+    :precondition: none
+    :postcondition: the variables of the .env file are available through os.getenv
+    """
+    global _environment_loaded
+    if not _environment_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _environment_loaded = True
+
+
+def freesound_api_key():
+    """
+    Return the Freesound API key.
+
+    :precondition: none
+    :postcondition: the .env file is loaded
+    :return: the value of FREESOUND_API_KEY, or None if it is not set
+    """
+    load_environment()
+    return os.getenv('FREESOUND_API_KEY')
+
+
+class SoundCache:
+    """
+    LRU cache of Freesound query results backed by a JSON file, with TTL expiry
+    and stale-while-revalidate lookups.
+    """
+
+    def __init__(self, path=SOUND_CACHE_PATH, ttl=SOUND_CACHE_TTL, max_entries=SOUND_CACHE_SIZE, clock=time.time):
+        """
+        Initialize the SoundCache and load any entries already stored on disk.
+
+        :param path: the path of the JSON file backing the cache
+        :param ttl: the number of seconds an entry is considered fresh
+        :param max_entries: the maximum number of entries kept in the cache
+        :param clock: a callable returning the current time in seconds
+        :precondition: ttl and max_entries must be positive numbers
+        :postcondition: the cache holds the entries found in the backing file, if any
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.refreshing = set()
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """
+        Load the cache entries from the backing file.
+
+        :precondition: none
+        :postcondition: the in-memory cache holds the stored entries, or is empty if the file is missing or corrupt;
+                        malformed entries are skipped
+        """
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict):
+            return
+        with self.lock:
+            for query, entry in data.items():
+                try:
+                    self.entries[query] = (entry["url"], entry["fetched_at"])
+                except (KeyError, TypeError):
+                    continue
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def save(self):
+        """
+        Atomically write the cache entries to the backing file.
+
+        :precondition: none
+        :postcondition: the backing file holds the current cache entries; concurrent saves are written one at a
+                        time, each from a snapshot taken once the previous save is done
+        """
+        with self.save_lock:
+            with self.lock:
+                data = {query: {"url": url, "fetched_at": fetched_at}
+                        for query, (url, fetched_at) in self.entries.items()}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = self.path + ".tmp"
+            try:
+                with open(temp_path, 'w') as file:
+                    json.dump(data, file)
+                os.replace(temp_path, self.path)
+            except OSError as error:
+                print(f"Could not save sound cache: {error}")
+
+    def store(self, query, url):
+        """
+        Store the sound URL for a query and persist the cache.
+
+        :param query: the search query string
+        :param url: the sound preview URL found for the query
+        :precondition: query and url must be non-empty strings
+        :postcondition: the entry is the most recently used one, evicting the oldest entry if the cache is full
+        """
+        with self.lock:
+            self.entries[query] = (url, self.clock())
+            self.entries.move_to_end(query)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        self.save()
+
+    def get(self, query, fetch):
+        """
+        Return the cached sound URL for a query, fetching it only when it is not cached.
+
+        :param query: the search query string
+        :param fetch: a callable that takes the query and returns a sound URL or None
+        :precondition: query must be a non-empty string
+        :postcondition: expired entries are returned as-is and refreshed in the background
+        :return: a string representing the URL of the sound preview, or None if not found
+        """
+        with self.lock:
+            entry = self.entries.get(query)
+            if entry is not None:
+                self.entries.move_to_end(query)
+        if entry is None:
+            url = fetch(query)
+            if url:
+                self.store(query, url)
+            return url
+        url, fetched_at = entry
+        if self.clock() - fetched_at > self.ttl:
+            self.revalidate(query, fetch)
+        return url
+
+    def revalidate(self, query, fetch):
+        """
+        Refresh an expired entry on a background thread.
+
+        :param query: the search query string
+        :param fetch: a callable that takes the query and returns a sound URL or None
+        :precondition: query must be a non-empty string
+        :postcondition: the entry is replaced if the fetch succeeds, and kept as-is otherwise
+        """
+        with self.lock:
+            if query in self.refreshing:
+                return
+            self.refreshing.add(query)
+
+        def refresh():
+            try:
+                url = fetch(query)
+                if url:
+                    self.store(query, url)
+            finally:
+                with self.lock:
+                    self.refreshing.discard(query)
+
+        threading.Thread(target=refresh, name=f"sound-cache-refresh:{query}", daemon=True).start()
+
+
+_sound_cache = None
+_sound_cache_lock = threading.Lock()
+
+
+def get_sound_cache():
+    """
+    Return the shared sound cache, loading it on first use.
+
+    :precondition: none
+    :postcondition: the shared SoundCache is created once even if several threads ask for it at the same time
+    :return: the shared SoundCache instance
+    """
+    global _sound_cache
+    if _sound_cache is None:
+        with _sound_cache_lock:
+            if _sound_cache is None:
+                _sound_cache = SoundCache()
+    return _sound_cache
+
+
+def mood_for_polarity(sentiment):
     """
-    blob = TextBlob(page)
-    sentiment = blob.sentiment.polarity
-    words = blob.words.singularize()
+    Determine the mood matching a sentiment polarity.
 
+    :param sentiment: a float between -1.0 and 1.0
+    :precondition: sentiment must be a number
+    :postcondition: maps the polarity onto one of the seven moods
+    :return: a string representing the mood
+    """
     mood = "neutral"
     if sentiment > 0.5:
         mood = "excited"
@@ -39,16 +250,340 @@ def analyze_page(page):
     return mood
 
 
-def construct_query_url(query):
+def set_sentiment_backend(backend):
     """
-    Construct a URL for querying the Freesound API.
+    Select the sentiment backend used to score pages.
 
-    :param query: the search query string
-    :precondition: query must be a non-empty string
-    :postcondition: returns a properly formatted URL for the Freesound API
-    :return: a string representing the URL for the Freesound API query
+    :param backend: the name of the backend, one of SENTIMENT_BACKENDS
+    :precondition: backend must be a string
+    :postcondition: page_polarity and page_polarities use the selected backend
+    :raises ValueError: if backend is not one of SENTIMENT_BACKENDS
+    """
+    global SENTIMENT_BACKEND
+    if backend not in SENTIMENT_BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {backend}, expected one of {', '.join(SENTIMENT_BACKENDS)}")
+    SENTIMENT_BACKEND = backend
+
+
+def sentiment_backend():
+    """
+    Return the selected sentiment backend, reading BOOKSMART_SENTIMENT on first use.
+
+    :precondition: none
+    :postcondition: the backend defaults to textblob when none was selected
+    :return: the name of the selected backend
+    :raises ValueError: if BOOKSMART_SENTIMENT is not one of SENTIMENT_BACKENDS
+    """
+    if SENTIMENT_BACKEND is None:
+        load_environment()
+        set_sentiment_backend(os.getenv('BOOKSMART_SENTIMENT', 'textblob'))
+    return SENTIMENT_BACKEND
+
+
+_lexicon_scorer = None
+
+
+def get_lexicon_scorer():
+    """
+    Return the shared lexicon scorer, loading the lexicon on first use.
+
+    :precondition: numpy and textblob must be installed
+    :postcondition: the shared LexiconScorer is created if it does not exist yet
+    :return: the shared LexiconScorer instance
+    """
+    global _lexicon_scorer
+    if _lexicon_scorer is None:
+        from functionalities.lexicon import LexiconScorer
+        _lexicon_scorer = LexiconScorer()
+    return _lexicon_scorer
+
+
+def page_polarity(page):
+    """
+    Compute the sentiment polarity of a page.
+
+    :param page: a string containing the text of the page
+    :precondition: page must be a string
+    :postcondition: computes the polarity of the text with the selected sentiment backend
+    :return: a float between -1.0 and 1.0
+    """
+    if sentiment_backend() == "lexicon":
+        return float(get_lexicon_scorer().polarities([page])[0])
+    from textblob import TextBlob
+    return TextBlob(page).sentiment.polarity
+
+
+def analyze_page(page):
+    """
+    Analyze the sentiment of a page and determine the mood.
+
+    :param page: a string containing the text of the page
+    :precondition: page must be a non-empty string
+    :postcondition: determines the mood based on the sentiment analysis of the text
+    :return: a string representing the mood
+    """
+    with span("mood.analyze_page"):
+        return mood_for_polarity(page_polarity(page))
+
+
+def analysis_pool(max_workers=None):
+    """
+    Create a process pool for scoring pages in parallel.
+
+    :param max_workers: the number of worker processes, defaulting to the number of CPUs
+    :precondition: max_workers must be a positive integer or None
+    :postcondition: returns a pool whose workers are spawned rather than forked, so it is safe to create from a GUI
+    :return: a ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def page_polarities(texts, executor=None, chunksize=ANALYSIS_CHUNK_SIZE):
+    """
+    Compute the sentiment polarity of many pages, fanning out across processes for large batches.
+
+    :param texts: an iterable of page texts
+    :param executor: the process pool to use, a temporary one is created for large batches if None
+    :param chunksize: the number of pages sent to a worker process at a time
+    :precondition: texts must contain strings
+    :postcondition: small batches without an executor, and every batch with the lexicon backend,
+                    are scored in this process
+    :return: a list of floats between -1.0 and 1.0, in the order of texts
+    """
+    texts = list(texts)
+    if sentiment_backend() == "lexicon":
+        return [float(polarity) for polarity in get_lexicon_scorer().polarities(texts)]
+    if executor is not None:
+        return list(executor.map(page_polarity, texts, chunksize=chunksize))
+    if len(texts) < ANALYSIS_PARALLEL_THRESHOLD:
+        return [page_polarity(text) for text in texts]
+    with analysis_pool() as pool:
+        return list(pool.map(page_polarity, texts, chunksize=chunksize))
+
+
+def analyze_pages(texts, executor=None, chunksize=ANALYSIS_CHUNK_SIZE):
+    """
+    Determine the mood of many pages, fanning out across processes for large batches.
+
+    :param texts: an iterable of page texts
+    :param executor: the process pool to use, a temporary one is created for large batches if None
+    :param chunksize: the number of pages sent to a worker process at a time
+    :precondition: texts must contain strings
+    :postcondition: each mood matches what analyze_page returns for the same text
+    :return: a list of strings representing the moods, in the order of texts
     """
-    return f"https://freesound.org/apiv2/search/text/?query={query}&token={FREESOUND_API_KEY}"
+    return [mood_for_polarity(polarity) for polarity in page_polarities(texts, executor, chunksize)]
+
+
+class FreesoundClient:
+    """
+    Freesound API client with a pooled keep-alive session, timeouts, bounded retries
+    and a circuit breaker that stops calling the API after repeated failures.
+    """
+
+    def __init__(self, api_key=None, base_url=FREESOUND_API_URL, timeout=FREESOUND_TIMEOUT, retries=3,
+                 backoff=0.5, failure_threshold=3, cooldown=60, clock=time.monotonic):
+        """
+        Initialize the FreesoundClient.
+
+        :param api_key: the Freesound API key, defaulting to the FREESOUND_API_KEY environment variable
+        :param base_url: the base URL of the Freesound API
+        :param timeout: a (connect, read) tuple of timeouts in seconds
+        :param retries: the number of times a failed request is retried
+        :param backoff: the backoff factor in seconds between retries, a Retry-After header sent with a 429 or 503
+                        answer is waited for instead
+        :param failure_threshold: the number of consecutive failures that opens the circuit
+        :param cooldown: the number of seconds the circuit stays open
+        :param clock: a callable returning a monotonic time in seconds
+        :precondition: base_url must be a valid URL without a trailing slash
+        :postcondition: the client is ready to send requests over a shared session
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.api_key = api_key if api_key is not None else freesound_api_key()
+        self.base_url = base_url
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+        retry = Retry(total=retries, backoff_factor=backoff, backoff_max=RETRY_BACKOFF_MAX,
+                      status_forcelist=RETRY_STATUSES, allowed_methods=frozenset(['GET']), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def circuit_open(self):
+        """
+        Check whether the circuit breaker currently blocks requests.
+
+        :precondition: none
+        :postcondition: the circuit lets a trial request through once the cooldown has passed
+        :return: True if requests should not be sent, False otherwise
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return False
+            if self.clock() - self.opened_at >= self.cooldown:
+                self.opened_at = None
+                self.failures = self.failure_threshold - 1
+                return False
+            return True
+
+    def record_failure(self):
+        """
+        Record a failed request, opening the circuit once the failure threshold is reached.
+
+        :precondition: none
+        :postcondition: the circuit is opened if there were too many consecutive failures
+        """
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+
+    def record_success(self):
+        """
+        Record a successful request.
+
+        :precondition: none
+        :postcondition: the consecutive failure count is reset
+        """
+        with self.lock:
+            self.failures = 0
+
+    def get_json(self, path, params=None):
+        """
+        Send a GET request to the Freesound API and decode its JSON response.
+
+        :param path: the API path relative to the base URL
+        :param params: a dictionary of query parameters
+        :precondition: path must be a non-empty string
+        :postcondition: the outcome of the request is recorded by the circuit breaker
+        :return: the decoded JSON response, or None if the request failed or was skipped
+        """
+        if self.circuit_open():
+            print("Freesound is unavailable, skipping request")
+            return None
+        import requests
+
+        query = dict(params or {})
+        query["token"] = self.api_key
+        try:
+            response = self.session.get(f"{self.base_url}/{path}", params=query, timeout=self.timeout)
+        except requests.RequestException as error:
+            print(f"Request error: {error}")
+            self.record_failure()
+            return None
+        if response.status_code == 200:
+            self.record_success()
+            return response.json()
+        print(f"HTTP error {response.status_code}: {response.reason}")
+        if response.status_code in RETRY_STATUSES:
+            self.record_failure()
+        return None
+
+    def sound_details(self, sound_id):
+        """
+        Fetch the preview URL of a sound.
+
+        :param sound_id: the ID of the sound
+        :precondition: sound_id must be a valid Freesound sound ID
+        :postcondition: returns the URL of the sound preview if available
+        :return: a string representing the URL of the sound preview, or None if not found
+        """
+        with span("freesound.sound_details"):
+            data = self.get_json(f"sounds/{sound_id}/")
+        if data and "previews" in data:
+            if "preview-lq-mp3" in data["previews"]:
+                return data["previews"]["preview-lq-mp3"]
+            elif "preview-hq-mp3" in data["previews"]:
+                return data["previews"]["preview-hq-mp3"]
+        return None
+
+    def search(self, query):
+        """
+        Fetch the preview URL of the first sound matching a search query.
+
+        :param query: the search query string
+        :precondition: query must be a non-empty string
+        :postcondition: returns the URL of the first sound preview if available
+        :return: a string representing the URL of the sound preview, or None if not found
+        """
+        with span("freesound.search"):
+            data = self.get_json("search/text/", {"query": query})
+        if data and data.get("results"):
+            return self.sound_details(data["results"][0]["id"])
+        return None
+
+    def download(self, url, destination):
+        """
+        Download a file, resuming from a partial download left by an earlier attempt.
+
+        :param url: the URL of the file to download
+        :param destination: the path the downloaded file is saved to
+        :precondition: url must be a valid URL, the directory of destination must exist
+        :postcondition: destination holds the complete file, or a .part file holds the bytes received so far
+        :return: True if the file was downloaded completely, False otherwise
+        """
+        import requests
+
+        part_path = destination + ".part"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 416:
+                    os.replace(part_path, destination)
+                    return True
+                if response.status_code not in (200, 206):
+                    print(f"HTTP error {response.status_code}: {response.reason}")
+                    return False
+                mode = 'ab' if response.status_code == 206 else 'wb'
+                with open(part_path, mode) as file:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        file.write(chunk)
+        except (requests.RequestException, OSError) as error:
+            print(f"Download error: {error}")
+            return False
+        os.replace(part_path, destination)
+        return True
+
+    def close(self):
+        """
+        Close the pooled connections of the client.
+
+        :precondition: none
+        :postcondition: the underlying session is closed
+        """
+        self.session.close()
+
+
+_freesound_client = None
+_freesound_client_lock = threading.Lock()
+
+
+def get_freesound_client():
+    """
+    Return the shared Freesound client, creating it on first use.
+
+    :precondition: none
+    :postcondition: the shared FreesoundClient is created once even if several threads ask for it at the same time,
+                    so they share one session and one circuit breaker
+    :return: the shared FreesoundClient instance
+    """
+    global _freesound_client
+    if _freesound_client is None:
+        with _freesound_client_lock:
+            if _freesound_client is None:
+                _freesound_client = FreesoundClient()
+    return _freesound_client
 
 
 def fetch_sound_details(sound_id):
@@ -60,18 +595,7 @@ def fetch_sound_details(sound_id):
     :postcondition: returns the URL of the sound preview if available
     :return: a string representing the URL of the sound preview, or None if not found
     """
-    url = f"https://freesound.org/apiv2/sounds/{sound_id}/?token={FREESOUND_API_KEY}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        if "previews" in data:
-            if "preview-lq-mp3" in data["previews"]:
-                return data["previews"]["preview-lq-mp3"]
-            elif "preview-hq-mp3" in data["previews"]:
-                return data["previews"]["preview-hq-mp3"]
-    else:
-        print(f"HTTP error {response.status_code}: {response.reason}")
-    return None
+    return get_freesound_client().sound_details(sound_id)
 
 
 def fetch_sound_url(query):
@@ -83,16 +607,7 @@ def fetch_sound_url(query):
     :postcondition: returns the URL of the first sound preview if available
     :return: a string representing the URL of the sound preview, or None if not found
     """
-    url = construct_query_url(query)
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        if data["results"]:
-            sound_id = data["results"][0]["id"]
-            return fetch_sound_details(sound_id)
-    else:
-        print(f"HTTP error {response.status_code}: {response.reason}")
-    return None
+    return get_freesound_client().search(query)
 
 
 def fetch_sounds(sounds):
@@ -101,14 +616,108 @@ def fetch_sounds(sounds):
 
     :param sounds: a string representing the mood
     :precondition: sounds must be a valid mood string
-    :postcondition: returns the URL of the sound preview if available
+    :postcondition: returns the URL of the sound preview if available, answering from the sound cache when possible
     :return: a string representing the URL of the sound preview, or None if not found
     """
     mood_query = f"{sounds} piano sound"
+    return get_sound_cache().get(mood_query, fetch_sound_url)
+
+
+def cached_preview_path(url):
+    """
+    Build the path of the local copy of a sound preview.
+
+    :param url: the URL of the sound preview
+    :precondition: url must be a non-empty string
+    :postcondition: the path is stable for a given URL
+    :return: a string representing the path of the preview in the audio cache directory
+    """
+    extension = os.path.splitext(urlparse(url).path)[1] or ".mp3"
+    return os.path.join(AUDIO_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + extension)
+
+
+def local_sound_url(url):
+    """
+    Return a file:// URL for a sound preview if it has been downloaded.
+
+    :param url: the remote URL of the sound preview
+    :precondition: url must be a non-empty string
+    :postcondition: the remote URL is returned unchanged if the preview is not cached yet
+    :return: a string representing the URL the preview should be played from
+    """
+    path = cached_preview_path(url)
+    if os.path.exists(path):
+        return Path(path).resolve().as_uri()
+    return url
+
 
-    play_sound = None
-    mood_sound_url = fetch_sound_url(mood_query)
+def download_preview(url):
+    """
+    Download a sound preview into the audio cache directory.
+
+    :param url: the remote URL of the sound preview
+    :precondition: url must be a non-empty string
+    :postcondition: the preview is stored in the audio cache directory unless the download failed
+    :return: the path of the cached preview, or None if the download failed
+    """
+    path = cached_preview_path(url)
+    if os.path.exists(path):
+        return path
+    os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+    with span("freesound.download"):
+        downloaded = get_freesound_client().download(url, path)
+    if downloaded:
+        return path
+    return None
+
+
+_mood_locks = {}
+_mood_locks_lock = threading.Lock()
+
+
+def mood_lock(mood):
+    """
+    Return the lock held while the sound of a mood is searched or downloaded.
+
+    :param mood: a string representing the mood
+    :precondition: mood must be a valid mood string
+    :postcondition: the same lock is returned for every call with the same mood
+    :return: a threading.Lock
+    """
+    with _mood_locks_lock:
+        return _mood_locks.setdefault(mood, threading.Lock())
+
+
+def resolve_sound(mood):
+    """
+    Resolve the sound to play for a mood, preferring a downloaded copy of the preview.
+
+    :param mood: a string representing the mood
+    :precondition: mood must be a valid mood string
+    :postcondition: returns a local file:// URL when the preview has been prefetched, waiting for a prefetch of the
+                    same mood in progress instead of searching for it a second time
+    :return: a string representing the URL of the sound to play, or None if not found
+    """
+    with mood_lock(mood):
+        url = fetch_sounds(mood)
+    return local_sound_url(url) if url else None
+
+
+def prefetch_sounds(moods=MOODS, max_workers=PREFETCH_WORKERS):
+    """
+    Resolve and download the sound previews for several moods in parallel.
+
+    :param moods: the moods to prefetch sounds for
+    :param max_workers: the maximum number of concurrent downloads
+    :precondition: max_workers must be a positive integer
+    :postcondition: the previews that could be fetched are stored in the audio cache directory, a mood resolved
+                    at the same time is searched and downloaded once
+    :return: a dictionary mapping each mood to the path of its cached preview, or None
+    """
+    def prefetch(mood):
+        with mood_lock(mood):
+            url = fetch_sounds(mood)
+            return download_preview(url) if url else None
 
-    if mood_sound_url:
-        play_sound = mood_sound_url
-    return play_sound if play_sound else None
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(moods, executor.map(prefetch, moods)))
@@ -0,0 +1,37 @@
+import argparse
+import sys
+
+from functionalities.crud import reconcile_library
+from functionalities.importer import import_books, import_pool
+
+
+def print_progress(done, total):
+    """
+    Print the progress of an import on a single line.
+
+    :param done: the number of files handled so far
+    :param total: the number of files being imported
+    :precondition: done must not be greater than total
+    :postcondition: the progress line on stderr is overwritten
+    """
+    print(f"\rImported {done} of {total} files", end="" if done < total else "\n", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import PDF files and folders of PDF files into the library.")
+    parser.add_argument("paths", nargs="+", help="PDF files or folders to import")
+    parser.add_argument("--workers", type=int, default=None, help="the number of worker processes")
+    arguments = parser.parse_args()
+
+    reconcile_library(background=False)
+    with import_pool(arguments.workers) as pool:
+        result = import_books(arguments.paths, executor=pool, progress=print_progress)
+    for source, original in result["duplicates"]:
+        print(f"Skipped {source}: same content as {original}")
+    print(f"Imported {len(result['added'])} books, skipped {len(result['duplicates'])} duplicates, "
+          f"{len(result['failed'])} failed.")
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,72 @@
+import os
 import sys
+import time
 
-from ui.mainWindow import BookSmartApp
-from PySide6.QtWidgets import QApplication
+STARTUP_TIMING = os.getenv('BOOKSMART_STARTUP_TIMING') == '1'
+DEFERRED_MODULES = ("fitz", "textblob", "requests", "dotenv", "numpy", "PySide6.QtMultimedia")
+
+
+class StartupTimer:
+    """
+    Records how long each phase of the application start takes.
+    """
+
+    def __init__(self, enabled):
+        """
+        Initialize the StartupTimer.
+
+        :param enabled: whether phases are recorded and reported
+        :precondition: enabled must be a boolean
+        :postcondition: the timer starts counting from now
+        """
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.last = self.started_at
+        self.phases = []
+
+    def phase(self, name):
+        """
+        Record the end of a startup phase.
+
+        :param name: the name of the phase that just ended
+        :precondition: name must be a non-empty string
+        :postcondition: the phase is recorded if the timer is enabled
+        """
+        if self.enabled:
+            now = time.perf_counter()
+            self.phases.append((name, now - self.last, now - self.started_at))
+            self.last = now
+
+    def report(self):
+        """
+        Print the recorded phases and the heavy modules that have already been imported.
+
+        :precondition: none
+        :postcondition: prints one line per phase if the timer is enabled
+        """
+        if not self.enabled:
+            return
+        print("startup time: self [ms] | cumulative [ms] | phase", file=sys.stderr)
+        for name, duration, cumulative in self.phases:
+            print(f"startup time: {duration * 1000:9.1f} | {cumulative * 1000:15.1f} | {name}", file=sys.stderr)
+        loaded = [module for module in DEFERRED_MODULES if module in sys.modules]
+        print(f"startup time: deferred modules already loaded: {', '.join(loaded) or 'none'}", file=sys.stderr)
 
 
 def main():
+    timer = StartupTimer(STARTUP_TIMING)
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from ui.mainWindow import BookSmartApp
+    timer.phase("imports")
+
     app = QApplication(sys.argv)
+    timer.phase("QApplication")
     main_window = BookSmartApp()
+    timer.phase("BookSmartApp")
     main_window.show()
+    timer.phase("show")
+    QTimer.singleShot(0, lambda: (timer.phase("first event loop pass"), timer.report()))
     sys.exit(app.exec())
 
 
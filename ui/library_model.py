@@ -0,0 +1,208 @@
+import bisect
+from collections import OrderedDict
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QSize, Qt
+from PySide6.QtGui import QColor, QPainter, QPixmap
+
+THUMBNAIL_SIZE = QSize(256, 256)
+THUMBNAIL_CACHE_SIZE = 256
+
+
+class LibraryModel(QAbstractListModel):
+    """
+    List model of the books in the library, holding the records of the catalog. Thumbnails are loaded only
+    when a view asks for them, which is only for the items it shows, and are kept in a bounded cache.
+    """
+
+    PathRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        """
+        Initialize the LibraryModel.
+
+        :param parent: the parent QObject
+        :precondition: a QApplication must exist
+        :postcondition: the model is empty
+        """
+        super().__init__(parent)
+        self.books = []
+        self.thumbnails = OrderedDict()
+        self.placeholder = None
+
+    def rowCount(self, parent=QModelIndex()):
+        """
+        Return the number of books in the model.
+
+        :param parent: the parent index, which is invalid for a list model
+        :precondition: none
+        :postcondition: the model is unchanged
+        :return: the number of books
+        """
+        return 0 if parent.isValid() else len(self.books)
+
+    def data(self, index, role=Qt.DisplayRole):
+        """
+        Return the data of a book for a given role.
+
+        :param index: the QModelIndex of the book
+        :param role: the Qt item data role
+        :precondition: index must belong to this model
+        :postcondition: the thumbnail of the book is loaded if the decoration is requested
+        :return: the name, description, thumbnail or path of the book, or None for other roles
+        """
+        if not index.isValid() or index.row() >= len(self.books):
+            return None
+        book = self.books[index.row()]
+        if role == Qt.DisplayRole:
+            return book["name"]
+        if role == Qt.ToolTipRole:
+            details = [book.get(field) for field in ("title", "author") if book.get(field)]
+            return " - ".join(details) or book["name"]
+        if role == Qt.DecorationRole:
+            return self.thumbnail(book)
+        if role == self.PathRole:
+            return book["path"]
+        return None
+
+    def thumbnail(self, book):
+        """
+        Return the thumbnail of a book, loading it from disk if it is not cached.
+
+        :param book: the catalog record of the book
+        :precondition: book must hold the name and the thumbnail path of the book
+        :postcondition: the thumbnail is the most recently used one in the cache
+        :return: QPixmap with the thumbnail, or a placeholder if the thumbnail does not exist
+        """
+        pixmap = self.thumbnails.get(book["name"])
+        if pixmap is not None:
+            self.thumbnails.move_to_end(book["name"])
+            return pixmap
+        pixmap = QPixmap(book.get("thumbnail") or "")
+        if pixmap.isNull():
+            return self.placeholder_thumbnail()
+        self.thumbnails[book["name"]] = pixmap
+        while len(self.thumbnails) > THUMBNAIL_CACHE_SIZE:
+            self.thumbnails.popitem(last=False)
+        return pixmap
+
+    def placeholder_thumbnail(self):
+        """
+        Return the thumbnail shown for books whose thumbnail is not available.
+
+        :precondition: none
+        :postcondition: the placeholder is created on first use
+        :return: QPixmap with a blank page
+        """
+        if self.placeholder is None:
+            self.placeholder = QPixmap(181, 256)
+            self.placeholder.fill(QColor("white"))
+            painter = QPainter(self.placeholder)
+            painter.setPen(QColor("lightgray"))
+            painter.drawRect(0, 0, 180, 255)
+            painter.drawText(self.placeholder.rect(), Qt.AlignCenter, "PDF")
+            painter.end()
+        return self.placeholder
+
+    def set_books(self, books):
+        """
+        Replace the books of the model.
+
+        :param books: a list of catalog records, each holding at least the name and the path of a book
+        :precondition: the names of the books must be unique
+        :postcondition: the model holds the books sorted by name and its thumbnail cache is empty
+        """
+        self.beginResetModel()
+        self.books = sorted(books, key=lambda book: book["name"])
+        self.thumbnails.clear()
+        self.endResetModel()
+
+    def add_book(self, book):
+        """
+        Insert a book into the model, keeping the books sorted by name.
+
+        :param book: the catalog record of the book
+        :precondition: book must hold at least the name and the path of the book
+        :postcondition: views are notified of the one inserted row
+        """
+        row = bisect.bisect_left([other["name"] for other in self.books], book["name"])
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.books.insert(row, book)
+        self.endInsertRows()
+
+    def rename_book(self, old_name, new_name):
+        """
+        Rename a book in the model, moving its row to keep the books sorted by name.
+
+        :param old_name: the current name of the book
+        :param new_name: the new name of the book
+        :precondition: no other book of the model must be named new_name
+        :postcondition: views are notified of the one moved or changed row if the book was in the model
+        """
+        for row, book in enumerate(self.books):
+            if book["name"] == old_name:
+                others = [other["name"] for other in self.books[:row] + self.books[row + 1:]]
+                target = bisect.bisect_left(others, new_name)
+                if target != row:
+                    self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), target if target < row else target + 1)
+                del self.books[row]
+                self.books.insert(target, dict(book, name=new_name))
+                if target != row:
+                    self.endMoveRows()
+                if old_name in self.thumbnails:
+                    self.thumbnails[new_name] = self.thumbnails.pop(old_name)
+                index = self.index(target)
+                self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.ToolTipRole])
+                return
+
+    def remove_book(self, book_name):
+        """
+        Remove a book from the model.
+
+        :param book_name: the name of the book
+        :precondition: book_name must be a non-empty string
+        :postcondition: views are notified of the removed row if the book was in the model
+        """
+        for row, book in enumerate(self.books):
+            if book["name"] == book_name:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.books[row]
+                self.thumbnails.pop(book_name, None)
+                self.endRemoveRows()
+                return
+
+    def refresh_thumbnail(self, book_path):
+        """
+        Reload the thumbnail of a book after it has been generated.
+
+        :param book_path: the path to the PDF file
+        :precondition: book_path must be a non-empty string
+        :postcondition: views are notified that the decoration of the book changed if it is in the model
+        """
+        for row, book in enumerate(self.books):
+            if book["path"] == book_path:
+                self.thumbnails.pop(book["name"], None)
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+                return
+
+    def book_name(self, index):
+        """
+        Return the name of the book at an index.
+
+        :param index: the QModelIndex of the book
+        :precondition: index must be a valid index of this model
+        :postcondition: the model is unchanged
+        :return: a string representing the name of the book
+        """
+        return self.books[index.row()]["name"]
+
+    def book_digest(self, index):
+        """
+        Return the content digest of the book at an index.
+
+        :param index: the QModelIndex of the book
+        :precondition: index must be a valid index of this model
+        :postcondition: the model is unchanged
+        :return: a string representing the hexadecimal SHA-256 digest of the book
+        """
+        return self.books[index.row()]["digest"]
@@ -1,18 +1,34 @@
-import json
 import os
-
-from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
-from PySide6.QtWidgets import QMainWindow, QLabel, QVBoxLayout, QWidget, QHBoxLayout, QFileDialog, \
-    QPushButton, QMessageBox, QSpacerItem, QSizePolicy, QScrollArea
-from PySide6.QtGui import QPixmap, Qt, QImage, QShortcut, QKeySequence
-from PySide6.QtCore import QUrl
-from functionalities.crud import get_books, add_book, delete_book
-import fitz
-from functionalities.sound import analyze_page, fetch_sounds
-from helper_functions import create_thumbnail_label, create_book_name_label, create_read_buttons, clear_layout
+import threading
+
+from PySide6.QtWidgets import QMainWindow, QLabel, QWidget, QHBoxLayout, QFileDialog, \
+    QPushButton, QMessageBox, QSpacerItem, QSizePolicy, QListView, QMenu, \
+    QProgressDialog, QLineEdit, QListWidget, QListWidgetItem, QToolButton, QInputDialog
+from PySide6.QtGui import Qt, QShortcut, QKeySequence
+from PySide6.QtCore import QThreadPool, QTimer, QSize, Signal
+from functionalities.bookmarks import get_bookmark_store
+from functionalities.crud import get_books, delete_book, get_thumbnail_queue, rename_book
+from functionalities.catalog import get_catalog
+from functionalities.documents import get_document_pool
+from functionalities.extraction import is_textless, page_sample
+from functionalities.mood_index import get_mood_index, start_mood_index, stop_mood_indexes
+from functionalities.profiling import count, span
+from functionalities.search import get_search_index, get_search_index_queue, sync_search_index
+from ui.library_model import LibraryModel, THUMBNAIL_SIZE
+from ui.mood_scheduler import MoodScheduler
+from ui.page_cache import PageRenderer
+from ui.page_view import PageView, ZOOM_STEP
+from ui.scroll_view import ContinuousPageView
+from ui.profile_overlay import ProfileOverlay
+from ui.workers import ImportWorker, MoodWorker, ReconcileWorker, SoundPrefetchWorker
+from helper_functions import clear_layout
+
+SEARCH_DELAY_MS = 200
 
 
 class BookSmartApp(QMainWindow):
+    thumbnail_ready = Signal(str)
+
     def __init__(self):
         """
         Initialize the BookSmartApp.
@@ -34,128 +50,350 @@ class BookSmartApp(QMainWindow):
         self.toolbar.setStyleSheet("font: 16px")
 
         self.add_book_option = self.toolbar.addAction("Add book")
+        self.import_folder_option = self.toolbar.addAction("Import folder")
         self.delete_book_option = self.toolbar.addAction("Delete book")
 
         self.add_book_option.triggered.connect(self.create_book)
+        self.import_folder_option.triggered.connect(self.import_folder)
         self.delete_book_option.triggered.connect(self.toggle_delete_buttons)
+        self.delete_mode = False
+        self.import_progress = None
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_results = self.create_search_results()
+        self.search_box = None
+        self.add_search_box()
+
+        self.library_model = LibraryModel(self)
+        self.library_view = self.create_library_view()
+        self.thumbnail_ready.connect(self.library_model.refresh_thumbnail)
+        get_thumbnail_queue().add_listener(lambda book_path, _: self.thumbnail_ready.emit(book_path))
 
         self.current_book = None
-        self.bookmarks = {}
+        self.mood_index = None
+        self.bookmarks = get_bookmark_store()
         self.page_number_label = QLabel()
         self.book_name = None
+        self.book_digest = None
         self.next_page_shortcut = QShortcut(QKeySequence(Qt.Key_Right), self)
         self.next_page_shortcut.activated.connect(lambda: self.next_page(self.book_name))
 
         self.previous_page_shortcut = QShortcut(QKeySequence(Qt.Key_Left), self)
         self.previous_page_shortcut.activated.connect(lambda: self.previous_page(self.book_name))
 
-        self.audio_output = QAudioOutput()
-        self.mood_player = QMediaPlayer()
-        self.mood_player.setAudioOutput(self.audio_output)
-        self.current_mood = None
+        self.page_view = None
+        self.page_zoom = 1.0
+        self.continuous_scroll = False
+        self.zoom_in_shortcut = QShortcut(QKeySequence.ZoomIn, self)
+        self.zoom_in_shortcut.activated.connect(lambda: self.zoom_page(self.page_zoom * ZOOM_STEP))
+        self.zoom_out_shortcut = QShortcut(QKeySequence.ZoomOut, self)
+        self.zoom_out_shortcut.activated.connect(lambda: self.zoom_page(self.page_zoom / ZOOM_STEP))
+        self.fit_width_shortcut = QShortcut(QKeySequence(Qt.CTRL | Qt.Key_0), self)
+        self.fit_width_shortcut.activated.connect(lambda: self.zoom_page(1.0))
+
+        self.mood_scheduler = MoodScheduler(parent=self)
+        self.mood_scheduler.settled.connect(self.request_current_page_mood)
+
+        self.mood_pool = QThreadPool()
+        self.mood_pool.setMaxThreadCount(2)
+        self.mood_request = 0
+        self.mood_request_cancel = None
+
+        self.page_renderer = PageRenderer()
+
+        self.profile_overlay = ProfileOverlay(self)
+        self.profile_shortcut = QShortcut(QKeySequence(Qt.CTRL | Qt.SHIFT | Qt.Key_P), self)
+        self.profile_shortcut.activated.connect(self.profile_overlay.toggle)
 
         self.load_books()
+        QTimer.singleShot(0, self.prefetch_sounds)
+
+    def closeEvent(self, event):
+        """
+        Stop background work before the window closes.
+
+        :param event: the QCloseEvent
+        :precondition: none
+        :postcondition: pending mood requests are cancelled, sounds are stopped, the profile is written if profiling
+                        is on, read-ahead rendering and mood indexing are stopped, open documents are closed and
+                        bookmarks are written
+        """
+        self.cancel_page_mood()
+        stop_mood_indexes()
+        self.mood_scheduler.stop()
+        self.profile_overlay.set_profiling(False)
+        self.page_renderer.close()
+        get_document_pool().close_all()
+        self.bookmarks.flush()
+        super().closeEvent(event)
+
+    def prefetch_sounds(self):
+        """
+        Download the sound previews of every mood in the background.
 
-    def play_sounds(self, sound, mood):
+        :precondition: none
+        :postcondition: a SoundPrefetchWorker is queued on the global thread pool
         """
-        Play mood-specific sounds for the book.
+        QThreadPool.globalInstance().start(SoundPrefetchWorker())
 
-        :param sound: the sound URL to play
-        :param mood: the mood of the current page
-        :precondition: sound must be a valid URL or None
-        :postcondition: plays the sound if it is different from the current mood
+    def request_page_mood(self, page_text, mood=None):
         """
-        if mood != self.current_mood:
-            print(f"{mood} is not {self.current_mood}")
-            self.current_mood = mood
-            self.mood_player.stop()
-            if sound is not None:
-                self.mood_player.setSource(QUrl(sound))
-                print(sound + " is playing")
-                self.mood_player.play()
+        Analyze a page and resolve its sound on a background thread.
 
-    def create_delete_button(self, book_name):
+        :param page_text: the text of the page being displayed
+        :param mood: the mood of the page from the mood index, or None if it must be analyzed
+        :precondition: page_text must be a string unless mood is given
+        :postcondition: any pending mood request is cancelled and a new one is queued
         """
-        Create a QPushButton for deleting a book.
+        self.cancel_page_mood()
+        self.mood_request_cancel = threading.Event()
+        worker = MoodWorker(self.mood_request, page_text, self.mood_request_cancel, mood)
+        worker.signals.finished.connect(self.on_page_mood_ready)
+        self.mood_pool.start(worker)
 
-        :param book_name: the name of the book
-        :precondition: book_name must be a non-empty string
-        :postcondition: returns a QPushButton for deleting the book
-        :return: QPushButton for deleting the book
+    def cancel_page_mood(self):
+        """
+        Cancel the pending mood request, if any.
+
+        :precondition: none
+        :postcondition: results of earlier mood requests will be ignored
         """
-        delete_button = QPushButton(f"Delete {book_name}")
-        delete_button.setStyleSheet(
-            "color: red; background-color: white; font-size: 15px; padding: 10px; border-radius:5px")
-        delete_button.clicked.connect(
-            lambda checked, selected_book=book_name: self.delete_book_confirmation(selected_book))
-        delete_button.setVisible(False)
-        return delete_button
+        if self.mood_request_cancel is not None:
+            self.mood_request_cancel.set()
+        self.mood_request += 1
 
-    def create_book_widget(self, book_name, thumbnail_path):
+    def on_page_mood_ready(self, request_id, mood, sound):
         """
-        Create a QWidget containing the book's thumbnail, name, and action buttons.
+        Play the sound resolved by a background mood request.
+
+        :param request_id: the identifier of the request that produced the result
+        :param mood: the mood of the page
+        :param sound: the sound URL to play, or None
+        :precondition: called on the GUI thread through the MoodWorker finished signal
+        :postcondition: the mood scheduler takes the mood into account unless the reader has already left the page
+        """
+        if request_id != self.mood_request:
+            return
+        self.mood_scheduler.mood_ready(mood, sound)
+
+    def create_library_view(self):
+        """
+        Create the QListView that shows the books of the library as a grid of thumbnails.
+
+        :precondition: self.library_model must exist
+        :postcondition: returns a QListView that only creates the items it shows
+        :return: QListView showing the library model
+        """
+        library_view = QListView()
+        library_view.setModel(self.library_model)
+        library_view.setViewMode(QListView.IconMode)
+        library_view.setResizeMode(QListView.Adjust)
+        library_view.setMovement(QListView.Static)
+        library_view.setLayoutMode(QListView.Batched)
+        library_view.setUniformItemSizes(True)
+        library_view.setWordWrap(True)
+        library_view.setIconSize(THUMBNAIL_SIZE)
+        library_view.setGridSize(QSize(THUMBNAIL_SIZE.width() + 40, THUMBNAIL_SIZE.height() + 60))
+        library_view.setStyleSheet("font-size: 15px")
+        library_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        library_view.clicked.connect(self.book_clicked)
+        library_view.activated.connect(self.book_activated)
+        library_view.customContextMenuRequested.connect(self.show_book_menu)
+        return library_view
+
+    def book_clicked(self, index):
+        """
+        Ask to delete the clicked book while the delete mode is on.
+
+        :param index: the QModelIndex of the clicked book
+        :precondition: index must be a valid index of the library model
+        :postcondition: shows the delete confirmation if the delete mode is on
+        """
+        if self.delete_mode:
+            self.delete_book_confirmation(self.library_model.book_name(index))
+
+    def book_activated(self, index):
+        """
+        Continue reading the activated book from its bookmark.
+
+        :param index: the QModelIndex of the activated book
+        :precondition: index must be a valid index of the library model
+        :postcondition: opens the book at its bookmarked page unless the delete mode is on
+        """
+        if not self.delete_mode:
+            book_name = self.library_model.book_name(index)
+            self.open_pdf(book_name, self.bookmarks.get(self.library_model.book_digest(index)))
+
+    def show_book_menu(self, position):
+        """
+        Show the actions available for the book under the cursor.
+
+        :param position: the position of the cursor in the library view
+        :precondition: position must be a QPoint in library view coordinates
+        :postcondition: runs the chosen action, if any
+        """
+        index = self.library_view.indexAt(position)
+        if not index.isValid():
+            return
+        book_name = self.library_model.book_name(index)
+        menu = QMenu(self)
+        continue_action = menu.addAction("Continue")
+        start_action = menu.addAction("Read from beginning")
+        rename_action = menu.addAction("Rename")
+        delete_action = menu.addAction(f"Delete {book_name}")
+        chosen = menu.exec(self.library_view.viewport().mapToGlobal(position))
+        if chosen == continue_action:
+            self.open_pdf(book_name, self.bookmarks.get(self.library_model.book_digest(index)))
+        elif chosen == start_action:
+            self.open_pdf(book_name, start_page=0)
+        elif chosen == rename_action:
+            self.rename_book_dialog(book_name)
+        elif chosen == delete_action:
+            self.delete_book_confirmation(book_name)
+
+    def rename_book_dialog(self, book_name):
+        """
+        Ask for a new name for a book and rename it.
 
         :param book_name: the name of the book
-        :param thumbnail_path: the file path of the thumbnail image
-        :precondition: book_name must be a non-empty string, thumbnail_path must be a valid path to an image file
-        :postcondition: returns a QWidget containing the book's information and action buttons
-        :return: QWidget with the book's information and action buttons
-        """
-        container = QWidget()
-        container_layout = QVBoxLayout()
-
-        thumbnail_label = create_thumbnail_label(thumbnail_path)
-        book_name_label = create_book_name_label(book_name)
-        delete_button = self.create_delete_button(book_name)
-        start_book_fresh_button, continue_book_button = create_read_buttons()
-
-        container_layout.addWidget(thumbnail_label)
-        container_layout.addWidget(book_name_label)
-        container_layout.addWidget(delete_button)
-        container_layout.addWidget(continue_book_button)
-        container_layout.addWidget(start_book_fresh_button)
-
-        container_layout.setAlignment(Qt.AlignCenter)
-        container.setLayout(container_layout)
-        self.load_bookmark(book_name)
-        continue_book_button.clicked.connect(lambda checked, selected_book=book_name,
-                                                    start_page=self.bookmarks.get(book_name, 0):
-                                             self.open_pdf(selected_book, start_page))
-        start_book_fresh_button.clicked.connect(lambda checked, selected_book=book_name:
-                                                self.open_pdf(selected_book, start_page=0))
-        return container
+        :precondition: book_name must be the name of a book of the library
+        :postcondition: the library shows the book under its new name, unless another book has that name
+        """
+        new_name, accepted = QInputDialog.getText(self, "Rename", "New name:", text=book_name)
+        new_name = new_name.strip()
+        if not accepted or not new_name or new_name == book_name:
+            return
+        if rename_book(book_name, new_name):
+            self.library_model.rename_book(book_name, new_name)
+        else:
+            QMessageBox.warning(self, "Rename", f"Another book is already named {new_name}.")
 
     def load_books(self):
         """
-        Load all books into the application.
+        Load the books of the catalog into the library model, show the library and reconcile the catalog with the
+        books directory in the background.
 
         :precondition: none
-        :postcondition: displays all books in the UI
+        :postcondition: the library model holds the books of the catalog, no file is read on the GUI thread
+        """
+        self.library_model.set_books(get_books())
+        self.show_library()
+        worker = ReconcileWorker()
+        worker.signals.finished.connect(self.on_library_reconciled)
+        QThreadPool.globalInstance().start(worker)
+
+    def on_library_reconciled(self, scanned):
         """
-        books = get_books()
+        Reload the library once the catalog is in line with the books directory.
+
+        :param scanned: the list of paths of the books that were stored or scanned
+        :precondition: called on the GUI thread through the ReconcileWorker finished signal
+        :postcondition: the library model holds every book in the books directory
+        """
+        self.library_model.set_books(get_books())
+
+    def show_library(self):
+        """
+        Show the library view in place of the book being read.
+
+        :precondition: none
+        :postcondition: displays all books in the UI, the page view of the book being read is deleted
+        """
+        self.cancel_page_mood()
         self.reset_toolbar()
-        for i in reversed(range(self.thumbnail_layout.count())):
-            widget = self.thumbnail_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.setParent(None)
+        if self.page_view is not None:
+            self.thumbnail_layout.removeWidget(self.page_view)
+            self.page_view.hide()
+            self.page_view.deleteLater()
+            self.page_view = None
+        self.show_in_library_area(self.library_view)
         self.showNormal()
-        for book in books:
-            book_name = os.path.basename(book).split(".")[0]
-            thumbnail_path = os.path.join('./thumbnails', book_name + ".pdf.png")
-            book_widget = self.create_book_widget(book_name, thumbnail_path)
-            self.thumbnail_layout.addWidget(book_widget)
 
     def create_book(self):
         """
-        Open a file dialog to add a new book.
+        Open a file dialog to add one or more new books.
+
+        :precondition: none
+        :postcondition: the selected books are imported in the background
+        """
+        books, _ = QFileDialog.getOpenFileNames(self, "Choose books", "", "PDF Files (*.pdf)")
+        if books:
+            self.start_import(books)
+
+    def import_folder(self):
+        """
+        Open a directory dialog to import every PDF file in a folder and its subfolders.
 
         :precondition: none
-        :postcondition: adds the selected book to the application and reloads the book list
+        :postcondition: the books of the chosen folder are imported in the background
+        """
+        folder = QFileDialog.getExistingDirectory(self, "Choose a folder of books")
+        if folder:
+            self.start_import([folder])
+
+    def start_import(self, paths):
+        """
+        Import books in the background while showing the progress.
+
+        :param paths: a list of paths to PDF files or to directories containing them
+        :precondition: no other import must be running
+        :postcondition: an ImportWorker is queued on the global thread pool and a progress dialog is shown
+        """
+        if self.import_progress is not None:
+            return
+        self.import_progress = QProgressDialog("Importing books...", None, 0, 0, self)
+        self.import_progress.setWindowTitle("Import")
+        self.import_progress.setMinimumDuration(0)
+        self.import_progress.show()
+        worker = ImportWorker(paths)
+        worker.signals.progress.connect(self.on_import_progress)
+        worker.signals.finished.connect(self.on_import_finished)
+        QThreadPool.globalInstance().start(worker)
+
+    def on_import_progress(self, done, total):
         """
-        book = QFileDialog.getOpenFileName(self, "Choose a book", "", "PDF Files (*.pdf)")
-        if book[0]:
-            add_book(book[0])
-            self.load_books()
+        Show how many of the files have been imported.
+
+        :param done: the number of files handled so far
+        :param total: the number of files being imported
+        :precondition: called on the GUI thread through the ImportWorker progress signal
+        :postcondition: the progress dialog is updated
+        """
+        if self.import_progress is not None:
+            self.import_progress.setMaximum(total)
+            self.import_progress.setValue(done)
+            self.import_progress.setLabelText(f"Importing books... {done} of {total}")
+
+    def on_import_finished(self, result):
+        """
+        Show the imported books in the library and report what was imported.
+
+        :param result: the dictionary returned by import_books, with an "error" if the import could not run
+        :precondition: called on the GUI thread through the ImportWorker finished signal
+        :postcondition: the library model holds the imported books, a single book is inserted as one row and
+                        the library is only reloaded after importing several books; another import can be started
+        """
+        if self.import_progress is not None:
+            self.import_progress.close()
+            self.import_progress = None
+        if 'error' in result:
+            QMessageBox.warning(self, "Import", f"Could not import the books: {result['error']}")
+            return
+        if len(result['added']) == 1:
+            record = get_catalog().book_at(result['added'][0])
+            self.library_model.add_book(record)
+            get_search_index_queue().enqueue(record)
+        elif result['added']:
+            books = get_books()
+            self.library_model.set_books(books)
+            sync_search_index(books)
+        if result['duplicates'] or result['failed']:
+            QMessageBox.information(self, "Import", f"Imported {len(result['added'])} books, "
+                                                    f"skipped {len(result['duplicates'])} duplicates, "
+                                                    f"{len(result['failed'])} failed.")
 
     def delete_book_confirmation(self, book_name):
         """
@@ -163,37 +401,27 @@ class BookSmartApp(QMainWindow):
 
         :param book_name: the name of the book
         :precondition: book_name must be a non-empty string
-        :postcondition: deletes the book if confirmed by the user
+        :postcondition: deletes the book and drops its rendered pages if confirmed by the user
         """
         confirm = QMessageBox.question(self, "Confirm delete", f"Are you sure you want to delete {book_name}?")
         if confirm == QMessageBox.Yes:
+            book = get_catalog().book(book_name)
             delete_book(book_name)
-            self.load_books()
-            self.toggle_delete_buttons()
+            if book is not None:
+                self.page_renderer.cache.remove_book(book["path"])
+            self.library_model.remove_book(book_name)
+            if self.delete_mode:
+                self.toggle_delete_buttons()
 
     def toggle_delete_buttons(self):
         """
-        Toggle the visibility of delete buttons for all books.
+        Toggle the delete mode, in which clicking a book asks to delete it.
 
         :precondition: none
-        :postcondition: shows or hides the delete buttons for all books
-        """
-        for i in range(self.thumbnail_layout.count()):
-            container = self.thumbnail_layout.itemAt(i).widget()
-            container_layout = container.layout()
-            delete_button = container_layout.itemAt(2).widget()
-            continue_button = container_layout.itemAt(3).widget()
-            start_button = container_layout.itemAt(4).widget()
-            if delete_button.isVisible():
-                delete_button.setVisible(False)
-                continue_button.setVisible(True)
-                start_button.setVisible(True)
-                self.delete_book_option.setText("Delete Book")
-            else:
-                delete_button.setVisible(True)
-                continue_button.setVisible(False)
-                start_button.setVisible(False)
-                self.delete_book_option.setText("Hide Delete Book")
+        :postcondition: switches the delete mode on or off and updates the toolbar
+        """
+        self.delete_mode = not self.delete_mode
+        self.delete_book_option.setText("Hide Delete Book" if self.delete_mode else "Delete Book")
 
     def reset_toolbar(self):
         """
@@ -203,49 +431,109 @@ class BookSmartApp(QMainWindow):
         :postcondition: resets the toolbar actions to the default set of options
         """
         self.toolbar.clear()
+        self.delete_mode = False
         self.add_book_option = self.toolbar.addAction("Add book")
+        self.import_folder_option = self.toolbar.addAction("Import folder")
         self.delete_book_option = self.toolbar.addAction("Delete book")
         self.add_book_option.triggered.connect(self.create_book)
+        self.import_folder_option.triggered.connect(self.import_folder)
         self.delete_book_option.triggered.connect(self.toggle_delete_buttons)
+        self.add_search_box()
 
-    def load_bookmark(self, book_name):
+    def add_search_box(self):
         """
-        Load the bookmark for a given book.
+        Add the box used to search the text of the library to the toolbar.
 
-        :param book_name: the name of the book
-        :precondition: book_name must be a non-empty string
-        :postcondition: sets the current page to the bookmarked page, if any
-        """
-        bookmark_json_path = './bookmarks/bookmarks.json'
-        try:
-            if os.path.exists(bookmark_json_path):
-                with open(bookmark_json_path, 'r') as file:
-                    data = json.load(file)
-                self.bookmarks[book_name] = data.get(book_name, 0)
-            else:
-                self.bookmarks[book_name] = 0
-        except json.JSONDecodeError:
-            self.bookmarks[book_name] = 0
+        :precondition: the toolbar must show the library options
+        :postcondition: typing in the box searches the library after a short pause
+        """
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search books")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setMaximumWidth(300)
+        self.search_box.textChanged.connect(self.search_timer.start)
+        self.search_box.returnPressed.connect(self.run_search)
+        spacer = QWidget()
+        spacer.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+        self.toolbar.addWidget(spacer)
+        self.toolbar.addWidget(self.search_box)
+
+    def create_search_results(self):
+        """
+        Create the list that shows the pages matching a search.
 
-    def save_bookmark(self, book_name):
+        :precondition: none
+        :postcondition: clicking a result opens its book at its page
+        :return: QListWidget for the search results
         """
-        Save the current page as a bookmark for a given book.
+        search_results = QListWidget()
+        search_results.setWordWrap(True)
+        search_results.setStyleSheet("font-size: 15px")
+        search_results.itemClicked.connect(self.search_result_clicked)
+        search_results.hide()
+        return search_results
+
+    def run_search(self):
+        """
+        Search the library for the text of the search box and show the results instead of the library.
 
-        :param book_name: the name of the book
-        :precondition: book_name must be a non-empty string
-        :postcondition: saves the current page number as the bookmark for the book
-        """
-        bookmark_json_path = './bookmarks/bookmarks.json'
-        data = {}
-        if os.path.exists(bookmark_json_path):
-            try:
-                with open(bookmark_json_path, 'r') as file:
-                    data = json.load(file)
-            except json.JSONDecodeError:
-                data = {}
-        data[book_name] = self.bookmarks.get(book_name, 0)
-        with open(bookmark_json_path, 'w') as file:
-            json.dump(data, file)
+        :precondition: the library must be shown
+        :postcondition: shows the matching pages, or the library again if the search box is empty
+        """
+        self.search_timer.stop()
+        text = self.search_box.text().strip() if self.search_box is not None else ""
+        if not text:
+            self.show_in_library_area(self.library_view)
+            return
+        self.search_results.clear()
+        results = get_search_index().search(text)
+        for result in results:
+            snippet = " ".join(result["snippet"].split())
+            item = QListWidgetItem(f"{result['name']} - page {result['page'] + 1}\n{snippet}")
+            item.setData(Qt.UserRole, (result["name"], result["page"]))
+            self.search_results.addItem(item)
+        if not results:
+            self.search_results.addItem(QListWidgetItem(f"No pages match \"{text}\""))
+        self.show_in_library_area(self.search_results)
+
+    def hide_library_area(self, keep=None):
+        """
+        Take the library view and the search results out of the central layout without deleting them.
+
+        :param keep: self.library_view or self.search_results to leave in place, or None to hide both
+        :precondition: none
+        :postcondition: the hidden widgets can be shown again later
+        """
+        for widget in (self.library_view, self.search_results):
+            if widget is not keep:
+                self.thumbnail_layout.removeWidget(widget)
+                widget.hide()
+
+    def show_in_library_area(self, widget):
+        """
+        Show either the library view or the search results.
+
+        :param widget: self.library_view or self.search_results
+        :precondition: the library must be shown
+        :postcondition: widget is the only widget of the central layout
+        """
+        self.hide_library_area(keep=widget)
+        if self.thumbnail_layout.indexOf(widget) < 0:
+            self.thumbnail_layout.addWidget(widget)
+        widget.show()
+
+    def search_result_clicked(self, item):
+        """
+        Open the book of a search result at the matching page.
+
+        :param item: the clicked QListWidgetItem
+        :precondition: item must belong to self.search_results
+        :postcondition: the book is opened at the page of the result
+        """
+        result = item.data(Qt.UserRole)
+        if result is not None:
+            book_name, page_num = result
+            self.open_pdf(book_name, page_num)
 
     def open_pdf(self, book_name, start_page=0):
         """
@@ -254,11 +542,21 @@ class BookSmartApp(QMainWindow):
         :param book_name: the name of the book
         :param start_page: the page number to start from
         :precondition: book_name must be a non-empty string, start_page must be a valid page number
-        :postcondition: displays the specified page of the book
+        :postcondition: displays the specified page of the book, or reloads the library and tells the reader if the
+                        book or its file is gone
         """
+        book = get_catalog().book(book_name)
+        if book is None or not os.path.exists(book["path"]):
+            if book is not None:
+                get_catalog().remove(book["path"])
+            QMessageBox.warning(self, "Open", f"{book_name} is no longer in the library.")
+            books = get_books()
+            self.library_model.set_books(books)
+            sync_search_index(books)
+            return
         self.toolbar.clear()
         back_button = self.toolbar.addAction("Back")
-        back_button.triggered.connect(lambda: self.load_books())
+        back_button.triggered.connect(lambda: self.show_library())
 
         nav_widget = QWidget()
         nav_layout = QHBoxLayout()
@@ -279,15 +577,130 @@ class BookSmartApp(QMainWindow):
 
         nav_widget.setLayout(nav_layout)
         self.toolbar.addWidget(nav_widget)
+        zoom_out_button = self.toolbar.addAction("Zoom out")
+        zoom_out_button.triggered.connect(lambda: self.zoom_page(self.page_zoom / ZOOM_STEP))
+        fit_width_button = self.toolbar.addAction("Fit width")
+        fit_width_button.triggered.connect(lambda: self.zoom_page(1.0))
+        zoom_in_button = self.toolbar.addAction("Zoom in")
+        zoom_in_button.triggered.connect(lambda: self.zoom_page(self.page_zoom * ZOOM_STEP))
+        continuous_button = self.toolbar.addAction("Continuous scroll")
+        continuous_button.setCheckable(True)
+        continuous_button.setChecked(self.continuous_scroll)
+        continuous_button.toggled.connect(self.set_continuous_scroll)
+        document_pool = get_document_pool()
+        path = book["path"]
+        outline = document_pool.info(path)["outline"]
+        if outline:
+            contents_button = self.toolbar.addAction("Contents")
+            contents_button.setMenu(self.create_contents_menu(book_name, outline))
+            self.toolbar.widgetForAction(contents_button).setPopupMode(QToolButton.InstantPopup)
+        self.hide_library_area()
         clear_layout(self.thumbnail_layout)
 
-        self.current_book = fitz.open("./books/" + book_name + ".pdf")
+        self.current_book = document_pool.open(path)
         self.book_name = book_name
+        self.book_digest = book["digest"]
+        self.page_view = self.create_page_view()
+        self.thumbnail_layout.addWidget(self.page_view)
+        self.mood_index = get_mood_index(self.current_book.name, len(self.current_book))
+        if not self.mood_index.is_complete():
+            start_mood_index(self.current_book.name)
+        self.mood_scheduler.reset()
         self.showMaximized()
-        if start_page == 0:
-            self.show_page(start_from_beginning=True)
-        else:
-            self.show_page()
+        self.bookmarks.set(self.book_digest, start_page)
+        self.show_page()
+
+    def create_page_view(self):
+        """
+        Create the view showing the book being read, one page at a time or as a continuous column of pages.
+
+        :precondition: a book must be open
+        :postcondition: scrolling to another page of a continuous view moves the bookmark
+        :return: a PageView or a ContinuousPageView
+        """
+        if not self.continuous_scroll:
+            return PageView(self.page_renderer, self.page_zoom)
+        page_view = ContinuousPageView(self.page_renderer, self.page_zoom)
+        page_sizes = get_document_pool().info(self.current_book.name)["page_sizes"]
+        page_view.set_document(self.current_book.name, self.current_book, page_sizes)
+        page_view.page_changed.connect(self.on_page_scrolled)
+        return page_view
+
+    def set_continuous_scroll(self, enabled):
+        """
+        Switch between showing one page at a time and scrolling through every page of the book.
+
+        :param enabled: whether the pages are shown as a continuous column
+        :precondition: enabled must be a boolean
+        :postcondition: the book being read is shown in the chosen mode at its bookmarked page, the mode is kept
+                        for the next books
+        """
+        self.continuous_scroll = enabled
+        if self.page_view is None:
+            return
+        self.thumbnail_layout.removeWidget(self.page_view)
+        self.page_view.deleteLater()
+        self.page_view = self.create_page_view()
+        self.thumbnail_layout.addWidget(self.page_view)
+        self.show_page()
+
+    def on_page_scrolled(self, page_num):
+        """
+        Move the bookmark to the page the reader scrolled to.
+
+        :param page_num: the page at the top of the continuous view
+        :precondition: called through the page_changed signal of the continuous view
+        :postcondition: the bookmark and the page number are updated and the mood of the page will be found once
+                        the reader settles on it
+        """
+        if self.page_view is None:
+            return
+        count("page_turn")
+        self.bookmarks.set(self.book_digest, page_num)
+        self.page_turned(page_num)
+
+    def page_turned(self, page_num):
+        """
+        Show the number of the page being read and restart the search for its mood.
+
+        :param page_num: the page being read
+        :precondition: page_num must be a valid page number
+        :postcondition: the mood of the page will be found once the reader settles on it
+        """
+        self.page_number_label.setText(f"Page {page_num + 1}")
+        self.cancel_page_mood()
+        self.mood_scheduler.page_turned()
+
+    def create_contents_menu(self, book_name, outline):
+        """
+        Create a menu listing the chapters of a book.
+
+        :param book_name: the name of the book
+        :param outline: the outline of the book as a list of [level, title, page number] entries
+        :precondition: outline page numbers must start at 1
+        :postcondition: choosing a chapter shows its first page
+        :return: the QMenu
+        """
+        menu = QMenu(self)
+        for level, title, page_num in outline:
+            action = menu.addAction("    " * (level - 1) + title)
+            action.setEnabled(page_num > 0)
+            action.triggered.connect(lambda checked=False, page=page_num - 1: self.go_to_page(book_name, page))
+        return menu
+
+    def go_to_page(self, book_name, page_num):
+        """
+        Navigate to a page of the book being read.
+
+        :param book_name: the name of the book
+        :param page_num: the page number, starting at 0
+        :precondition: book_name must be a non-empty string
+        :postcondition: the page is shown and the bookmark updated if it is a page of the book being read
+        """
+        if self.page_view is None or not 0 <= page_num < len(self.current_book):
+            return
+        self.bookmarks.set(self.book_digest, page_num)
+        self.show_page()
 
     def show_page(self, start_from_beginning=False):
         """
@@ -295,30 +708,56 @@ class BookSmartApp(QMainWindow):
 
         :param start_from_beginning: whether to start from the beginning of the book
         :precondition: start_from_beginning must be a boolean
-        :postcondition: displays the current page of the book
+        :postcondition: the page view shows the current page of the book
         """
         if start_from_beginning:
-            self.bookmarks[self.book_name] = 0
-        page_num = self.bookmarks[self.book_name]
+            self.bookmarks.set(self.book_digest, 0)
+        page_num = self.bookmarks.get(self.book_digest)
         if page_num < 0 or page_num >= len(self.current_book):
             return
-        clear_layout(self.thumbnail_layout)
-        page = self.current_book.load_page(page_num)
-        pix = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))
-        img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
-        img_label = QLabel()
-        img_label.setAlignment(Qt.AlignCenter)
-        img_label.setPixmap(QPixmap.fromImage(img))
-
-        scroll_area = QScrollArea()
-        scroll_area.setWidget(img_label)
-        scroll_area.setWidgetResizable(True)
-        self.thumbnail_layout.addWidget(scroll_area)
-        self.page_number_label.setText(f"Page {self.bookmarks[self.book_name] + 1}")
-        page_text = page.get_text()
-        page_theme = analyze_page(page_text)
-        page_sounds = fetch_sounds(page_theme)
-        self.play_sounds(page_sounds, page_theme)
+        count("page_turn")
+        with span("page_turn.show_page"):
+            if self.continuous_scroll:
+                self.page_view.scroll_to_page(page_num)
+            else:
+                with span("page_turn.load_page"):
+                    page = self.current_book.load_page(page_num)
+                self.page_view.set_page(self.current_book.name, page)
+        self.page_turned(page_num)
+
+    def request_current_page_mood(self):
+        """
+        Find the mood of the page the reader stayed on.
+
+        :precondition: called through the settled signal of the mood scheduler
+        :postcondition: the page is analyzed on a background thread unless its mood is in the mood index,
+                        a page without text keeps the sound of the pages before it
+        """
+        if self.page_view is None:
+            return
+        page_num = self.bookmarks.get(self.book_digest)
+        page_mood = self.mood_index.mood(page_num)
+        page_text = None
+        if page_mood is None:
+            with span("mood.extract_text"):
+                page_text = page_sample(self.current_book.load_page(page_num))
+            if is_textless(page_text):
+                count("mood.textless_page")
+                return
+        self.request_page_mood(page_text, page_mood)
+
+    def zoom_page(self, zoom):
+        """
+        Change the zoom of the page being read.
+
+        :param zoom: the new zoom, 1.0 fitting the page to the width of the window
+        :precondition: zoom must be a positive number
+        :postcondition: the page is rendered again at the new zoom, which is kept for the next pages
+        """
+        if self.page_view is None:
+            return
+        self.page_view.set_zoom(zoom)
+        self.page_zoom = self.page_view.zoom
 
     def next_page(self, book_name):
         """
@@ -326,11 +765,13 @@ class BookSmartApp(QMainWindow):
 
         :param book_name: the name of the book
         :precondition: book_name must be a non-empty string
-        :postcondition: moves to the next page of the book and updates the bookmark
+        :postcondition: moves to the next page of the book and updates the bookmark if a book is being read
         """
-        if self.bookmarks[book_name] < len(self.current_book) - 1:
-            self.bookmarks[book_name] += 1
-            self.save_bookmark(book_name)
+        if self.page_view is None:
+            return
+        page_num = self.bookmarks.get(self.book_digest)
+        if page_num < len(self.current_book) - 1:
+            self.bookmarks.set(self.book_digest, page_num + 1)
             self.show_page()
 
     def previous_page(self, book_name):
@@ -339,9 +780,11 @@ class BookSmartApp(QMainWindow):
 
         :param book_name: the name of the book
         :precondition: book_name must be a non-empty string
-        :postcondition: moves to the previous page of the book and updates the bookmark
+        :postcondition: moves to the previous page of the book and updates the bookmark if a book is being read
         """
-        if self.bookmarks[book_name] > 0:
-            self.bookmarks[book_name] -= 1
-            self.save_bookmark(book_name)
+        if self.page_view is None:
+            return
+        page_num = self.bookmarks.get(self.book_digest)
+        if page_num > 0:
+            self.bookmarks.set(self.book_digest, page_num - 1)
             self.show_page()
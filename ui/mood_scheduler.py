@@ -0,0 +1,273 @@
+from collections import Counter, deque
+
+from PySide6.QtCore import QObject, QTimer, QUrl, Signal
+
+PAGE_SETTLE_MS = 400
+MOOD_WINDOW = 5
+MOOD_SWITCH_VOTES = 3
+CROSSFADE_MS = 1500
+CROSSFADE_STEP_MS = 50
+
+
+class MoodSmoother:
+    """
+    Sliding window over the moods of the last pages read. The mood only changes once another mood is the
+    most frequent in the window and appears at least switch_votes times, so one outlier page does not
+    change the sound.
+    """
+
+    def __init__(self, window=MOOD_WINDOW, switch_votes=MOOD_SWITCH_VOTES):
+        """
+        Initialize the MoodSmoother.
+
+        :param window: the number of pages the mood is smoothed over
+        :param switch_votes: the number of pages of the window a new mood needs to replace the current one
+        :precondition: switch_votes must be between 1 and window
+        :postcondition: the smoother has no mood
+        """
+        self.moods = deque(maxlen=window)
+        self.switch_votes = switch_votes
+        self.mood = None
+
+    def push(self, mood):
+        """
+        Add the mood of the page just read.
+
+        :param mood: the mood of the page, or None if it is unknown
+        :precondition: none
+        :postcondition: the smoothed mood is updated, unknown moods are ignored
+        :return: the smoothed mood
+        """
+        if mood is None:
+            return self.mood
+        self.moods.append(mood)
+        if self.mood is None:
+            self.mood = mood
+            return self.mood
+        votes = Counter(self.moods)
+        if votes[mood] >= self.switch_votes and votes[mood] > votes[self.mood]:
+            self.mood = mood
+        return self.mood
+
+    def reset(self):
+        """
+        Forget the moods of the pages read.
+
+        :precondition: none
+        :postcondition: the next mood pushed is taken as it is
+        """
+        self.moods.clear()
+        self.mood = None
+
+
+class SoundChannel:
+    """
+    A media player with its own audio output, so two channels can play at different volumes during a cross-fade.
+    """
+
+    def __init__(self):
+        """
+        Initialize the SoundChannel, loading QtMultimedia.
+
+        :precondition: a QApplication must exist
+        :postcondition: the channel is silent
+        """
+        from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
+
+        self.audio_output = QAudioOutput()
+        self.player = QMediaPlayer()
+        self.player.setAudioOutput(self.audio_output)
+        self.sound = None
+
+    def load(self, sound):
+        """
+        Load a sound without playing it, so that playing it later does not wait for it to load.
+
+        :param sound: the sound URL, either a remote URL or a local file:// URL
+        :precondition: sound must be a valid URL
+        :postcondition: the channel is silent and holds the sound
+        """
+        if sound != self.sound:
+            self.player.setSource(QUrl(sound))
+            self.sound = sound
+
+    def play(self, sound):
+        """
+        Start playing a sound from its beginning.
+
+        :param sound: the sound URL, either a remote URL or a local file:// URL
+        :precondition: sound must be a valid URL
+        :postcondition: the sound is playing, it is only loaded if the channel does not hold it yet
+        """
+        self.load(sound)
+        self.player.setPosition(0)
+        self.player.play()
+
+    def set_volume(self, volume):
+        """
+        Change the volume of the channel.
+
+        :param volume: the volume between 0.0 and 1.0
+        :precondition: volume must be between 0.0 and 1.0
+        :postcondition: the channel plays at the new volume
+        """
+        self.audio_output.setVolume(volume)
+
+    def stop(self):
+        """
+        Stop playing.
+
+        :precondition: none
+        :postcondition: the channel is silent
+        """
+        self.player.stop()
+
+
+class MoodScheduler(QObject):
+    """
+    Decides when the mood sound changes while a book is read. Page turns are debounced, so pages flipped
+    through are never analyzed, the moods of the pages read are smoothed by a MoodSmoother, and a new
+    sound fades in on a second channel while the current one fades out. The sound of a mood that may
+    replace the current one is loaded on the idle channel as soon as that mood is seen.
+    """
+    settled = Signal()
+
+    def __init__(self, channel_factory=SoundChannel, settle_ms=PAGE_SETTLE_MS, crossfade_ms=CROSSFADE_MS,
+                 smoother=None, parent=None):
+        """
+        Initialize the MoodScheduler.
+
+        :param channel_factory: a callable returning a SoundChannel, called twice on the first sound played
+        :param settle_ms: the time in milliseconds the reader must stay on a page before it is analyzed
+        :param crossfade_ms: the duration in milliseconds of a cross-fade
+        :param smoother: the MoodSmoother used, or None for a default one
+        :param parent: the parent QObject
+        :precondition: settle_ms and crossfade_ms must be non-negative integers
+        :postcondition: no sound is playing
+        """
+        super().__init__(parent)
+        self.channel_factory = channel_factory
+        self.channels = None
+        self.active = 0
+        self.sound = None
+        self.smoother = smoother if smoother is not None else MoodSmoother()
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(settle_ms)
+        self.settle_timer.timeout.connect(self.settled)
+        self.fade_steps = max(1, crossfade_ms // CROSSFADE_STEP_MS)
+        self.fade_step = 0
+        self.fade_timer = QTimer(self)
+        self.fade_timer.setInterval(CROSSFADE_STEP_MS)
+        self.fade_timer.timeout.connect(self.fade)
+
+    def page_turned(self):
+        """
+        Wait for the reader to stay on the page before it is analyzed.
+
+        :precondition: none
+        :postcondition: settled is emitted once no page has been turned for settle_ms
+        """
+        self.settle_timer.start()
+
+    def mood_ready(self, mood, sound):
+        """
+        Take the mood of the page the reader stayed on into account.
+
+        :param mood: the mood of the page
+        :param sound: the sound URL of the mood, or None if no sound could be found
+        :precondition: called on the GUI thread
+        :postcondition: the sound fades in if the smoothed mood changed to the mood of the page, otherwise it is
+                        loaded on the idle channel if the mood differs from the smoothed one; a page without a
+                        sound is not counted, so its mood is tried again on the next page
+        """
+        if sound is None:
+            return
+        previous = self.smoother.mood
+        smoothed = self.smoother.push(mood)
+        if smoothed != previous:
+            self.crossfade_to(sound)
+        elif mood != smoothed:
+            self.preload(sound)
+
+    def idle_channel(self):
+        """
+        Return the channel that is not playing the current sound, creating the channels on first use.
+
+        :precondition: none
+        :postcondition: both channels exist
+        :return: the idle SoundChannel
+        """
+        if self.channels is None:
+            self.channels = [self.channel_factory(), self.channel_factory()]
+        return self.channels[1 - self.active]
+
+    def preload(self, sound):
+        """
+        Load a sound on the idle channel ahead of a cross-fade to it.
+
+        :param sound: the sound URL to load
+        :precondition: sound must be a valid URL
+        :postcondition: the idle channel holds the sound, unless it is still fading out
+        """
+        if sound != self.sound and not self.fade_timer.isActive():
+            self.idle_channel().load(sound)
+
+    def crossfade_to(self, sound):
+        """
+        Start a sound on the idle channel and fade it in while the active channel fades out.
+
+        :param sound: the sound URL to play
+        :precondition: sound must be a valid URL
+        :postcondition: the idle channel becomes the active one, nothing happens if the sound is already playing
+        """
+        if sound == self.sound:
+            return
+        idle = self.idle_channel()
+        if self.fade_timer.isActive():
+            idle.stop()
+        self.active = 1 - self.active
+        self.sound = sound
+        channel = self.channels[self.active]
+        channel.set_volume(0.0)
+        channel.play(sound)
+        self.fade_step = 0
+        self.fade_timer.start()
+
+    def fade(self):
+        """
+        Move the cross-fade one step forward.
+
+        :precondition: called by the fade timer during a cross-fade
+        :postcondition: the faded out channel is stopped once the cross-fade is over
+        """
+        self.fade_step += 1
+        progress = min(1.0, self.fade_step / self.fade_steps)
+        self.channels[self.active].set_volume(progress)
+        self.channels[1 - self.active].set_volume(1.0 - progress)
+        if progress >= 1.0:
+            self.fade_timer.stop()
+            self.channels[1 - self.active].stop()
+
+    def reset(self):
+        """
+        Forget the moods of the book read, keeping the current sound until the next mood is known.
+
+        :precondition: none
+        :postcondition: no page is waiting to be analyzed
+        """
+        self.settle_timer.stop()
+        self.smoother.reset()
+
+    def stop(self):
+        """
+        Stop every sound.
+
+        :precondition: none
+        :postcondition: no page is waiting to be analyzed and both channels are silent
+        """
+        self.reset()
+        self.fade_timer.stop()
+        self.sound = None
+        for channel in self.channels or ():
+            channel.stop()
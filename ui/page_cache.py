@@ -0,0 +1,397 @@
+import math
+import threading
+from collections import OrderedDict
+
+from PySide6.QtCore import QRunnable, QThreadPool
+from PySide6.QtGui import QImage
+
+from functionalities.profiling import count, span
+
+PAGE_CACHE_BUDGET = 256 * 1024 * 1024
+READ_AHEAD_OFFSETS = (1, 2, -1)
+SCALE_STEP = 0.125
+MIN_SCALE = 0.25
+MAX_FULL_PAGE_PIXELS = 9_000_000
+TILE_SIZE = 1024
+
+
+def render_scale(page_width, viewport_width, device_pixel_ratio=1.0, zoom=1.0):
+    """
+    Choose the scale to render a page at so that it fills the width of the viewport on the screen.
+
+    :param page_width: the width of the page in points
+    :param viewport_width: the width of the viewport in logical pixels
+    :param device_pixel_ratio: the number of device pixels per logical pixel of the screen
+    :param zoom: the zoom chosen by the reader, 1.0 fitting the page to the viewport width
+    :precondition: every argument must be a positive number
+    :postcondition: the scale is rounded down to a multiple of SCALE_STEP, so the page never overflows the viewport
+                    and small resizes reuse cached pages
+    :return: the number of device pixels per point
+    """
+    scale = viewport_width * device_pixel_ratio * zoom / page_width
+    return max(MIN_SCALE, math.floor(scale / SCALE_STEP) * SCALE_STEP)
+
+
+def page_pixel_size(page_width, page_height, scale):
+    """
+    Compute the size of a page rendered at a scale.
+
+    :param page_width: the width of the page in points
+    :param page_height: the height of the page in points
+    :param scale: the number of device pixels per point
+    :precondition: every argument must be a positive number
+    :postcondition: nothing is rendered
+    :return: a tuple of (width, height) in device pixels
+    """
+    return math.ceil(page_width * scale), math.ceil(page_height * scale)
+
+
+def needs_tiles(width, height):
+    """
+    Check whether a rendered page is too large to be rendered in one piece.
+
+    :param width: the width of the rendered page in device pixels
+    :param height: the height of the rendered page in device pixels
+    :precondition: width and height must be positive integers
+    :postcondition: nothing is rendered
+    :return: True if the page must be rendered as tiles, False otherwise
+    """
+    return width * height > MAX_FULL_PAGE_PIXELS
+
+
+def tiles_in_rect(x, y, width, height, page_width, page_height, tile_size=TILE_SIZE):
+    """
+    List the tiles of a rendered page that intersect a rectangle.
+
+    :param x: the left of the rectangle in device pixels
+    :param y: the top of the rectangle in device pixels
+    :param width: the width of the rectangle in device pixels
+    :param height: the height of the rectangle in device pixels
+    :param page_width: the width of the rendered page in device pixels
+    :param page_height: the height of the rendered page in device pixels
+    :param tile_size: the width and height of a tile in device pixels
+    :precondition: every argument must be a non-negative integer, tile_size must be positive
+    :postcondition: nothing is rendered
+    :return: a list of (column, row) tuples, row by row
+    """
+    first_column, first_row = max(0, x // tile_size), max(0, y // tile_size)
+    last_column = min(math.ceil(page_width / tile_size), math.ceil((x + width) / tile_size))
+    last_row = min(math.ceil(page_height / tile_size), math.ceil((y + height) / tile_size))
+    return [(column, row) for row in range(first_row, last_row) for column in range(first_column, last_column)]
+
+
+class PixmapImage(QImage):
+    """
+    QImage that uses the pixel buffer of a PyMuPDF pixmap without copying it, and keeps the pixmap alive
+    for as long as the image exists.
+    """
+
+    def __init__(self, pix):
+        """
+        Initialize the PixmapImage.
+
+        :param pix: a fitz.Pixmap without alpha in the RGB colorspace
+        :precondition: the pixmap must not be modified while the image exists
+        :postcondition: the image shares the memory of the pixmap samples
+        """
+        super().__init__(pix.samples_mv, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
+        self.pix = pix
+
+
+def render_page_image(page, zoom, clip=None):
+    """
+    Render a PDF page, or a region of it, into a QImage.
+
+    :param page: a fitz.Page instance
+    :param zoom: the scale factor to render the page at
+    :param clip: a (x0, y0, x1, y1) tuple of the region to render in page points, or None for the whole page
+    :precondition: zoom must be a positive number
+    :postcondition: only the clipped region is rasterized and its pixels are not copied, so the image can be
+                    produced on a worker thread and handed to the GUI thread as is
+    :return: PixmapImage containing the rendered page or region
+    """
+    import fitz
+
+    with span("render.get_pixmap"):
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=fitz.Rect(clip) if clip is not None else None,
+                              alpha=False)
+    with span("render.qimage"):
+        return PixmapImage(pix)
+
+
+class PageCache:
+    """
+    Thread-safe LRU cache of rendered pages, keyed by (book, page, zoom) and bounded by a memory budget. Books are
+    identified by the path of their PDF file, which is named after the digest of its content, so a book that is
+    renamed keeps its pages and a different book never gets them.
+    """
+
+    def __init__(self, budget=PAGE_CACHE_BUDGET):
+        """
+        Initialize the PageCache.
+
+        :param budget: the maximum number of bytes of image data kept in the cache
+        :precondition: budget must be a positive integer
+        :postcondition: the cache is empty and its counters are zero
+        """
+        self.budget = budget
+        self.images = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return a cached page image and count the lookup as a hit or a miss.
+
+        :param key: a (book, page, zoom) tuple
+        :precondition: key must be hashable
+        :postcondition: a cached entry becomes the most recently used one
+        :return: the cached QImage, or None if the page is not cached
+        """
+        with self.lock:
+            image = self.images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.images.move_to_end(key)
+            return image
+
+    def contains(self, key):
+        """
+        Check whether a page image is cached without counting a lookup.
+
+        :param key: a (book, page, zoom) tuple
+        :precondition: key must be hashable
+        :postcondition: the cache is unchanged
+        :return: True if the page image is cached, False otherwise
+        """
+        with self.lock:
+            return key in self.images
+
+    def put(self, key, image):
+        """
+        Store a page image, evicting the least recently used images to stay within the budget.
+
+        :param key: a (book, page, zoom) tuple
+        :param image: the rendered QImage
+        :precondition: image must own or keep alive its pixel data
+        :postcondition: the cache holds the image unless it is larger than the whole budget
+        """
+        with self.lock:
+            previous = self.images.pop(key, None)
+            if previous is not None:
+                self.size -= previous.sizeInBytes()
+            if image.sizeInBytes() > self.budget:
+                return
+            self.images[key] = image
+            self.size += image.sizeInBytes()
+            while self.size > self.budget:
+                _, evicted = self.images.popitem(last=False)
+                self.size -= evicted.sizeInBytes()
+
+    def remove_book(self, book):
+        """
+        Remove every page and tile of a book from the cache.
+
+        :param book: the path of the PDF file of the book
+        :precondition: book must be a non-empty string
+        :postcondition: the cache holds no image of the book
+        """
+        with self.lock:
+            for key in [key for key in self.images if key[0] == book]:
+                self.size -= self.images.pop(key).sizeInBytes()
+
+    def clear(self):
+        """
+        Remove every image from the cache.
+
+        :precondition: none
+        :postcondition: the cache is empty, its counters are kept
+        """
+        with self.lock:
+            self.images.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        Return the hit/miss counters and the size of the cache.
+
+        :precondition: none
+        :postcondition: the cache is unchanged
+        :return: a dictionary with the hits, misses, entries and bytes of the cache
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self.images), "bytes": self.size}
+
+
+class ReadAheadWorker(QRunnable):
+    """
+    Background task that renders pages into the page cache before they are shown.
+    """
+
+    def __init__(self, renderer, book, book_path, pages, zoom):
+        """
+        Initialize the ReadAheadWorker.
+
+        :param renderer: the PageRenderer owning the cache
+        :param book: the path of the PDF file of the book, identifying it in the page cache
+        :param book_path: the path of the PDF file
+        :param pages: the page numbers to render
+        :param zoom: the scale factor to render the pages at
+        :precondition: pages must be valid page numbers of the book
+        :postcondition: the worker is ready to be started on the renderer's thread pool
+        """
+        super().__init__()
+        self.renderer = renderer
+        self.book = book
+        self.book_path = book_path
+        self.pages = pages
+        self.zoom = zoom
+
+    def run(self):
+        """
+        Render the pages into the page cache.
+
+        :precondition: the worker must be running on the renderer's thread pool
+        :postcondition: the pages are cached
+        """
+        self.renderer.render_ahead(self.book, self.book_path, self.pages, self.zoom)
+
+
+class PageRenderer:
+    """
+    Renders pages through a PageCache and speculatively renders neighbouring pages on a worker thread.
+    """
+
+    def __init__(self, cache=None):
+        """
+        Initialize the PageRenderer.
+
+        :param cache: the PageCache to render into, a new one is created if None
+        :precondition: none
+        :postcondition: the renderer has a single-threaded pool for read-ahead work
+        """
+        self.cache = cache if cache is not None else PageCache()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.ahead_path = None
+        self.ahead_document = None
+
+    def page_image(self, book, page, zoom):
+        """
+        Return the rendered image of a page, rendering it only if it is not cached.
+
+        :param book: the path of the PDF file of the book, identifying it in the page cache
+        :param page: a fitz.Page instance
+        :param zoom: the scale factor to render the page at
+        :precondition: called on the GUI thread
+        :postcondition: the rendered page is cached
+        :return: QImage containing the rendered page
+        """
+        key = (book, page.number, zoom)
+        image = self.cache.get(key)
+        if image is None:
+            count("render.cache_miss")
+            image = render_page_image(page, zoom)
+            self.cache.put(key, image)
+        else:
+            count("render.cache_hit")
+        return image
+
+    def page_tile(self, book, page, zoom, column, row, tile_size=TILE_SIZE):
+        """
+        Return the rendered image of a tile of a page, rendering only that region if it is not cached.
+
+        :param book: the path of the PDF file of the book, identifying it in the page cache
+        :param page: a fitz.Page instance
+        :param zoom: the scale factor to render the page at
+        :param column: the column of the tile
+        :param row: the row of the tile
+        :param tile_size: the width and height of a tile in device pixels
+        :precondition: called on the GUI thread, the tile must lie on the page
+        :postcondition: the rendered tile is cached
+        :return: QImage containing the rendered tile
+        """
+        key = (book, page.number, zoom, column, row)
+        image = self.cache.get(key)
+        if image is None:
+            x0, y0 = page.rect.x0, page.rect.y0
+            clip = (x0 + column * tile_size / zoom, y0 + row * tile_size / zoom,
+                    min(page.rect.x1, x0 + (column + 1) * tile_size / zoom),
+                    min(page.rect.y1, y0 + (row + 1) * tile_size / zoom))
+            image = render_page_image(page, zoom, clip)
+            self.cache.put(key, image)
+        return image
+
+    def read_ahead(self, book, book_path, page_num, page_count, zoom):
+        """
+        Queue the rendering of the pages around the current page.
+
+        :param book: the path of the PDF file of the book, identifying it in the page cache
+        :param book_path: the path of the PDF file
+        :param page_num: the page currently shown
+        :param page_count: the number of pages in the book
+        :param zoom: the scale factor to render the pages at
+        :precondition: page_num must be a valid page number
+        :postcondition: read-ahead work queued for earlier pages is dropped
+        """
+        pages = [page_num + offset for offset in READ_AHEAD_OFFSETS if 0 <= page_num + offset < page_count]
+        self.render_later(book, book_path, pages, zoom)
+
+    def render_later(self, book, book_path, pages, zoom):
+        """
+        Queue the rendering of pages that are not cached yet.
+
+        :param book: the path of the PDF file of the book, identifying it in the page cache
+        :param book_path: the path of the PDF file
+        :param pages: the page numbers to render, in the order they should be rendered
+        :param zoom: the scale factor to render the pages at
+        :precondition: pages must be valid page numbers of the book
+        :postcondition: read-ahead work queued earlier is dropped
+        """
+        pages = [page_num for page_num in pages if not self.cache.contains((book, page_num, zoom))]
+        self.pool.clear()
+        if pages:
+            self.pool.start(ReadAheadWorker(self, book, book_path, pages, zoom))
+
+    def render_ahead(self, book, book_path, pages, zoom):
+        """
+        Render pages into the cache using a document owned by the read-ahead thread.
+
+        :param book: the path of the PDF file of the book, identifying it in the page cache
+        :param book_path: the path of the PDF file
+        :param pages: the page numbers to render
+        :param zoom: the scale factor to render the pages at
+        :precondition: called on the read-ahead thread only
+        :postcondition: the pages are cached, except pages large enough to be rendered as tiles
+        """
+        import fitz
+
+        if self.ahead_path != book_path:
+            if self.ahead_document is not None:
+                self.ahead_document.close()
+            self.ahead_document = fitz.open(book_path)
+            self.ahead_path = book_path
+        for page_num in pages:
+            key = (book, page_num, zoom)
+            if not self.cache.contains(key):
+                page = self.ahead_document.load_page(page_num)
+                if not needs_tiles(*page_pixel_size(page.rect.width, page.rect.height, zoom)):
+                    self.cache.put(key, render_page_image(page, zoom))
+
+    def close(self):
+        """
+        Stop the read-ahead work and close the document it uses.
+
+        :precondition: none
+        :postcondition: no read-ahead work is running and its document is closed
+        """
+        self.pool.clear()
+        self.pool.waitForDone()
+        if self.ahead_document is not None:
+            self.ahead_document.close()
+            self.ahead_document = None
+            self.ahead_path = None
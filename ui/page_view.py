@@ -0,0 +1,205 @@
+from PySide6.QtCore import QRectF, Qt, QTimer
+from PySide6.QtGui import QColor, QPainter, QPixmap
+from PySide6.QtWidgets import QScrollArea, QWidget
+
+from functionalities.profiling import span
+from ui.page_cache import needs_tiles, page_pixel_size, render_scale, tiles_in_rect, TILE_SIZE
+
+ZOOM_STEP = 1.25
+MIN_ZOOM = 0.25
+MAX_ZOOM = 8.0
+RESIZE_DELAY_MS = 100
+
+
+class PageCanvas(QWidget):
+    """
+    Widget that paints a rendered page. A page rendered in one piece is converted to a QPixmap once, the only
+    copy of its pixels made on the GUI thread. Pages too large to render in one piece are painted from tiles,
+    and only the tiles of the region being repainted are rendered.
+    """
+
+    def __init__(self, renderer, parent=None):
+        """
+        Initialize the PageCanvas.
+
+        :param renderer: the PageRenderer used to render the page
+        :param parent: the parent QWidget
+        :precondition: a QApplication must exist
+        :postcondition: the canvas shows no page
+        """
+        super().__init__(parent)
+        self.renderer = renderer
+        self.book = None
+        self.page = None
+        self.scale = None
+        self.device_pixel_ratio = 1.0
+        self.pixel_size = (0, 0)
+        self.tiled = False
+        self.pixmap = None
+
+    def set_page(self, book, page, scale, device_pixel_ratio):
+        """
+        Show a page at a scale.
+
+        :param book: the path of the PDF file of the book, identifying it in the page cache
+        :param page: a fitz.Page instance
+        :param scale: the number of device pixels per point
+        :param device_pixel_ratio: the number of device pixels per logical pixel of the screen
+        :precondition: scale and device_pixel_ratio must be positive numbers
+        :postcondition: the canvas is resized to the page and repainted
+        """
+        self.book = book
+        self.page = page
+        self.scale = scale
+        self.device_pixel_ratio = device_pixel_ratio
+        self.pixel_size = page_pixel_size(page.rect.width, page.rect.height, scale)
+        self.tiled = needs_tiles(*self.pixel_size)
+        self.pixmap = None
+        self.setFixedSize(round(self.pixel_size[0] / device_pixel_ratio), round(self.pixel_size[1] / device_pixel_ratio))
+        self.update()
+
+    def paintEvent(self, event):
+        """
+        Paint the region of the page that needs repainting.
+
+        :param event: the QPaintEvent
+        :precondition: called by Qt on the GUI thread
+        :postcondition: the page, or the tiles intersecting the repainted region, are rendered if not cached
+        """
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), QColor("white"))
+        if self.page is None:
+            return
+        with span("page.paint"):
+            self.paint_page(painter, event.rect())
+
+    def paint_page(self, painter, region):
+        """
+        Paint a region of the page.
+
+        :param painter: the QPainter painting the canvas
+        :param region: the QRect of the canvas to paint, in logical pixels
+        :precondition: a page must be shown
+        :postcondition: the page, or the tiles intersecting the region, are rendered if not cached
+        """
+        ratio = self.device_pixel_ratio
+        if not self.tiled:
+            if self.pixmap is None:
+                image = self.renderer.page_image(self.book, self.page, self.scale)
+                with span("render.to_qpixmap"):
+                    self.pixmap = QPixmap.fromImage(image)
+                self.pixmap.setDevicePixelRatio(ratio)
+            painter.drawPixmap(0, 0, self.pixmap)
+            return
+        tiles = tiles_in_rect(int(region.x() * ratio), int(region.y() * ratio),
+                              int(region.width() * ratio) + 1, int(region.height() * ratio) + 1, *self.pixel_size)
+        for column, row in tiles:
+            image = self.renderer.page_tile(self.book, self.page, self.scale, column, row)
+            target = QRectF(column * TILE_SIZE / ratio, row * TILE_SIZE / ratio,
+                            image.width() / ratio, image.height() / ratio)
+            painter.drawImage(target, image)
+
+
+class PageView(QScrollArea):
+    """
+    Scroll area showing a page at a resolution chosen from the width of its viewport, the pixel density
+    of the screen and the zoom chosen by the reader.
+    """
+
+    def __init__(self, renderer, zoom=1.0, parent=None):
+        """
+        Initialize the PageView.
+
+        :param renderer: the PageRenderer used to render pages
+        :param zoom: the zoom chosen by the reader, 1.0 fitting the page to the viewport width
+        :param parent: the parent QWidget
+        :precondition: zoom must be between MIN_ZOOM and MAX_ZOOM
+        :postcondition: the view shows no page
+        """
+        super().__init__(parent)
+        self.renderer = renderer
+        self.zoom = zoom
+        self.book = None
+        self.page = None
+        self.canvas = PageCanvas(renderer)
+        self.setWidget(self.canvas)
+        self.setAlignment(Qt.AlignHCenter)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(RESIZE_DELAY_MS)
+        self.resize_timer.timeout.connect(self.update_scale)
+
+    def set_page(self, book, page):
+        """
+        Show a page of a book.
+
+        :param book: the path of the PDF file of the book, identifying it in the page cache
+        :param page: a fitz.Page instance
+        :precondition: page must belong to an open fitz.Document
+        :postcondition: the page is shown from its top and its neighbours are rendered ahead
+        """
+        self.book = book
+        self.page = page
+        self.update_scale()
+        self.verticalScrollBar().setValue(0)
+
+    def current_scale(self):
+        """
+        Return the scale the current page should be rendered at.
+
+        :precondition: a page must be shown
+        :postcondition: nothing is rendered
+        :return: the number of device pixels per point
+        """
+        return render_scale(self.page.rect.width, max(self.viewport().width(), 1), self.devicePixelRatioF(), self.zoom)
+
+    def update_scale(self):
+        """
+        Render the current page again if the scale it should be rendered at has changed.
+
+        :precondition: none
+        :postcondition: the canvas shows the current page at the current scale once the view is visible
+        """
+        if self.page is None or not self.isVisible():
+            return
+        scale = self.current_scale()
+        if (self.canvas.page, self.canvas.scale) == (self.page, scale):
+            return
+        self.canvas.set_page(self.book, self.page, scale, self.devicePixelRatioF())
+        if not self.canvas.tiled:
+            document = self.page.parent
+            self.renderer.read_ahead(self.book, document.name, self.page.number, len(document), scale)
+
+    def set_zoom(self, zoom):
+        """
+        Change the zoom, keeping it between MIN_ZOOM and MAX_ZOOM.
+
+        :param zoom: the new zoom, 1.0 fitting the page to the viewport width
+        :precondition: zoom must be a positive number
+        :postcondition: the current page is shown at the new zoom
+        """
+        self.zoom = min(MAX_ZOOM, max(MIN_ZOOM, zoom))
+        self.update_scale()
+
+    def showEvent(self, event):
+        """
+        Choose the scale of the page once the view has its size.
+
+        :param event: the QShowEvent
+        :precondition: called by Qt on the GUI thread
+        :postcondition: the canvas shows the current page at the current scale
+        """
+        super().showEvent(event)
+        self.update_scale()
+
+    def resizeEvent(self, event):
+        """
+        Render the page again for the new viewport width once resizing pauses.
+
+        :param event: the QResizeEvent
+        :precondition: called by Qt on the GUI thread
+        :postcondition: a scale update is scheduled
+        """
+        super().resizeEvent(event)
+        self.resize_timer.start()
@@ -0,0 +1,89 @@
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QLabel
+
+from functionalities.profiling import PROFILE_DUMP_PATH, get_profiler
+
+OVERLAY_REFRESH_MS = 1000
+PROFILE_DUMP_INTERVAL_MS = 10_000
+
+
+class ProfileOverlay(QLabel):
+    """
+    Label drawn over the window showing the latency percentiles and counters of the shared profiler while
+    profiling is on. The profile is also written to PROFILE_DUMP_PATH periodically and when profiling stops.
+    """
+
+    def __init__(self, parent, dump_path=PROFILE_DUMP_PATH):
+        """
+        Initialize the ProfileOverlay.
+
+        :param parent: the QWidget the overlay is drawn over
+        :param dump_path: the path the profile is written to, as JSON or as CSV if it ends with .csv
+        :precondition: a QApplication must exist
+        :postcondition: the overlay is shown if profiling is on
+        """
+        super().__init__(parent)
+        self.profiler = get_profiler()
+        self.dump_path = dump_path
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background: rgba(0, 0, 0, 170); color: white; font: 11px monospace; padding: 6px")
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(OVERLAY_REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.dump_timer = QTimer(self)
+        self.dump_timer.setInterval(PROFILE_DUMP_INTERVAL_MS)
+        self.dump_timer.timeout.connect(self.dump)
+        self.set_profiling(self.profiler.enabled)
+
+    def set_profiling(self, enabled):
+        """
+        Switch profiling on or off.
+
+        :param enabled: whether profiling is on
+        :precondition: enabled must be a boolean
+        :postcondition: the overlay is shown and refreshed while profiling is on, the profile is written when
+                        profiling stops
+        """
+        was_enabled = self.profiler.enabled
+        self.profiler.set_enabled(enabled)
+        if enabled:
+            self.refresh()
+            self.show()
+            self.refresh_timer.start()
+            self.dump_timer.start()
+        else:
+            self.hide()
+            self.refresh_timer.stop()
+            self.dump_timer.stop()
+            if was_enabled:
+                self.dump()
+
+    def toggle(self):
+        """
+        Switch profiling on if it is off, and off if it is on.
+
+        :precondition: none
+        :postcondition: the profiling state is inverted
+        """
+        self.set_profiling(not self.profiler.enabled)
+
+    def refresh(self):
+        """
+        Show the latest percentiles and counters.
+
+        :precondition: none
+        :postcondition: the overlay is resized to its text and raised above its siblings
+        """
+        self.setText(self.profiler.report() or "Profiling: turn a page")
+        self.adjustSize()
+        self.move(8, self.parentWidget().height() - self.height() - 8)
+        self.raise_()
+
+    def dump(self):
+        """
+        Write the profile to the dump file.
+
+        :precondition: none
+        :postcondition: the dump file holds the latest snapshot of the profiler
+        """
+        self.profiler.dump(self.dump_path)
@@ -0,0 +1,305 @@
+from bisect import bisect_left, bisect_right
+
+from PySide6.QtCore import QRect, QRectF, QTimer, Signal
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import QWidget
+
+from functionalities.profiling import span
+from ui.page_cache import needs_tiles, page_pixel_size, render_scale, tiles_in_rect, TILE_SIZE
+from ui.page_view import PageView
+
+PAGE_GAP = 8
+NEAR_VIEWPORTS = 1
+SCROLL_THROTTLE_MS = 250
+
+
+def page_offsets(heights, gap=PAGE_GAP):
+    """
+    Compute the top of every page of a continuous column of pages.
+
+    :param heights: the height of every page in logical pixels
+    :param gap: the space between two pages in logical pixels
+    :precondition: heights must contain non-negative numbers
+    :postcondition: nothing is rendered
+    :return: a list of the top of every page in logical pixels, the first page starting at 0
+    """
+    offsets = []
+    top = 0
+    for height in heights:
+        offsets.append(top)
+        top += height + gap
+    return offsets
+
+
+def page_at(offsets, y):
+    """
+    Find the page at a height of a continuous column of pages.
+
+    :param offsets: the top of every page as returned by page_offsets
+    :param y: the height in logical pixels
+    :precondition: offsets must not be empty
+    :postcondition: the gap below a page belongs to that page
+    :return: the page number
+    """
+    return max(0, bisect_right(offsets, y) - 1)
+
+
+def pages_between(offsets, heights, top, bottom):
+    """
+    Find the pages of a continuous column of pages that intersect a band of it.
+
+    :param offsets: the top of every page as returned by page_offsets
+    :param heights: the height of every page in logical pixels
+    :param top: the top of the band in logical pixels
+    :param bottom: the bottom of the band in logical pixels, excluded from it
+    :precondition: offsets and heights must have the same length
+    :postcondition: nothing is rendered
+    :return: a range of page numbers
+    """
+    if not offsets:
+        return range(0)
+    first = page_at(offsets, top)
+    if offsets[first] + heights[first] <= top:
+        first += 1
+    last = bisect_left(offsets, bottom)
+    return range(first, max(first, last))
+
+
+class ContinuousCanvas(QWidget):
+    """
+    Widget laying every page of a book out in one column. Every page has a placeholder of its final size
+    computed from the page sizes of the document, and a page is only rendered when it is painted. Rendered
+    pages are drawn from the page cache of the renderer, so they count against the same budget as the pages
+    shown one at a time and are never kept twice.
+    """
+
+    def __init__(self, renderer, parent=None):
+        """
+        Initialize the ContinuousCanvas.
+
+        :param renderer: the PageRenderer used to render the pages
+        :param parent: the parent QWidget
+        :precondition: a QApplication must exist
+        :postcondition: the canvas shows no page
+        """
+        super().__init__(parent)
+        self.renderer = renderer
+        self.book = None
+        self.document = None
+        self.scale = None
+        self.device_pixel_ratio = 1.0
+        self.pixel_sizes = []
+        self.widths = []
+        self.heights = []
+        self.offsets = []
+
+    def set_pages(self, book, document, page_sizes, scale, device_pixel_ratio):
+        """
+        Lay the pages of a book out at a scale.
+
+        :param book: the path of the PDF file of the book, identifying it in the page cache
+        :param document: the open fitz.Document of the book
+        :param page_sizes: the (width, height) of every page in points
+        :param scale: the number of device pixels per point
+        :param device_pixel_ratio: the number of device pixels per logical pixel of the screen
+        :precondition: scale and device_pixel_ratio must be positive numbers
+        :postcondition: the canvas is resized to the column of pages
+        """
+        self.book = book
+        self.document = document
+        self.scale = scale
+        self.device_pixel_ratio = device_pixel_ratio
+        self.pixel_sizes = [page_pixel_size(width, height, scale) for width, height in page_sizes]
+        self.widths = [round(width / device_pixel_ratio) for width, _ in self.pixel_sizes]
+        self.heights = [round(height / device_pixel_ratio) for _, height in self.pixel_sizes]
+        self.offsets = page_offsets(self.heights)
+        height = self.offsets[-1] + self.heights[-1] if self.offsets else 0
+        self.setFixedSize(max(self.widths, default=0), height)
+        self.update()
+
+    def page_rect(self, page_num):
+        """
+        Return the placeholder of a page.
+
+        :param page_num: the page number
+        :precondition: the pages must be laid out
+        :postcondition: nothing is rendered
+        :return: the QRect of the page on the canvas, in logical pixels
+        """
+        return QRect((self.width() - self.widths[page_num]) // 2, self.offsets[page_num],
+                     self.widths[page_num], self.heights[page_num])
+
+    def paintEvent(self, event):
+        """
+        Paint the pages intersecting the region that needs repainting.
+
+        :param event: the QPaintEvent
+        :precondition: called by Qt on the GUI thread
+        :postcondition: the pages, or their tiles intersecting the region, are rendered if they are not cached
+        """
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), QColor("lightgray"))
+        region = event.rect()
+        for page_num in pages_between(self.offsets, self.heights, region.top(), region.bottom() + 1):
+            rect = self.page_rect(page_num)
+            painter.fillRect(rect, QColor("white"))
+            with span("page.paint"):
+                self.paint_page(painter, page_num, rect, region.intersected(rect))
+        painter.end()
+
+    def paint_page(self, painter, page_num, rect, region):
+        """
+        Paint a region of a page.
+
+        :param painter: the QPainter painting the canvas
+        :param page_num: the page number
+        :param rect: the QRect of the page on the canvas, in logical pixels
+        :param region: the QRect of the canvas to paint, in logical pixels
+        :precondition: region must lie within rect
+        :postcondition: the page, or the tiles intersecting the region, are rendered if they are not cached
+        """
+        ratio = self.device_pixel_ratio
+        page = self.document.load_page(page_num)
+        if not needs_tiles(*self.pixel_sizes[page_num]):
+            painter.drawImage(QRectF(rect), self.renderer.page_image(self.book, page, self.scale))
+            return
+        tiles = tiles_in_rect(int((region.x() - rect.x()) * ratio), int((region.y() - rect.y()) * ratio),
+                              int(region.width() * ratio) + 1, int(region.height() * ratio) + 1,
+                              *self.pixel_sizes[page_num])
+        for column, row in tiles:
+            image = self.renderer.page_tile(self.book, page, self.scale, column, row)
+            target = QRectF(rect.x() + column * TILE_SIZE / ratio, rect.y() + row * TILE_SIZE / ratio,
+                            image.width() / ratio, image.height() / ratio)
+            painter.drawImage(target, image)
+
+
+class ContinuousPageView(PageView):
+    """
+    Scroll area showing every page of a book in one column at a width chosen from the widest page, the width of
+    the viewport, the pixel density of the screen and the zoom chosen by the reader. The pages near the viewport
+    are rendered ahead, and the page at the top of the viewport is announced at most every SCROLL_THROTTLE_MS.
+    """
+
+    page_changed = Signal(int)
+
+    def __init__(self, renderer, zoom=1.0, parent=None):
+        """
+        Initialize the ContinuousPageView.
+
+        :param renderer: the PageRenderer used to render pages
+        :param zoom: the zoom chosen by the reader, 1.0 fitting the widest page to the viewport width
+        :param parent: the parent QWidget
+        :precondition: zoom must be between MIN_ZOOM and MAX_ZOOM
+        :postcondition: the view shows no book
+        """
+        super().__init__(renderer, zoom, parent)
+        self.canvas = ContinuousCanvas(renderer)
+        self.setWidget(self.canvas)
+        self.document = None
+        self.page_sizes = []
+        self.current_page = 0
+        self.scroll_timer = QTimer(self)
+        self.scroll_timer.setSingleShot(True)
+        self.scroll_timer.setInterval(SCROLL_THROTTLE_MS)
+        self.scroll_timer.timeout.connect(self.update_current_page)
+        self.verticalScrollBar().valueChanged.connect(self.scrolled)
+
+    def set_document(self, book, document, page_sizes):
+        """
+        Show the pages of a book.
+
+        :param book: the path of the PDF file of the book, identifying it in the page cache
+        :param document: the open fitz.Document of the book
+        :param page_sizes: the (width, height) of every page in points, as cached by the document pool
+        :precondition: page_sizes must describe the pages of document
+        :postcondition: the book is shown from its first page once the view is visible
+        """
+        self.book = book
+        self.document = document
+        self.page_sizes = page_sizes
+        self.current_page = 0
+        self.canvas.scale = None
+        self.update_scale()
+
+    def current_scale(self):
+        """
+        Return the scale the pages should be rendered at.
+
+        :precondition: a book must be shown
+        :postcondition: nothing is rendered
+        :return: the number of device pixels per point
+        """
+        widest = max(width for width, _ in self.page_sizes)
+        return render_scale(widest, max(self.viewport().width(), 1), self.devicePixelRatioF(), self.zoom)
+
+    def update_scale(self):
+        """
+        Lay the pages out again if the scale they should be rendered at has changed.
+
+        :precondition: none
+        :postcondition: the current page stays at the top of the viewport
+        """
+        if self.document is None or not self.page_sizes or not self.isVisible():
+            return
+        scale = self.current_scale()
+        if (self.canvas.document, self.canvas.scale) == (self.document, scale):
+            return
+        self.canvas.set_pages(self.book, self.document, self.page_sizes, scale, self.devicePixelRatioF())
+        self.scroll_to_page(self.current_page)
+
+    def scroll_to_page(self, page_num):
+        """
+        Scroll to the top of a page.
+
+        :param page_num: the page number
+        :precondition: page_num must be a page number of the book
+        :postcondition: the page is at the top of the viewport once the pages are laid out, it is not announced
+        """
+        self.current_page = page_num
+        if self.canvas.offsets:
+            self.verticalScrollBar().setValue(self.canvas.offsets[page_num])
+            self.render_near_pages()
+
+    def scrolled(self, value):
+        """
+        Throttle the work done while the reader scrolls.
+
+        :param value: the position of the vertical scroll bar
+        :precondition: connected to the valueChanged signal of the vertical scroll bar
+        :postcondition: the current page is updated within SCROLL_THROTTLE_MS
+        """
+        if not self.scroll_timer.isActive():
+            self.scroll_timer.start()
+
+    def update_current_page(self):
+        """
+        Announce the page at the top of the viewport if it changed, and render the pages near the viewport ahead.
+
+        :precondition: the pages must be laid out
+        :postcondition: page_changed is emitted if the reader scrolled to another page
+        """
+        if not self.canvas.offsets:
+            return
+        self.render_near_pages()
+        scroll_bar = self.verticalScrollBar()
+        page_num = page_at(self.canvas.offsets, scroll_bar.value())
+        if scroll_bar.value() >= scroll_bar.maximum() and page_num < self.current_page:
+            return
+        if page_num != self.current_page:
+            self.current_page = page_num
+            self.page_changed.emit(page_num)
+
+    def render_near_pages(self):
+        """
+        Queue the rendering of the pages within NEAR_VIEWPORTS viewport heights of the viewport.
+
+        :precondition: the pages must be laid out
+        :postcondition: the pages below the viewport are rendered before the pages above it, pages already
+                        cached are not rendered again
+        """
+        top = self.verticalScrollBar().value()
+        height = self.viewport().height()
+        below = pages_between(self.canvas.offsets, self.canvas.heights, top, top + height * (1 + NEAR_VIEWPORTS))
+        above = pages_between(self.canvas.offsets, self.canvas.heights, top - height * NEAR_VIEWPORTS, top)
+        pages = list(dict.fromkeys([*below, *reversed(above)]))
+        self.renderer.render_later(self.book, self.document.name, pages, self.canvas.scale)
@@ -0,0 +1,145 @@
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from functionalities.crud import reconcile_library
+from functionalities.importer import import_books
+from functionalities.profiling import span
+from functionalities.sound import analyze_page, prefetch_sounds, resolve_sound
+
+
+class MoodWorkerSignals(QObject):
+    """
+    Signals emitted by a MoodWorker back to the GUI thread.
+    """
+    finished = Signal(int, str, object)
+
+
+class MoodWorker(QRunnable):
+    """
+    Background task that determines the mood of a page and resolves a sound for it.
+    """
+
+    def __init__(self, request_id, page_text, cancel_event, mood=None):
+        """
+        Initialize the MoodWorker.
+
+        :param request_id: the identifier of the page request this worker answers
+        :param page_text: the text of the page to analyze
+        :param cancel_event: a threading.Event that is set once the result is no longer wanted
+        :param mood: the already known mood of the page, or None if the page must be analyzed
+        :precondition: request_id must be an integer, page_text must be a string unless mood is given
+        :postcondition: the worker is ready to be started on a QThreadPool
+        """
+        super().__init__()
+        self.request_id = request_id
+        self.page_text = page_text
+        self.cancel_event = cancel_event
+        self.mood = mood
+        self.signals = MoodWorkerSignals()
+
+    def run(self):
+        """
+        Analyze the page unless its mood is known and fetch its sound, skipping any work once the request is cancelled.
+
+        :precondition: the worker must be running on a QThreadPool thread
+        :postcondition: emits finished with the request id, mood and sound URL unless cancelled
+        """
+        if self.cancel_event.is_set():
+            return
+        mood = self.mood if self.mood is not None else analyze_page(self.page_text)
+        if self.cancel_event.is_set():
+            return
+        with span("mood.resolve_sound"):
+            sound = resolve_sound(mood)
+        if self.cancel_event.is_set():
+            return
+        self.signals.finished.emit(self.request_id, mood, sound)
+
+
+class SoundPrefetchWorker(QRunnable):
+    """
+    Background task that downloads the sound previews of every mood.
+    """
+
+    def run(self):
+        """
+        Prefetch the sound previews of every mood into the audio cache.
+
+        :precondition: the worker must be running on a QThreadPool thread
+        :postcondition: the previews that could be fetched are stored locally
+        """
+        prefetched = prefetch_sounds()
+        print(f"Prefetched {sum(1 for path in prefetched.values() if path)} of {len(prefetched)} mood sounds")
+
+
+class ReconcileWorkerSignals(QObject):
+    """
+    Signals emitted by a ReconcileWorker back to the GUI thread.
+    """
+    finished = Signal(object)
+
+
+class ReconcileWorker(QRunnable):
+    """
+    Background task that brings the catalog in line with the books directory, storing the PDF files copied there
+    by hand under their digest.
+    """
+
+    def __init__(self):
+        """
+        Initialize the ReconcileWorker.
+
+        :precondition: none
+        :postcondition: the worker is ready to be started on a QThreadPool
+        """
+        super().__init__()
+        self.signals = ReconcileWorkerSignals()
+
+    def run(self):
+        """
+        Reconcile the catalog, hashing and moving the files copied by hand and scanning new or modified files.
+
+        :precondition: the worker must be running on a QThreadPool thread
+        :postcondition: the finished signal carries the list of paths of the books that were stored or scanned
+        """
+        self.signals.finished.emit(reconcile_library())
+
+
+class ImportWorkerSignals(QObject):
+    """
+    Signals emitted by an ImportWorker back to the GUI thread.
+    """
+    progress = Signal(int, int)
+    finished = Signal(object)
+
+
+class ImportWorker(QRunnable):
+    """
+    Background task that imports many books at once.
+    """
+
+    def __init__(self, paths):
+        """
+        Initialize the ImportWorker.
+
+        :param paths: a list of paths to PDF files or to directories containing them
+        :precondition: paths must contain strings
+        :postcondition: the worker is ready to be started on a QThreadPool
+        """
+        super().__init__()
+        self.paths = paths
+        self.signals = ImportWorkerSignals()
+
+    def run(self):
+        """
+        Import the books, reporting the progress after each file.
+
+        :precondition: the worker must be running on a QThreadPool thread
+        :postcondition: the finished signal carries the result of import_books, or a result listing every path as
+                        failed with the error under "error" if the import could not run
+        """
+        try:
+            result = import_books(self.paths, progress=self.signals.progress.emit)
+        except Exception as error:
+            print(f"Could not import {', '.join(self.paths)}: {error}")
+            result = {"added": [], "duplicates": [], "failed": list(self.paths), "error": str(error)}
+        self.signals.finished.emit(result)
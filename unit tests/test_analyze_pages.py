@@ -0,0 +1,26 @@
+from unittest import TestCase
+
+from functionalities.sound import analysis_pool, analyze_page, analyze_pages
+
+PAGES = [
+    "What a wonderful, happy and bright morning it was.",
+    "It was a good day.",
+    "The room was quiet and the tea was warm.",
+    "He walked to the station.",
+    "She felt lonely and a little sad.",
+    "The dark house was terrible and frightening.",
+    "He was furious, the worst and most horrible insult!",
+    "",
+]
+
+
+class TestAnalyzePages(TestCase):
+
+    def test_small_batch_matches_single_page(self):
+        self.assertEqual(analyze_pages(PAGES), [analyze_page(page) for page in PAGES])
+
+    def test_process_pool_matches_single_page(self):
+        with analysis_pool(max_workers=2) as executor:
+            result = analyze_pages(PAGES * 4, executor=executor, chunksize=3)
+
+        self.assertEqual(result, [analyze_page(page) for page in PAGES * 4])
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from functionalities.bookmarks import BookmarkStore
+
+
+class TestBookmarkStore(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'bookmarks', 'bookmarks.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_file(self):
+        with open(self.path, 'r') as file:
+            return json.load(file)
+
+    def test_bookmarks_are_loaded_once(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as file:
+            json.dump({'the-idiot': 12}, file)
+        store = BookmarkStore(self.path)
+
+        with patch('builtins.open') as mock_open:
+            self.assertEqual(store.get('the-idiot'), 12)
+            self.assertEqual(store.get('missing'), 0)
+
+        mock_open.assert_not_called()
+
+    def test_changes_are_coalesced_into_one_write(self):
+        store = BookmarkStore(self.path, flush_delay=0.05)
+
+        with patch('os.replace', wraps=os.replace) as mock_replace:
+            for page_num in range(1, 20):
+                store.set('the-idiot', page_num)
+            time.sleep(0.2)
+
+        mock_replace.assert_called_once()
+        self.assertEqual(self.read_file(), {'the-idiot': 19})
+
+    def test_flush_writes_pending_changes_immediately(self):
+        store = BookmarkStore(self.path, flush_delay=60)
+        store.set('the-idiot', 3)
+
+        store.flush()
+
+        self.assertEqual(self.read_file(), {'the-idiot': 3})
+        self.assertIsNone(store.timer)
+
+    def test_remove_deletes_bookmark(self):
+        store = BookmarkStore(self.path, flush_delay=60)
+        store.set('the-idiot', 3)
+        store.set('other', 5)
+        store.remove('the-idiot')
+
+        store.flush()
+
+        self.assertEqual(self.read_file(), {'other': 5})
+
+    def test_listeners_receive_the_bookmarks_changed_by_each_write(self):
+        store = BookmarkStore(self.path, flush_delay=60)
+        written = []
+        store.add_listener(written.append)
+        store.set('the-idiot', 7)
+        store.flush()
+        store.flush()
+
+        store.set('the-idiot', 7)
+        store.set('other', 3)
+        store.flush()
+
+        self.assertEqual(written, [{'the-idiot': 7}, {'other': 3}])
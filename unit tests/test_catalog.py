@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import fitz
+
+from functionalities.catalog import Catalog, scan_book
+
+
+class TestCatalog(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.catalog = Catalog(os.path.join(self.directory.name, 'catalog', 'library.db'))
+        self.scanned = []
+
+    def tearDown(self):
+        self.catalog.close()
+        self.directory.cleanup()
+
+    def make_pdf(self, file_name, pages=1, title=''):
+        path = os.path.join(self.directory.name, file_name)
+        with fitz.open() as document:
+            for _ in range(pages):
+                document.new_page()
+            document.set_metadata({'title': title, 'author': 'Anonymous' if title else ''})
+            document.save(path)
+        return path
+
+    def scan(self, path):
+        self.scanned.append(os.path.basename(path))
+        return scan_book(path)
+
+    def test_scan_book_reads_metadata_and_keeps_dotted_names(self):
+        record = scan_book(self.make_pdf('v1.2.pdf', pages=3, title='Release Notes'))
+
+        self.assertEqual('v1.2', record['name'])
+        self.assertEqual(3, record['page_count'])
+        self.assertEqual(('Release Notes', 'Anonymous'), (record['title'], record['author']))
+        self.assertEqual(64, len(record['digest']))
+
+    def test_reconcile_only_scans_new_and_changed_files(self):
+        first = self.make_pdf('first.pdf')
+        second = self.make_pdf('second.pdf')
+        self.catalog.reconcile([first, second], self.scan)
+        self.scanned.clear()
+
+        os.utime(second, (os.path.getmtime(second) + 60,) * 2)
+        self.catalog.reconcile([first, second], self.scan)
+
+        self.assertEqual(['second.pdf'], self.scanned)
+
+    def test_reconcile_drops_removed_files(self):
+        first = self.make_pdf('first.pdf')
+        second = self.make_pdf('second.pdf')
+        self.catalog.reconcile([first, second], self.scan)
+
+        self.catalog.reconcile([second], self.scan)
+
+        self.assertEqual(['second'], [book['name'] for book in self.catalog.books()])
+
+    def test_bookmarks_survive_rescans(self):
+        path = self.make_pdf('book.pdf', pages=5)
+        record = scan_book(path)
+        self.catalog.put(record)
+        self.catalog.store_bookmarks({record['digest']: 4, 'book': 2})
+        self.catalog.put(scan_book(path))
+
+        self.assertEqual(4, self.catalog.book('book')['bookmark'])
+
+    def test_books_with_the_same_name_are_both_kept(self):
+        self.catalog.put(scan_book(self.make_pdf('notes.pdf')))
+        os.makedirs(os.path.join(self.directory.name, 'other'))
+        self.catalog.put(scan_book(self.make_pdf(os.path.join('other', 'Notes.pdf'), pages=2)))
+
+        self.assertEqual([('Notes-2', 2), ('notes', 1)],
+                         [(book['name'], book['page_count']) for book in self.catalog.books()])
+
+    def test_books_are_found_by_digest(self):
+        path = self.make_pdf('book.pdf')
+        copy = os.path.join(self.directory.name, 'copy.pdf')
+        shutil.copyfile(path, copy)
+        self.catalog.put(scan_book(path))
+
+        self.assertEqual(os.path.abspath(path), self.catalog.find_digest(scan_book(copy)['digest']))
+
+    def test_rename_keeps_the_file_and_refuses_taken_names(self):
+        self.catalog.put(scan_book(self.make_pdf('first.pdf'), name='First'))
+        self.catalog.put(scan_book(self.make_pdf('second.pdf', pages=2), name='Second'))
+
+        self.assertFalse(self.catalog.rename('First', 'second'))
+        self.assertTrue(self.catalog.rename('First', 'Renamed'))
+        self.assertEqual(os.path.abspath(os.path.join(self.directory.name, 'first.pdf')),
+                         self.catalog.book('Renamed')['path'])
+        self.assertIsNone(self.catalog.book('First'))
@@ -0,0 +1,77 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import fitz
+
+from functionalities import documents
+from functionalities.documents import DocumentPool
+
+
+class TestDocumentPool(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.pool = DocumentPool(size=2)
+
+    def tearDown(self):
+        self.pool.close_all()
+        self.directory.cleanup()
+
+    def make_pdf(self, name, pages=2):
+        path = os.path.join(self.directory.name, name)
+        with fitz.open() as document:
+            for page_num in range(pages):
+                document.new_page(width=300, height=400).insert_text((72, 72), f"Chapter {page_num + 1}")
+            document.set_toc([[1, f"Chapter {page_num + 1}", page_num + 1] for page_num in range(pages)])
+            document.save(path)
+        return path
+
+    def test_documents_are_reused_until_evicted(self):
+        first, second, third = (self.make_pdf(name) for name in ('a.pdf', 'b.pdf', 'c.pdf'))
+        first_document = self.pool.open(first)
+        self.assertIs(first_document, self.pool.open(first))
+
+        second_document = self.pool.open(second)
+        self.pool.open(first)
+        self.pool.open(third)
+
+        self.assertTrue(second_document.is_closed)
+        self.assertFalse(first_document.is_closed)
+
+    def test_info_does_not_evict_open_documents(self):
+        first, second, third = (self.make_pdf(name) for name in ('a.pdf', 'b.pdf', 'c.pdf'))
+        documents_in_use = [self.pool.open(first), self.pool.open(second)]
+
+        self.assertEqual(2, self.pool.info(third)['page_count'])
+
+        self.assertEqual([False, False], [document.is_closed for document in documents_in_use])
+        self.assertEqual([os.path.abspath(first), os.path.abspath(second)], list(self.pool.documents))
+
+    def test_close_all_closes_every_document(self):
+        document = self.pool.open(self.make_pdf('a.pdf'))
+        self.pool.close_all()
+        self.assertTrue(document.is_closed)
+        self.assertEqual({}, dict(self.pool.documents))
+
+    def test_info_is_read_once_while_the_file_is_unchanged(self):
+        path = self.make_pdf('a.pdf', pages=3)
+        with patch.object(documents, 'read_document_info', wraps=documents.read_document_info) as read:
+            info = self.pool.info(path)
+            self.pool.close_all()
+            self.assertIs(info, self.pool.info(path))
+        self.assertEqual(1, read.call_count)
+        self.assertEqual(3, info['page_count'])
+        self.assertEqual([(300, 400)] * 3, info['page_sizes'])
+        self.assertEqual([1, 'Chapter 2', 2], info['outline'][1])
+
+    def test_changed_file_is_opened_again(self):
+        path = self.make_pdf('a.pdf', pages=1)
+        document = self.pool.open(path)
+        self.pool.info(path)
+        os.remove(path)
+        self.make_pdf('a.pdf', pages=4)
+
+        self.assertEqual(4, self.pool.info(path)['page_count'])
+        self.assertTrue(document.is_closed)
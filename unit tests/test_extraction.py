@@ -0,0 +1,31 @@
+from unittest import TestCase
+
+import fitz
+
+from functionalities.extraction import is_textless, iter_page_samples, page_sample
+
+
+class TestExtraction(TestCase):
+
+    def setUp(self):
+        self.document = fitz.open()
+        page = self.document.new_page()
+        for line in range(10):
+            page.insert_text((72, 72 + line * 60), f"Paragraph {line} of a dense page")
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), False)
+        self.document.new_page().insert_image(fitz.Rect(72, 72, 144, 144), pixmap=pixmap)
+
+    def tearDown(self):
+        self.document.close()
+
+    def test_sample_stops_at_the_limit_on_a_word_boundary(self):
+        page = self.document.load_page(0)
+        self.assertEqual(page.get_text(), page_sample(page, limit=10_000))
+        sample = page_sample(page, limit=40)
+        self.assertEqual("Paragraph 0 of a dense page\nParagraph 1", sample)
+
+    def test_image_only_page_has_no_text(self):
+        samples = dict(iter_page_samples(self.document))
+        self.assertFalse(is_textless(samples[0]))
+        self.assertTrue(is_textless(samples[1]))
+        self.assertEqual("", samples[1])
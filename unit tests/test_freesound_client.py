@@ -0,0 +1,157 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+from unittest.mock import patch
+
+from functionalities import sound
+from functionalities.sound import FreesoundClient
+
+
+class StubFreesoundHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.client_address))
+        if self.path.startswith("/previews/"):
+            self.send_preview()
+            return
+        status, body = server.responses.pop(0) if server.responses else (200, server.default)
+        if status == "hang":
+            time.sleep(1)
+            status, body = 200, {}
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            if status == 429 and server.retry_after is not None:
+                self.send_header("Retry-After", server.retry_after)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def send_preview(self):
+        content = self.server.preview
+        offset = 0
+        if self.headers.get("Range"):
+            offset = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            self.server.ranges.append(offset)
+            self.send_response(206)
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(content) - offset))
+        self.end_headers()
+        self.wfile.write(content[offset:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFreesoundClient(TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubFreesoundHandler)
+        self.server.requests = []
+        self.server.responses = []
+        self.server.default = {}
+        self.server.preview = bytes(range(256)) * 1024
+        self.server.ranges = []
+        self.server.retry_after = None
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.server_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        base_url = f"{self.server_url}/apiv2"
+        self.client = FreesoundClient(api_key="key", base_url=base_url, timeout=(1, 0.2), retries=2, backoff=0,
+                                      failure_threshold=2, cooldown=60)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_search_resolves_preview_over_one_connection(self):
+        self.server.responses = [
+            (200, {"results": [{"id": 42}]}),
+            (200, {"previews": {"preview-lq-mp3": "http://example.com/42.mp3"}}),
+        ]
+
+        result = self.client.search("happy piano sound")
+
+        self.assertEqual(result, "http://example.com/42.mp3")
+        self.assertTrue(self.server.requests[0][0].startswith("/apiv2/search/text/?query=happy+piano+sound"))
+        self.assertTrue(self.server.requests[1][0].startswith("/apiv2/sounds/42/"))
+        self.assertEqual(self.server.requests[0][1], self.server.requests[1][1])
+
+    def test_server_errors_are_retried(self):
+        self.server.responses = [(503, {}), (429, {}), (200, {"previews": {"preview-hq-mp3": "http://example.com/7.mp3"}})]
+
+        result = self.client.sound_details(7)
+
+        self.assertEqual(result, "http://example.com/7.mp3")
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_rate_limits_wait_for_retry_after(self):
+        self.server.responses = [(429, {}), (200, {"previews": {"preview-hq-mp3": "http://example.com/7.mp3"}})]
+        self.server.retry_after = "1"
+
+        start = time.monotonic()
+        result = self.client.sound_details(7)
+
+        self.assertEqual(result, "http://example.com/7.mp3")
+        self.assertGreaterEqual(time.monotonic() - start, 0.9)
+
+    def test_shared_client_is_created_once(self):
+        created = []
+
+        def slow_client():
+            time.sleep(0.05)
+            created.append(object())
+            return created[-1]
+
+        with patch.object(sound, '_freesound_client', None), patch.object(sound, 'FreesoundClient', slow_client):
+            threads = [threading.Thread(target=sound.get_freesound_client) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(1, len(created))
+            self.assertIs(created[0], sound.get_freesound_client())
+
+    def test_slow_response_times_out(self):
+        self.server.responses = [("hang", None)] * 3
+
+        start = time.monotonic()
+        result = self.client.sound_details(7)
+
+        self.assertIsNone(result)
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        self.server.responses = [(500, {})] * 6
+
+        self.client.sound_details(1)
+        self.client.sound_details(2)
+        sent = len(self.server.requests)
+        result = self.client.sound_details(3)
+
+        self.assertIsNone(result)
+        self.assertEqual(len(self.server.requests), sent)
+
+    def test_download_resumes_partial_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            destination = os.path.join(directory, "preview.mp3")
+            with open(destination + ".part", "wb") as file:
+                file.write(self.server.preview[:1000])
+
+            result = self.client.download(f"{self.server_url}/previews/1.mp3", destination)
+
+            self.assertTrue(result)
+            self.assertEqual(self.server.ranges, [1000])
+            self.assertFalse(os.path.exists(destination + ".part"))
+            with open(destination, "rb") as file:
+                self.assertEqual(file.read(), self.server.preview)
@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from unittest.mock import patch
+
+import fitz
+
+from functionalities import crud
+from functionalities.catalog import Catalog, file_digest
+from functionalities.importer import find_pdfs, import_books
+
+
+class TestImporter(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.books_dir = os.path.join(self.directory.name, 'books')
+        self.thumb_dir = os.path.join(self.directory.name, 'thumbnails')
+        self.source_dir = os.path.join(self.directory.name, 'source')
+        os.makedirs(os.path.join(self.source_dir, 'nested'))
+        self.catalog = Catalog(':memory:')
+        for patcher in (patch.multiple(crud, BOOKS_DIR=self.books_dir, THUMB_DIR=self.thumb_dir),
+                        patch('functionalities.catalog._catalog', self.catalog)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_pdf(self, relative_path, text):
+        path = os.path.join(self.source_dir, relative_path)
+        with fitz.open() as document:
+            document.new_page().insert_text((72, 72), text)
+            document.save(path)
+        return path
+
+    def import_with_threads(self, paths, progress=None):
+        with ThreadPoolExecutor(2) as pool:
+            return import_books(paths, executor=pool, progress=progress)
+
+    def test_find_pdfs_searches_folders_recursively(self):
+        first = self.make_pdf('a.pdf', 'a')
+        second = self.make_pdf(os.path.join('nested', 'b.PDF'), 'b')
+        with open(os.path.join(self.source_dir, 'notes.txt'), 'w') as file:
+            file.write('not a book')
+        self.assertEqual(sorted([first, second]), find_pdfs([self.source_dir, first]))
+
+    def test_folder_is_imported_with_thumbnails_and_progress(self):
+        first = self.make_pdf('a.pdf', 'a')
+        second = self.make_pdf(os.path.join('nested', 'b.pdf'), 'b')
+        progress = []
+
+        result = self.import_with_threads([self.source_dir], progress=lambda done, total: progress.append(done))
+
+        stored = sorted(os.path.abspath(crud.stored_path(file_digest(path))) for path in (first, second))
+        self.assertEqual(stored, result['added'])
+        thumbnails = sorted(os.path.basename(path) + '.png' for path in stored)
+        self.assertEqual(thumbnails, sorted(os.listdir(self.thumb_dir)))
+        self.assertEqual(['a', 'b'], [book['name'] for book in self.catalog.books()])
+        self.assertEqual([0, 1, 2], progress)
+
+    def test_duplicates_are_detected_by_content(self):
+        original = self.make_pdf('a.pdf', 'same')
+        self.import_with_threads([original])
+        copy = os.path.join(self.source_dir, 'nested', 'renamed.pdf')
+        shutil.copyfile(original, copy)
+        different = self.make_pdf(os.path.join('nested', 'a.pdf'), 'different')
+
+        result = self.import_with_threads([copy, different])
+
+        self.assertEqual([(copy, os.path.abspath(crud.stored_path(file_digest(original))))], result['duplicates'])
+        self.assertEqual([os.path.abspath(crud.stored_path(file_digest(different)))], result['added'])
+        self.assertEqual(['a', 'a-2'], [book['name'] for book in self.catalog.books()])
+
+    def test_store_file_keeps_one_copy_of_each_content(self):
+        original = self.make_pdf('a.pdf', 'same')
+        copy = os.path.join(self.source_dir, 'nested', 'copy.pdf')
+        shutil.copyfile(original, copy)
+
+        stored = [crud.store_file(path) for path in (original, copy)]
+
+        self.assertEqual(stored[0], stored[1])
+        self.assertEqual((crud.stored_path(file_digest(original)), file_digest(original)), stored[0])
+        self.assertEqual([os.path.basename(stored[0][0])], os.listdir(self.books_dir))
+
+    def test_add_book_copies_new_content_only(self):
+        original = self.make_pdf('a.pdf', 'same')
+        copy = os.path.join(self.source_dir, 'nested', 'copy.pdf')
+        shutil.copyfile(original, copy)
+
+        with patch.object(crud, 'store_file', wraps=crud.store_file) as store_file, \
+                patch.object(crud, 'file_digest', wraps=crud.file_digest) as digest, \
+                patch.object(crud, 'get_thumbnail_queue'), patch.object(crud, 'get_search_index_queue'), \
+                patch('functionalities.mood_index.start_mood_index'):
+            self.assertTrue(crud.add_book(original))
+            self.assertEqual((1, 0), (store_file.call_count, digest.call_count))
+            self.assertFalse(crud.add_book(copy))
+            self.assertEqual((1, 1), (store_file.call_count, digest.call_count))
+
+        self.assertEqual([os.path.basename(crud.stored_path(file_digest(original)))], os.listdir(self.books_dir))
+
+    def test_failed_copies_leave_nothing_behind(self):
+        self.make_pdf('a.pdf', 'a')
+        with patch.object(crud, 'add_thumbnail', side_effect=RuntimeError('broken')):
+            result = self.import_with_threads([self.source_dir])
+        self.assertEqual([], result['added'])
+        self.assertEqual(1, len(result['failed']))
+        self.assertEqual([], os.listdir(self.books_dir))
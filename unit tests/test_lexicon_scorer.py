@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from textblob import TextBlob
+
+from functionalities.lexicon import LexiconScorer
+
+PHRASES = [
+    "It was a good day.",
+    "very good",
+    "not good",
+    "not very good",
+    "good!",
+    "I am not a happy man",
+    "really bad",
+    "terribly sad",
+    "The station was in the town.",
+]
+
+
+class TestLexiconScorer(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.scorer = LexiconScorer()
+
+    def test_phrases_match_textblob(self):
+        for phrase in PHRASES:
+            with self.subTest(phrase=phrase):
+                self.assertAlmostEqual(self.scorer.polarities([phrase])[0], TextBlob(phrase).sentiment.polarity)
+
+    def test_batch_matches_single_pages(self):
+        batch = self.scorer.polarities(PHRASES)
+
+        for phrase, polarity in zip(PHRASES, batch):
+            self.assertAlmostEqual(polarity, self.scorer.polarities([phrase])[0])
+
+    def test_empty_pages_are_neutral(self):
+        self.assertEqual(list(self.scorer.polarities(["", "   "])), [0.0, 0.0])
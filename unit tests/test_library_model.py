@@ -0,0 +1,66 @@
+import os
+from unittest import TestCase
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication
+
+from ui.library_model import LibraryModel
+
+
+class TestLibraryModel(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.model = LibraryModel()
+        self.model.set_books([{"name": "war", "path": "/books/war.pdf", "title": "War and Peace", "author": "Tolstoy"},
+                              {"name": "anna", "path": "/books/anna.pdf", "title": None, "author": None}])
+        self.inserted = []
+        self.removed = []
+        self.model.rowsInserted.connect(lambda parent, first, last: self.inserted.append((first, last)))
+        self.model.rowsRemoved.connect(lambda parent, first, last: self.removed.append((first, last)))
+
+    def names(self):
+        return [self.model.data(self.model.index(row)) for row in range(self.model.rowCount())]
+
+    def test_books_are_sorted_by_name(self):
+        self.assertEqual(self.names(), ["anna", "war"])
+
+    def test_add_book_inserts_one_row(self):
+        self.model.add_book({"name": "idiot", "path": "/books/idiot.pdf"})
+
+        self.assertEqual(self.names(), ["anna", "idiot", "war"])
+        self.assertEqual(self.inserted, [(1, 1)])
+
+    def test_remove_book_removes_one_row(self):
+        self.model.remove_book("anna")
+
+        self.assertEqual(self.names(), ["war"])
+        self.assertEqual(self.removed, [(0, 0)])
+
+    def test_missing_thumbnail_uses_placeholder(self):
+        pixmap = self.model.data(self.model.index(0), Qt.DecorationRole)
+
+        self.assertIs(pixmap, self.model.placeholder)
+        self.assertEqual(self.model.thumbnails, {})
+
+    def test_path_role_returns_book_path(self):
+        self.assertEqual(self.model.data(self.model.index(1), LibraryModel.PathRole), "/books/war.pdf")
+
+    def test_tooltip_shows_metadata_or_name(self):
+        self.assertEqual(self.model.data(self.model.index(0), Qt.ToolTipRole), "anna")
+        self.assertEqual(self.model.data(self.model.index(1), Qt.ToolTipRole), "War and Peace - Tolstoy")
+
+    def test_rename_book_moves_one_row(self):
+        moved = []
+        self.model.rowsMoved.connect(lambda parent, first, last, destination, row: moved.append((first, row)))
+
+        self.model.rename_book("anna", "zola")
+
+        self.assertEqual(self.names(), ["war", "zola"])
+        self.assertEqual(moved, [(0, 2)])
+        self.assertEqual(self.inserted + self.removed, [])
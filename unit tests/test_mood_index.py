@@ -0,0 +1,100 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import fitz
+
+from functionalities import mood_index
+from functionalities.mood_index import MoodIndex, build_mood_index, get_mood_index
+
+
+def make_book(path, pages):
+    document = fitz.open()
+    for page_num in range(pages):
+        document.new_page().insert_text((72, 72), f"Page {page_num}")
+    document.save(path)
+    document.close()
+
+
+class TestMoodIndex(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.directory.name, 'book.pdf')
+        make_book(self.book_path, 5)
+        patcher = patch.object(mood_index, 'MOODS_DIR', os.path.join(self.directory.name, 'moods'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(mood_index._indexes.clear)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record_maps_polarity_to_mood(self):
+        index = MoodIndex('unused.json', 2)
+
+        index.record(1, 0.6)
+
+        self.assertIsNone(index.mood(0))
+        self.assertEqual(index.mood(1), 'excited')
+        self.assertEqual(index.unscored_pages(), [0])
+
+    def test_saved_index_is_loaded(self):
+        index = get_mood_index(self.book_path, 5)
+        index.record(2, -0.3)
+        index.save()
+        mood_index._indexes.clear()
+
+        loaded = get_mood_index(self.book_path, 5)
+
+        self.assertEqual(loaded.mood(2), 'fearful')
+        self.assertEqual(loaded.polarities[2], -0.3)
+
+    def test_index_for_other_page_count_is_discarded(self):
+        index = MoodIndex.load(self.book_path, 5)
+        index.record(0, 0.3)
+        index.save()
+
+        self.assertIsNone(MoodIndex.load(self.book_path, 6).mood(0))
+
+    @patch('functionalities.mood_index.page_polarities', side_effect=lambda texts, executor: [0.0] * len(texts))
+    def test_build_resumes_from_unscored_pages(self, mock_polarities):
+        index = get_mood_index(self.book_path, 5)
+        index.record(0, 0.3)
+        index.record(1, 0.3)
+
+        build_mood_index(self.book_path)
+
+        self.assertEqual(len(mock_polarities.call_args[0][0]), 3)
+        self.assertTrue(index.is_complete())
+        self.assertEqual(MoodIndex.load(self.book_path, 5).mood(4), 'neutral')
+
+    @patch('functionalities.mood_index.page_polarities', side_effect=lambda texts, executor: [0.6] * len(texts))
+    def test_pages_without_text_take_the_mood_of_the_page_before(self, mock_polarities):
+        blank_path = os.path.join(self.directory.name, 'blank.pdf')
+        with fitz.open() as document:
+            document.new_page()
+            document.new_page().insert_text((72, 72), "Text")
+            document.new_page()
+            document.save(blank_path)
+
+        index = build_mood_index(blank_path)
+
+        self.assertEqual(['Text\n'], mock_polarities.call_args[0][0])
+        self.assertTrue(index.is_complete())
+        self.assertEqual([None, 'excited', 'excited'], [index.mood(page_num) for page_num in range(3)])
+        self.assertEqual('excited', MoodIndex.load(blank_path, 3).mood(2))
+
+    @patch('functionalities.mood_index.page_polarities', side_effect=RuntimeError('cannot schedule new futures'))
+    @patch('builtins.print')
+    def test_stopped_pass_scores_nothing_and_prints_nothing(self, mock_print, mock_polarities):
+        with patch.object(mood_index, '_stopping', mood_index.threading.Event()):
+            mood_index.stop_mood_indexes()
+
+            index = build_mood_index(self.book_path)
+            mood_index.start_mood_index(self.book_path).join()
+
+        self.assertEqual(index.unscored_pages(), [0, 1, 2, 3, 4])
+        mock_polarities.assert_not_called()
+        mock_print.assert_not_called()
@@ -0,0 +1,116 @@
+import os
+from unittest import TestCase
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtTest import QTest
+
+from ui.mood_scheduler import MoodScheduler, MoodSmoother
+
+
+class FakeChannel:
+
+    def __init__(self):
+        self.loads = []
+        self.plays = []
+        self.volume = 0.0
+        self.playing = False
+
+    def load(self, sound):
+        self.loads.append(sound)
+
+    def play(self, sound):
+        self.plays.append(sound)
+        self.playing = True
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+    def stop(self):
+        self.playing = False
+
+
+class TestMoodSmoother(TestCase):
+
+    def test_one_outlier_page_does_not_change_the_mood(self):
+        smoother = MoodSmoother(window=5, switch_votes=3)
+        moods = [smoother.push(mood) for mood in ["calm", "calm", "sad", "calm", "sad", "sad"]]
+        self.assertEqual(["calm"] * 5 + ["sad"], moods)
+
+    def test_unknown_moods_are_ignored(self):
+        smoother = MoodSmoother()
+        self.assertIsNone(smoother.push(None))
+        self.assertEqual("happy", smoother.push("happy"))
+        self.assertEqual("happy", smoother.push(None))
+
+
+class TestMoodScheduler(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.channels = []
+        self.scheduler = MoodScheduler(channel_factory=self.make_channel, settle_ms=20, crossfade_ms=100)
+        self.settled = []
+        self.scheduler.settled.connect(lambda: self.settled.append(True))
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def make_channel(self):
+        channel = FakeChannel()
+        self.channels.append(channel)
+        return channel
+
+    def restarts(self):
+        return sum(len(channel.plays) for channel in self.channels)
+
+    def test_fast_flipping_restarts_the_player_once(self):
+        page_moods = ["calm", "sad", "angry", "happy"] * 10
+        for mood in page_moods:
+            self.scheduler.page_turned()
+            QTest.qWait(2)
+        QTest.qWait(60)
+
+        self.assertEqual(1, len(self.settled))
+        self.scheduler.mood_ready(page_moods[-1], "file:///happy.mp3")
+        self.assertEqual(1, self.restarts())
+
+    def test_mood_switches_after_several_pages_and_cross_fades(self):
+        for mood in ["calm", "calm", "sad", "calm", "sad", "calm"]:
+            self.scheduler.mood_ready(mood, f"file:///{mood}.mp3")
+        self.assertEqual(1, self.restarts())
+
+        for mood in ["sad", "sad", "sad"]:
+            self.scheduler.mood_ready(mood, f"file:///{mood}.mp3")
+        self.assertEqual(2, self.restarts())
+        faded_in = self.channels[self.scheduler.active]
+        faded_out = self.channels[1 - self.scheduler.active]
+        self.assertEqual((["file:///sad.mp3"], ["file:///calm.mp3"]), (faded_in.plays, faded_out.plays))
+
+        QTest.qWait(300)
+        self.assertEqual((1.0, 0.0), (faded_in.volume, faded_out.volume))
+        self.assertTrue(faded_in.playing)
+        self.assertFalse(faded_out.playing)
+
+    def test_candidate_sound_is_loaded_before_the_switch(self):
+        self.scheduler.mood_ready("calm", "file:///calm.mp3")
+        QTest.qWait(200)
+        self.scheduler.mood_ready("sad", "file:///sad.mp3")
+
+        self.assertEqual(1, self.restarts())
+        self.assertEqual(["file:///sad.mp3"], self.channels[1 - self.scheduler.active].loads)
+
+    def test_moods_without_a_sound_are_tried_again(self):
+        self.scheduler.mood_ready("calm", "file:///calm.mp3")
+        for _ in range(3):
+            self.scheduler.mood_ready("sad", None)
+        self.assertEqual("calm", self.scheduler.smoother.mood)
+
+        for _ in range(3):
+            self.scheduler.mood_ready("sad", "file:///sad.mp3")
+        self.assertEqual("sad", self.scheduler.smoother.mood)
+        self.assertEqual("file:///sad.mp3", self.scheduler.sound)
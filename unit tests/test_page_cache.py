@@ -0,0 +1,125 @@
+import gc
+from unittest import TestCase
+
+import fitz
+import numpy
+from PySide6.QtGui import QImage
+
+from ui.page_cache import PageCache, PageRenderer, TILE_SIZE, needs_tiles, page_pixel_size, render_page_image, \
+    render_scale, tiles_in_rect
+
+
+def make_image(width=100, height=100):
+    image = QImage(width, height, QImage.Format_RGB888)
+    image.fill(0)
+    return image
+
+
+class TestPageCache(TestCase):
+
+    def test_hits_and_misses_are_counted(self):
+        cache = PageCache()
+        cache.put(("book", 0, 2.0), make_image())
+
+        cache.get(("book", 0, 2.0))
+        cache.get(("book", 1, 2.0))
+
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_budget_evicts_least_recently_used(self):
+        image_size = make_image().sizeInBytes()
+        cache = PageCache(budget=image_size * 2)
+        cache.put(("book", 0, 2.0), make_image())
+        cache.put(("book", 1, 2.0), make_image())
+        cache.get(("book", 0, 2.0))
+
+        cache.put(("book", 2, 2.0), make_image())
+
+        self.assertTrue(cache.contains(("book", 0, 2.0)))
+        self.assertFalse(cache.contains(("book", 1, 2.0)))
+        self.assertEqual(cache.stats()["bytes"], image_size * 2)
+
+    def test_image_larger_than_budget_is_not_cached(self):
+        cache = PageCache(budget=10)
+
+        cache.put(("book", 0, 2.0), make_image())
+
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_zoom_is_part_of_the_key(self):
+        cache = PageCache()
+        cache.put(("book", 0, 2.0), make_image())
+
+        self.assertIsNone(cache.get(("book", 0, 1.0)))
+
+    def test_removed_book_keeps_no_pages_or_tiles(self):
+        cache = PageCache()
+        cache.put(("/books/a.pdf", 0, 2.0), make_image())
+        cache.put(("/books/a.pdf", 0, 2.0, 1, 0), make_image())
+        cache.put(("/books/b.pdf", 0, 2.0), make_image())
+
+        cache.remove_book("/books/a.pdf")
+
+        self.assertEqual([("/books/b.pdf", 0, 2.0)], list(cache.images))
+        self.assertEqual(make_image().sizeInBytes(), cache.stats()["bytes"])
+
+
+class TestRenderScale(TestCase):
+
+    def test_page_fills_the_viewport_width_in_device_pixels(self):
+        self.assertEqual(render_scale(500, 1000), 2.0)
+        self.assertEqual(render_scale(500, 1000, device_pixel_ratio=2.0), 4.0)
+        self.assertEqual(render_scale(500, 1000, zoom=1.5), 3.0)
+
+    def test_scale_is_rounded_so_small_resizes_hit_the_cache(self):
+        self.assertEqual(render_scale(500, 1000), render_scale(500, 1030))
+        self.assertLessEqual(render_scale(500, 998) * 500, 998)
+
+    def test_tiles_cover_only_the_requested_rect(self):
+        self.assertEqual(tiles_in_rect(0, 0, 100, 100, 3000, 3000, tile_size=1024), [(0, 0)])
+        self.assertEqual(tiles_in_rect(1000, 2000, 100, 100, 3000, 3000, tile_size=1024),
+                         [(0, 1), (1, 1), (0, 2), (1, 2)])
+        self.assertEqual(tiles_in_rect(2900, 0, 500, 10, 3000, 3000, tile_size=1024), [(2, 0)])
+
+    def test_needs_tiles_only_for_large_pages(self):
+        self.assertFalse(needs_tiles(*page_pixel_size(612, 792, 2.0)))
+        self.assertTrue(needs_tiles(*page_pixel_size(612, 792, 8.0)))
+
+
+class TestPageTiles(TestCase):
+
+    def setUp(self):
+        self.document = fitz.open()
+        self.document.new_page(width=600, height=800)
+        self.renderer = PageRenderer()
+
+    def tearDown(self):
+        self.renderer.close()
+        self.document.close()
+
+    def test_tile_renders_only_its_region(self):
+        page = self.document.load_page(0)
+
+        first = self.renderer.page_tile("book", page, 4.0, 0, 0)
+        last = self.renderer.page_tile("book", page, 4.0, 2, 3)
+
+        self.assertEqual((first.width(), first.height()), (TILE_SIZE, TILE_SIZE))
+        self.assertEqual((last.width(), last.height()), (2400 - 2 * TILE_SIZE, 3200 - 3 * TILE_SIZE))
+        self.assertTrue(self.renderer.cache.contains(("book", 0, 4.0, 2, 3)))
+
+
+class TestRenderPageImage(TestCase):
+
+    def test_image_shares_the_pixmap_buffer_and_keeps_it_alive(self):
+        with fitz.open() as document:
+            page = document.new_page(width=100, height=50)
+            page.draw_rect(fitz.Rect(0, 0, 50, 50), color=(1, 0, 0), fill=(1, 0, 0))
+            image = render_page_image(page, 2.0)
+        gc.collect()
+
+        address = numpy.frombuffer(image.constBits(), dtype=numpy.uint8).ctypes.data
+        self.assertEqual(address, image.pix.samples_ptr)
+        self.assertEqual((image.width(), image.height()), (200, 100))
+        self.assertEqual(image.pixelColor(10, 10).getRgb()[:3], (255, 0, 0))
+        self.assertEqual(image.pixelColor(150, 10).getRgb()[:3], (255, 255, 255))
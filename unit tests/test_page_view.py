@@ -0,0 +1,58 @@
+import os
+from unittest import TestCase
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fitz
+from PySide6.QtWidgets import QApplication
+
+from ui.page_cache import PageRenderer
+from ui.page_view import MAX_ZOOM, PageView
+
+
+class TestPageView(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.document = fitz.open()
+        for _ in range(3):
+            self.document.new_page(width=600, height=800)
+        self.renderer = PageRenderer()
+        self.view = PageView(self.renderer)
+        self.view.resize(800, 600)
+        self.view.show()
+        self.app.processEvents()
+
+    def tearDown(self):
+        self.view.close()
+        self.view.deleteLater()
+        self.renderer.close()
+        self.document.close()
+
+    def rendered_keys(self):
+        return set(self.renderer.cache.images)
+
+    def test_page_fills_the_viewport_width(self):
+        self.view.set_page("book", self.document.load_page(0))
+
+        ratio = self.view.devicePixelRatioF()
+        self.assertLessEqual(self.view.canvas.width(), self.view.viewport().width())
+        self.assertGreater(self.view.canvas.width(), self.view.viewport().width() - 600 * 0.125 / ratio)
+        self.assertFalse(self.view.canvas.tiled)
+
+    def test_zoomed_page_only_renders_visible_tiles(self):
+        self.view.set_page("book", self.document.load_page(0))
+        self.view.set_zoom(MAX_ZOOM * 2)
+        self.renderer.pool.waitForDone()
+        self.renderer.cache.clear()
+
+        self.view.viewport().grab()
+
+        self.assertTrue(self.view.canvas.tiled)
+        self.assertEqual(self.view.zoom, MAX_ZOOM)
+        tiles = {key for key in self.rendered_keys() if len(key) == 5}
+        self.assertEqual(self.rendered_keys(), tiles)
+        self.assertTrue(0 < len(tiles) <= 4)
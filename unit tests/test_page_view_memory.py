@@ -0,0 +1,66 @@
+import gc
+import os
+from unittest import TestCase, skipUnless
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fitz
+from PySide6.QtWidgets import QApplication, QWidget
+
+from ui.page_cache import PageCache, PageRenderer
+from ui.page_view import PageView
+
+PAGES = 300
+CACHE_BUDGET = 32 * 1024 * 1024
+RSS_GROWTH_LIMIT = 48 * 1024 * 1024
+
+
+def resident_set_size():
+    with open('/proc/self/status') as file:
+        for line in file:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+@skipUnless(os.path.exists('/proc/self/status'), "needs /proc to measure memory")
+class TestPageViewMemory(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.document = fitz.open()
+        for page_num in range(PAGES):
+            self.document.new_page(width=600, height=800).insert_text((72, 72), f"Page {page_num}" * 20)
+        self.renderer = PageRenderer(PageCache(CACHE_BUDGET))
+        self.view = PageView(self.renderer)
+        self.view.resize(1000, 800)
+        self.view.show()
+
+    def tearDown(self):
+        self.view.deleteLater()
+        self.renderer.close()
+        self.document.close()
+
+    def flip(self, pages):
+        for page_num in pages:
+            self.view.set_page("book", self.document.load_page(page_num))
+            self.view.viewport().repaint()
+            self.app.processEvents()
+
+    def test_flipping_through_a_long_book_keeps_memory_bounded(self):
+        self.flip(range(50))
+        self.renderer.pool.waitForDone()
+        gc.collect()
+        widgets = len(self.view.findChildren(QWidget))
+        baseline = resident_set_size()
+
+        self.flip(range(50, PAGES))
+        self.renderer.pool.waitForDone()
+        gc.collect()
+
+        self.assertEqual(widgets, len(self.view.findChildren(QWidget)))
+        self.assertLessEqual(self.renderer.cache.stats()["bytes"], CACHE_BUDGET)
+        self.assertLess(resident_set_size() - baseline, RSS_GROWTH_LIMIT)
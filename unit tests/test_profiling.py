@@ -0,0 +1,54 @@
+import csv
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from functionalities.profiling import NULL_SPAN, Profiler, percentile
+
+
+class TestProfiler(TestCase):
+
+    def test_percentiles_use_the_nearest_rank(self):
+        samples = list(range(1, 101))
+        self.assertEqual([50, 95, 99, 100], [percentile(samples, percent) for percent in (50, 95, 99, 100)])
+        self.assertEqual(7, percentile([7], 99))
+
+    def test_nothing_is_recorded_while_disabled(self):
+        profiler = Profiler(enabled=False)
+        self.assertIs(NULL_SPAN, profiler.span("render"))
+        with profiler.span("render"):
+            profiler.count("page_turn")
+        self.assertEqual({"spans": {}, "counters": {}}, profiler.snapshot())
+
+    def test_window_keeps_the_latest_durations(self):
+        profiler = Profiler(enabled=True, window=10)
+        for milliseconds in range(100):
+            profiler.record("render", milliseconds)
+        with profiler.span("load_page"):
+            pass
+        profiler.count("page_turn", 2)
+
+        snapshot = profiler.snapshot()
+
+        self.assertEqual({"count": 100, "p50_ms": 94, "p95_ms": 99, "p99_ms": 99, "max_ms": 99},
+                         snapshot["spans"]["render"])
+        self.assertEqual(1, snapshot["spans"]["load_page"]["count"])
+        self.assertEqual({"page_turn": 2}, snapshot["counters"])
+
+    def test_dump_writes_json_or_csv(self):
+        profiler = Profiler(enabled=True)
+        profiler.record("render", 4.0)
+        profiler.count("page_turn")
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "profiles", "profile.json")
+            csv_path = os.path.join(directory, "profile.csv")
+            profiler.dump(json_path)
+            profiler.dump(csv_path)
+            with open(json_path) as file:
+                self.assertEqual(4.0, json.load(file)["spans"]["render"]["p99_ms"])
+            with open(csv_path, newline='') as file:
+                rows = list(csv.reader(file))
+        self.assertEqual(["name", "count", "p50_ms", "p95_ms", "p99_ms", "max_ms"], rows[0])
+        self.assertEqual(["render", "1", "4.0", "4.0", "4.0", "4.0"], rows[1])
+        self.assertEqual(["page_turn", "1"], rows[2][:2])
@@ -0,0 +1,84 @@
+import os
+from unittest import TestCase
+from unittest.mock import patch
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fitz
+from PySide6.QtWidgets import QApplication
+
+from ui.page_cache import PageRenderer
+from ui.scroll_view import ContinuousPageView, page_at, page_offsets, pages_between
+
+
+class TestScrollLayout(TestCase):
+
+    def test_pages_are_found_by_height(self):
+        heights = [100, 200, 100]
+        offsets = page_offsets(heights, gap=10)
+
+        self.assertEqual([0, 110, 320], offsets)
+        self.assertEqual([0, 0, 1, 2], [page_at(offsets, y) for y in (0, 105, 110, 1000)])
+        self.assertEqual(range(1, 3), pages_between(offsets, heights, 100, 321))
+        self.assertEqual(range(1, 2), pages_between(offsets, heights, 150, 320))
+
+
+class TestContinuousPageView(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.document = fitz.open()
+        for _ in range(50):
+            self.document.new_page(width=600, height=800)
+        self.renderer = PageRenderer()
+        self.view = ContinuousPageView(self.renderer)
+        self.view.resize(800, 600)
+        self.view.set_document("book", self.document, [(600, 800)] * 50)
+        self.view.show()
+        self.app.processEvents()
+        self.announced = []
+        self.view.page_changed.connect(self.announced.append)
+
+    def tearDown(self):
+        self.view.close()
+        self.view.deleteLater()
+        self.renderer.close()
+        self.document.close()
+
+    def test_every_page_has_a_placeholder_but_only_visible_pages_are_rendered(self):
+        with patch.object(self.renderer, 'page_image', wraps=self.renderer.page_image) as page_image:
+            self.view.viewport().grab()
+
+        canvas = self.view.canvas
+        self.assertEqual(canvas.offsets[-1] + canvas.heights[-1], canvas.height())
+        self.assertTrue(0 < len({call.args[1].number for call in page_image.call_args_list}) <= 2)
+
+    def test_scrolling_moves_the_current_page_once_the_throttle_fires(self):
+        self.view.scroll_to_page(10)
+        scroll_bar = self.view.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.value() + 1)
+        self.view.update_current_page()
+        self.assertEqual([], self.announced)
+
+        scroll_bar.setValue(self.view.canvas.offsets[12] + 5)
+        self.assertTrue(self.view.scroll_timer.isActive())
+        self.view.update_current_page()
+
+        self.assertEqual([12], self.announced)
+
+    def test_pages_are_kept_once_within_the_page_cache_budget(self):
+        self.view.viewport().grab()
+        self.renderer.pool.waitForDone()
+        cache = self.renderer.cache
+        page_bytes = cache.stats()['bytes'] // cache.stats()['entries']
+        cache.budget = page_bytes * 3
+
+        for page_num in (10, 20, 30):
+            self.view.scroll_to_page(page_num)
+            self.view.viewport().grab()
+            self.renderer.pool.waitForDone()
+
+        self.assertLessEqual(cache.stats()['bytes'], cache.budget)
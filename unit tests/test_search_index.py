@@ -0,0 +1,76 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import fitz
+
+from functionalities import search
+from functionalities.search import SearchIndex, SearchIndexQueue, search_query
+
+
+class TestSearchIndex(TestCase):
+
+    def setUp(self):
+        self.index = SearchIndex(':memory:')
+        self.index.add_book('/books/idiot.pdf', 'idiot', 'digest-1',
+                            ['Prince Myshkin arrives in Petersburg.', 'Nastasya Filippovna throws the money in the fire.'])
+        self.index.add_book('/books/war.pdf', 'war', 'digest-2', ['Pierre walks through Moscow burning in fire.'])
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_search_returns_book_page_and_snippet(self):
+        results = self.index.search('money fire')
+
+        self.assertEqual([('idiot', '/books/idiot.pdf', 1)], [(r['name'], r['path'], r['page']) for r in results])
+        self.assertIn('[money]', results[0]['snippet'])
+
+    def test_last_word_matches_as_prefix(self):
+        self.assertEqual({'idiot', 'war'}, {result['name'] for result in self.index.search('fir')})
+
+    def test_query_syntax_is_treated_as_text(self):
+        self.assertEqual('"Myshkin" "OR" "NEAR"*', search_query('Myshkin OR "NEAR('))
+        self.assertEqual(['idiot'], [result['name'] for result in self.index.search('"Myshkin')])
+        self.assertEqual([], self.index.search('  "" '))
+
+    def test_reindexing_replaces_the_pages_of_a_book(self):
+        self.index.add_book('/books/war.pdf', 'war', 'digest-3', ['Natasha dances.'])
+
+        self.assertEqual([], self.index.search('Pierre'))
+        self.assertTrue(self.index.is_indexed('/books/war.pdf', 'digest-3'))
+        self.assertFalse(self.index.is_indexed('/books/war.pdf', 'digest-2'))
+
+    def test_removed_books_are_not_found(self):
+        self.index.remove_book('/books/war.pdf')
+
+        self.assertEqual({'/books/idiot.pdf'}, self.index.indexed_paths())
+        self.assertEqual(['idiot'], [result['name'] for result in self.index.search('fire')])
+
+
+class TestSearchIndexQueue(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'book.pdf')
+        with fitz.open() as document:
+            document.new_page().insert_text((72, 72), 'The raven said nevermore.')
+            document.save(self.path)
+        self.index = SearchIndex(':memory:')
+        self.book = {'path': self.path, 'name': 'book', 'digest': 'digest'}
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+
+    def test_only_changed_books_are_extracted(self):
+        index_queue = SearchIndexQueue(self.index)
+        with patch.object(search, 'extract_page_texts', wraps=search.extract_page_texts) as extract:
+            self.assertTrue(index_queue.enqueue(self.book))
+            index_queue.join()
+            self.assertFalse(index_queue.enqueue(self.book))
+            self.assertTrue(index_queue.enqueue(dict(self.book, digest='changed')))
+            index_queue.join()
+
+        self.assertEqual(2, extract.call_count)
+        self.assertEqual([0], [result['page'] for result in self.index.search('nevermore')])
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from functionalities import sound
+from functionalities.sound import SoundCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSoundCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'sounds.json')
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def join_refreshes(self):
+        for thread in threading.enumerate():
+            if thread.name.startswith('sound-cache-refresh'):
+                thread.join()
+
+    def test_warm_cache_does_not_fetch(self):
+        cache = SoundCache(self.path, ttl=60, clock=self.clock)
+        fetch = MagicMock(return_value='http://example.com/happy.mp3')
+
+        cache.get('happy piano sound', fetch)
+        result = cache.get('happy piano sound', fetch)
+
+        fetch.assert_called_once_with('happy piano sound')
+        self.assertEqual(result, 'http://example.com/happy.mp3')
+
+    def test_entries_survive_reload(self):
+        SoundCache(self.path, ttl=60, clock=self.clock).store('sad piano sound', 'http://example.com/sad.mp3')
+        fetch = MagicMock()
+
+        result = SoundCache(self.path, ttl=60, clock=self.clock).get('sad piano sound', fetch)
+
+        fetch.assert_not_called()
+        self.assertEqual(result, 'http://example.com/sad.mp3')
+
+    def test_expired_entry_is_served_stale_and_revalidated(self):
+        cache = SoundCache(self.path, ttl=60, clock=self.clock)
+        cache.store('calm piano sound', 'http://example.com/old.mp3')
+        self.clock.now += 120
+        fetch = MagicMock(return_value='http://example.com/new.mp3')
+
+        result = cache.get('calm piano sound', fetch)
+        self.join_refreshes()
+
+        self.assertEqual(result, 'http://example.com/old.mp3')
+        self.assertEqual(cache.get('calm piano sound', fetch), 'http://example.com/new.mp3')
+        fetch.assert_called_once_with('calm piano sound')
+
+    def test_failed_revalidation_keeps_stale_entry(self):
+        cache = SoundCache(self.path, ttl=60, clock=self.clock)
+        cache.store('angry piano sound', 'http://example.com/angry.mp3')
+        self.clock.now += 120
+
+        cache.get('angry piano sound', MagicMock(return_value=None))
+        self.join_refreshes()
+
+        self.assertEqual(cache.get('angry piano sound', MagicMock(return_value=None)), 'http://example.com/angry.mp3')
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = SoundCache(self.path, ttl=60, max_entries=2, clock=self.clock)
+        cache.store('happy piano sound', 'http://example.com/happy.mp3')
+        cache.store('sad piano sound', 'http://example.com/sad.mp3')
+        cache.get('happy piano sound', MagicMock())
+        cache.store('calm piano sound', 'http://example.com/calm.mp3')
+
+        self.assertEqual(list(cache.entries), ['happy piano sound', 'calm piano sound'])
+
+    def test_concurrent_stores_are_all_saved(self):
+        cache = SoundCache(self.path, ttl=60, clock=self.clock)
+        queries = [f'{mood} piano sound' for mood in sound.MOODS]
+        threads = [threading.Thread(target=cache.store, args=(query, f'http://example.com/{query}.mp3'))
+                   for query in queries]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(queries), sorted(SoundCache(self.path, clock=self.clock).entries))
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_malformed_entries_are_skipped(self):
+        with open(self.path, 'w') as file:
+            file.write('{"sad piano sound": {"fetched_at": 1}, "calm piano sound": '
+                       '{"url": "http://example.com/calm.mp3", "fetched_at": 1}, "happy piano sound": 3}')
+
+        self.assertEqual(['calm piano sound'], list(SoundCache(self.path, clock=self.clock).entries))
+
+
+class TestSoundResolution(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        cache = SoundCache(os.path.join(self.directory.name, 'sounds.json'))
+        for patcher in (patch.object(sound, '_sound_cache', cache),
+                        patch.object(sound, 'AUDIO_CACHE_DIR', os.path.join(self.directory.name, 'audio'))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_prefetch_and_resolve_share_the_work_of_a_mood(self):
+        searched = []
+        downloading = threading.Event()
+
+        def search(query):
+            searched.append(query)
+            return 'http://example.com/calm.mp3'
+
+        def download(url, path):
+            downloading.set()
+            time.sleep(0.1)
+            with open(path, 'wb') as file:
+                file.write(b'mp3')
+            return True
+
+        client = MagicMock(search=search, download=download)
+        with patch.object(sound, 'get_freesound_client', return_value=client):
+            prefetch = threading.Thread(target=sound.prefetch_sounds, args=(['calm'],))
+            prefetch.start()
+            downloading.wait(5)
+            resolved = sound.resolve_sound('calm')
+            prefetch.join()
+
+        self.assertEqual(['calm piano sound'], searched)
+        self.assertTrue(resolved.startswith('file://'))
@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+import fitz
+
+from functionalities import crud
+from functionalities.bookmarks import BookmarkStore
+from functionalities.catalog import Catalog, file_digest
+from functionalities.crud import ThumbnailQueue, add_thumbnail, reconcile_library, thumbnail_path
+
+
+class TestThumbnailQueue(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.books_dir = os.path.join(self.directory.name, 'books')
+        self.thumb_dir = os.path.join(self.directory.name, 'thumbnails')
+        os.makedirs(self.books_dir)
+        patcher = patch.multiple(crud, BOOKS_DIR=self.books_dir, THUMB_DIR=self.thumb_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bookmarks = BookmarkStore(os.path.join(self.directory.name, 'bookmarks.json'))
+        patcher = patch('functionalities.bookmarks._bookmark_store', self.bookmarks)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.book_path = os.path.join(self.books_dir, 'sample.pdf')
+        with fitz.open() as document:
+            document.new_page(width=300, height=600)
+            document.new_page(width=300, height=600)
+            document.save(self.book_path)
+
+    def tearDown(self):
+        self.bookmarks.flush()
+        self.directory.cleanup()
+
+    def test_thumbnail_fits_the_target_size_and_keeps_the_aspect_ratio(self):
+        pixmap = fitz.Pixmap(add_thumbnail(self.book_path))
+        self.assertEqual((128, 256), (pixmap.width, pixmap.height))
+
+    def test_queued_thumbnails_are_announced(self):
+        thumbnail_queue = ThumbnailQueue()
+        ready = threading.Event()
+        announced = []
+        thumbnail_queue.add_listener(lambda book, thumb: (announced.append((book, thumb)), ready.set()))
+
+        thumbnail_queue.enqueue(self.book_path)
+        self.assertTrue(ready.wait(10))
+        self.assertEqual([(os.path.abspath(self.book_path), thumbnail_path(self.book_path))], announced)
+        self.assertTrue(os.path.exists(thumbnail_path(self.book_path)))
+
+    def test_books_queued_while_the_queue_is_full_get_a_thumbnail(self):
+        books = [self.book_path] + [self.make_book(f'{name}.pdf', 1) for name in ('other', 'third')]
+        thumbnail_queue = ThumbnailQueue(maxsize=1)
+        with patch.object(threading.Thread, 'start'):
+            for book in books + books:
+                thumbnail_queue.enqueue(book)
+        self.assertEqual(1, thumbnail_queue.queue.qsize())
+        self.assertEqual(2, len(thumbnail_queue.overflow))
+
+        thumbnail_queue.thread.start()
+        thumbnail_queue.join()
+
+        self.assertTrue(all(os.path.exists(thumbnail_path(book)) for book in books))
+        self.assertEqual(set(), thumbnail_queue.pending)
+
+    def store(self, source):
+        path = crud.stored_path(file_digest(source))
+        os.replace(source, path)
+        return path
+
+    def make_book(self, name, pages):
+        path = os.path.join(self.books_dir, name)
+        with fitz.open() as document:
+            for _ in range(pages):
+                document.new_page(width=300, height=600)
+            document.save(path)
+        return path
+
+    def test_reconcile_library_queues_missing_and_stale_thumbnails(self):
+        current_path = self.store(self.make_book('current.pdf', 3))
+        stale_path = self.store(self.book_path)
+        add_thumbnail(current_path)
+        add_thumbnail(stale_path)
+        os.utime(stale_path, (os.path.getmtime(stale_path) + 60,) * 2)
+        missing_path = self.store(self.make_book('missing.pdf', 4))
+
+        catalog = Catalog(':memory:')
+        with patch.object(ThumbnailQueue, 'enqueue') as enqueue, \
+                patch('functionalities.catalog._catalog', catalog), \
+                patch.object(crud, '_thumbnail_queue', ThumbnailQueue()), \
+                patch.object(crud, 'sync_search_index'):
+            reconcile_library()
+
+        self.assertEqual(3, len(catalog.books()))
+        queued = sorted(os.path.abspath(call.args[0]) for call in enqueue.call_args_list)
+        self.assertEqual(sorted(os.path.abspath(path) for path in (missing_path, stale_path)), queued)
+
+    def test_hand_copied_files_are_stored_once_under_their_digest_with_their_file_name(self):
+        add_thumbnail(self.book_path)
+        stored = crud.stored_path(file_digest(self.book_path))
+        copy_path = os.path.join(self.books_dir, 'copy.pdf')
+        shutil.copyfile(self.book_path, copy_path)
+
+        catalog = Catalog(':memory:')
+        with patch('functionalities.catalog._catalog', catalog):
+            self.assertEqual([stored, stored], reconcile_library(background=False))
+
+        self.assertEqual([os.path.basename(stored)], os.listdir(self.books_dir))
+        self.assertTrue(os.path.exists(thumbnail_path(stored)))
+        self.assertEqual([(os.path.abspath(stored), 'copy')],
+                         [(book['path'], book['name']) for book in catalog.books()])
+
+    def test_bookmarks_saved_under_file_names_move_to_the_digest(self):
+        path = os.path.join(self.books_dir, 'the-idiot.pdf')
+        with fitz.open(self.book_path) as document:
+            document.set_metadata({'title': 'The Idiot'})
+            document.save(path)
+        digest = file_digest(path)
+        self.bookmarks.set('the-idiot', 1)
+
+        catalog = Catalog(':memory:')
+        with patch('functionalities.catalog._catalog', catalog):
+            reconcile_library(background=False)
+
+        self.assertEqual((1, None), (self.bookmarks.get(digest), self.bookmarks.get('the-idiot', None)))
+        book = catalog.book('the-idiot')
+        self.assertEqual((digest, 1), (book['digest'], book['bookmark']))
+
+    def test_rebuilt_catalog_names_stored_files_after_their_title(self):
+        titled = os.path.join(self.books_dir, 'titled.pdf')
+        with fitz.open(self.book_path) as document:
+            document.set_metadata({'title': 'The Idiot'})
+            document.save(titled)
+        titled = self.store(titled)
+        untitled = self.store(self.book_path)
+
+        catalog = Catalog(':memory:')
+        with patch('functionalities.catalog._catalog', catalog):
+            reconcile_library(background=False)
+
+        self.assertEqual({os.path.abspath(titled): 'The Idiot', os.path.abspath(untitled): crud.UNTITLED_NAME},
+                         {book['path']: book['name'] for book in catalog.books()})